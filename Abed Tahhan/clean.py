@@ -1,6 +1,10 @@
 import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from product_dedup import append_csv
+
 def clean_abed_tahhan():
     try:
         folder_csv_path = "../Abed_Csv"  
@@ -20,7 +24,8 @@ def clean_abed_tahhan():
 
         expected_columns = [
             "Timestamp", "Main Category", "Product Category",
-            "Product Name", "Current Price", "Original Price"
+            "Product Name", "Current Price", "Original Price",
+            "Sections", "Product Key", "Product URL"
         ]
         df = df[[col for col in expected_columns if col in df.columns]]
 
@@ -35,10 +40,7 @@ def clean_abed_tahhan():
             df["Original Price"] = df["Original Price"].apply(clean_price)
 
         cleaned_csv_path = os.path.join(folder_csv_path, "cleaned_Csv.csv")
-        if os.path.exists(cleaned_csv_path):
-            df.to_csv(cleaned_csv_path, mode='a', header=False, index=False)
-        else:
-            df.to_csv(cleaned_csv_path, index=False)
+        append_csv(df, cleaned_csv_path)
 
         print(f"Abed_Csv cleaned and updated. Saved to {cleaned_csv_path}.")
     except Exception as e:
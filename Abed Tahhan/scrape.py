@@ -1,43 +1,68 @@
 import os
-import time
+import sys
 import logging
+import asyncio
 import traceback
-from collections import Counter
-import re
-import threading
+from functools import partial
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from sklearn.feature_extraction.text import TfidfVectorizer
 import nltk
 from nltk.corpus import stopwords
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from datetime import datetime
-from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from link_graph import LinkGraph
+from meta_audit import MetaAudit
+import instrumentation
+from instrumentation import span, timed, count
+from keyword_pool import analyze_pages
+from scheduler import TaskScheduler
+from section_cache import SectionCache
+from checkpoint import RunJournal, raise_if_browser_lost
+from tab_executor import TabExecutor
+from browser_backend import run_extractor, ElementMissing, BROWSER_ERRORS
+from network_capture import NetworkCapture
+from product_dedup import dedupe_products, append_csv
+from product_enrichment import enrich_products
+import structured_data
+
+# Seconds each browser task may run, in the scheduler and as its tab job
+NAVBAR_TIMEOUT = 600
+PRODUCTS_TIMEOUT = 900
 
 logging.basicConfig(filename="scraper.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# NLTK 
-nltk.download("stopwords")
+# NLTK; downloaded only when missing, since keyword pool workers re-import this module
+try:
+    stopwords.words("english")
+except LookupError:
+    nltk.download("stopwords")
 # stop_words = set(stopwords.words("english"))
 stop_words = set(stopwords.words("english")) | {"view", "add", "cart", "quick", "load", "original"}
 
+# Links from every page parsed by fetch_html, saved once the run finishes
+link_graph = LinkGraph()
+meta_audit = MetaAudit("Abed Tahhan")
+
 
 def fetch_html(url):
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "html.parser")
+        with span("fetch", url=url):
+            response = requests.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+        count("pages")
+        with span("parse", url=url):
+            soup = BeautifulSoup(response.text, "html.parser")
+            link_graph.add_page(url, soup)
+            meta_audit.add_page(url, soup)
+        return soup
     except requests.exceptions.RequestException as e:
+        count("fetch_errors")
         logging.error(f"Error fetching {url}: {e}")
         return None
 
+@timed("meta_data")
 def extract_meta_data(url, folder_name):
         soup = fetch_html(url)
         if not soup:
@@ -64,10 +89,12 @@ def extract_meta_data(url, folder_name):
 
         # Save to CSV
         file_path = os.path.join(folder_name, "meta_data.csv")
-        df.to_csv(file_path, index=False)
+        with span("csv_write", file=file_path):
+            df.to_csv(file_path, index=False)
 
         logging.info(f"Meta data extracted successfully and saved to {file_path}")
 
+@timed("backlinks")
 def extract_backlinks(url, folder_name):
     try:
         soup = fetch_html(url)
@@ -105,7 +132,8 @@ def extract_backlinks(url, folder_name):
             # Save data
             file_path = os.path.join(folder_name, "backlinks.csv")
             df_links = pd.DataFrame(social_links)
-            df_links.to_csv(file_path, index=False)
+            with span("csv_write", file=file_path):
+                df_links.to_csv(file_path, index=False)
             print(f"Social media links saved to {file_path}")
             
             return df_links
@@ -117,32 +145,34 @@ def extract_backlinks(url, folder_name):
         print(f"An unexpected error occurred: {e}")
         return None
 
-def extract_headings_and_strong_words(url, folder_name):
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless") 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+@timed("navbar")
+def extract_navbar_data(url, folder_name, tabs=None):
+    return run_extractor(url, partial(read_navbar, url, folder_name), "Abed Tahhan", tabs, NAVBAR_TIMEOUT)
 
+
+async def read_navbar(url, folder_name, page):
     data = []
+    journal = RunJournal(folder_name, "navbar")
 
     try:
-        driver.get(url)
-        wait = WebDriverWait(driver, 10)
+        await page.report(url)
 
         # Extract brands
         try:
-            brand_menu = wait.until(EC.presence_of_element_located((By.XPATH, "//summary[contains(@class, 'header__menu-item') and contains(., 'Shop by Brand')]")))
-            driver.execute_script("arguments[0].click();", brand_menu)
+            brand_menu = await page.wait_for("//summary[contains(@class, 'header__menu-item') and contains(., 'Shop by Brand')]")
+            await page.evaluate("arguments[0].click();", brand_menu)
 
-            brands_container = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'wbmenufull')]")))
-            brands = brands_container.find_elements(By.XPATH, ".//div[contains(@class, 'wbmenuinner')]/a")
+            brands_container = await page.wait_for("//div[contains(@class, 'wbmenufull')]")
+            brands = await brands_container.find_all(".//div[contains(@class, 'wbmenuinner')]/a")
 
-            brand_names = [brand.text.strip() for brand in brands if brand.text.strip()]
+            brand_names = [name for name in [await brand.text() for brand in brands] if name]
 
             # Add brand data to the list
             data.append({
                 "Main Category": "Brands",
                 "Subcategory": "N/A",
-                "Items": ", ".join(brand_names)
+                "Items": ", ".join(brand_names),
+                "URL": "N/A"
             })
             print("Brand data extracted successfully!")
 
@@ -152,12 +182,13 @@ def extract_headings_and_strong_words(url, folder_name):
 
         # Extract categories
         try:
-            all_categories_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='mega-menu-title']")))
-            driver.execute_script("arguments[0].click();", all_categories_btn)
-            time.sleep(2)
+            all_categories_btn = await page.wait_for("//span[@class='mega-menu-title']", visible=True)
+            await page.evaluate("arguments[0].click();", all_categories_btn)
+            await asyncio.sleep(2)
 
             # Find all main categories
-            main_categories = wait.until(EC.presence_of_all_elements_located((By.XPATH, "//li[contains(@tabindex, '0')]")))
+            await page.wait_for("//li[contains(@tabindex, '0')]")
+            main_categories = await page.find_all("//li[contains(@tabindex, '0')]")
 
             if not main_categories:
                 print("No main categories found!")
@@ -167,41 +198,50 @@ def extract_headings_and_strong_words(url, folder_name):
 
             for category in main_categories:
                 try:
-                    category_name = category.text.strip()
+                    category_name = await category.text()
+                    if journal.done(category_name):
+                        data.extend(journal.restore(category_name))
+                        continue
+                    category_start = len(data)
                     print(f"Processing category: {category_name}")
 
-                    driver.execute_script("arguments[0].scrollIntoView(true);", category)
-                    category.click()
-                    time.sleep(2)
+                    await page.evaluate("arguments[0].scrollIntoView(true);", category)
+                    await category.click()
+                    await asyncio.sleep(2)
 
                     # Extract subcategories
-                    subcategories = category.find_elements(By.XPATH, ".//div[contains(@class, 'wbmenuinner')]/a[contains(@href, 'collections')]")
+                    subcategories = await category.find_all(".//div[contains(@class, 'wbmenuinner')]/a[contains(@href, 'collections')]")
 
                     if subcategories:
                         for subcategory in subcategories:
-                            subcategory_name = subcategory.text.strip()
-                            subcategory_url = subcategory.get_attribute("href")
+                            subcategory_name = await subcategory.text()
+                            subcategory_url = await subcategory.attribute("href")
 
                             # Extract items under this subcategory
-                            subcategory_container = subcategory.find_element(By.XPATH, "./ancestor::div[contains(@class, 'wbmenuinner')]")
-                            items = subcategory_container.find_elements(By.XPATH, ".//ul[contains(@class, 'header__submenu')]//li//a")
-                            item_names = [item.text.strip() for item in items if item.text.strip()]
+                            subcategory_container = await subcategory.find("./ancestor::div[contains(@class, 'wbmenuinner')]")
+                            items = await subcategory_container.find_all(".//ul[contains(@class, 'header__submenu')]//li//a")
+                            item_names = [name for name in [await item.text() for item in items] if name]
                             items_str = ", ".join(item_names) if item_names else "N/A"
 
                             # Append subcategory data
                             data.append({
                                 'Main Category': category_name,
                                 'Subcategory': subcategory_name,
-                                'Items': items_str
+                                'Items': items_str,
+                                'URL': subcategory_url or "N/A"
                             })
                     else:
                         print(f"No subcategories found for {category_name}")
 
+                    journal.record(category_name, data[category_start:])
+
                 except Exception as e:
+                    raise_if_browser_lost(e)
                     print(f"Error processing category {category_name}: {e}")
                     print(traceback.format_exc())
 
         except Exception as e:
+            raise_if_browser_lost(e)
             print(f"Error extracting categories: {e}")
             print(traceback.format_exc())
 
@@ -209,141 +249,258 @@ def extract_headings_and_strong_words(url, folder_name):
         if data:
             os.makedirs(folder_name, exist_ok=True)
             df = pd.DataFrame(data)
-            df.to_csv(os.path.join(folder_name, "navbar.csv"), index=False)
+            with span("csv_write", file=os.path.join(folder_name, "navbar.csv")):
+                df.to_csv(os.path.join(folder_name, "navbar.csv"), index=False)
             print(f"Data saved to: {os.path.join(folder_name, 'navbar.csv')}")
+            journal.finish()
         else:
             print("No data to save!")
 
     except Exception as e:
+        raise_if_browser_lost(e)
         print(f"Error: {e}")
         print(traceback.format_exc())
 
-    finally:
-        driver.quit()
+# ------------------------------- PRODUCT EXTRACTION -----------------------------------------------
+
+def extract_structured_products(url, timestamp):
+    """Homepage sections over plain HTTP: product handles from the static slider cards, names
+    and prices from the page's JSON-LD, else from Shopify's products.json. Empty when a card
+    cannot be resolved, so the browser walk runs instead."""
+    soup = structured_data.fetch_soup(url)
+    if soup is None:
+        return []
+
+    json_ld = structured_data.json_ld_catalogue(soup, url, "products")
+    catalogues = {}
+
+    def lookup(collection, handle, card):
+        if handle in json_ld:
+            # JSON-LD offers carry no compare-at price or vendor; the card shows both
+            return {
+                **json_ld[handle],
+                'brand': json_ld[handle]['brand'] or structured_data.card_text(card, "div.product__vendor"),
+                'original_price': structured_data.card_text(card, "small.card_compare_price"),
+            }
+        for source in (collection, None):
+            if source not in catalogues:
+                catalogues[source] = structured_data.shopify_products(url, source)
+            if handle in catalogues[source]:
+                return catalogues[source][handle]
+        return None
+
+    product_data = []
+    for section in soup.select("slider-component.slider-component-desktop"):
+        heading = section.select_one("h2.h1") or section.select_one("h2")
+        main_category = heading.get_text(" ", strip=True) if heading else ""
+        collections = structured_data.linked_slugs(section, "collections")
+        cards = structured_data.cards_by_slug(section, "li.slider__slide", "products")
+
+        for handle in structured_data.linked_slugs(section, "products"):
+            product = lookup(collections[0] if collections else None, handle, cards.get(handle))
+            if product is None:
+                print(f"No structured data for {handle} in {main_category}; walking the page in the browser")
+                return []
+            product_data.append(product_row(timestamp, main_category, product))
+    return product_data
+
+
+def product_row(timestamp, main_category, product):
+    """A products.csv row from structured product fields"""
+    return {
+        'Timestamp': timestamp,
+        'Main Category': main_category,
+        'Product Category': product['brand'] or "N/A",
+        'Product Name': (product['name'] or "N/A").replace('"', "'"),
+        'Current Price': product['price'] or "N/A",
+        'Original Price': product['original_price'] or product['price'] or "N/A",
+        'Product URL': product['url']
+    }
+
+
+def save_products(product_data, folder_name, journal):
+    if product_data:
+        os.makedirs(folder_name, exist_ok=True)
+        df = dedupe_products(pd.DataFrame(product_data))
+
+        csv_path = os.path.join(folder_name, "products.csv")
+
+        with span("csv_write", file=csv_path):
+            append_csv(df, csv_path)
+        count("products", len(df))   
+        journal.finish()
+
+        print(f"\nSuccessfully extracted {len(df)} unique products from {len(product_data)} section entries")
+        return df
+    else:
+        print("No products found")
+        journal.finish()
+        return None
+
+
+@timed("products")
+def extract_headings_and_strong_words(url, folder_name, tabs=None):
+    journal = RunJournal(folder_name, "products")
+    timestamp = journal.timestamp
+
+    # Most runs never need the browser: the sections resolve from the static HTML and products.json
+    if structured_data.ENABLED:
+        with span("structured_data", url=url):
+            product_data = extract_structured_products(url, timestamp)
+        if product_data:
+            count("structured_runs")
+            return save_products(product_data, folder_name, journal)
 
-    # ------------------------------- PRODUCT EXTRACTION -----------------------------------------------
+    # Next, the JSON endpoints the last browser run saw filling the sections
+    capture = NetworkCapture("Abed Tahhan", folder_name)
+    replayed = capture.replay()
+    if replayed:
+        product_data = [product_row(timestamp, title, product) for title, products in replayed for product in products]
+        return save_products(product_data, folder_name, journal)
 
-    # Re-initialize WebDriver for product scraping
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.get(url)
-    time.sleep(5)  # Allow time for the page to load
+    # The rest reads the rendered page: in a tab of the site's shared Chrome when the run has one
+    return run_extractor(url, partial(read_product_sections, url, folder_name, journal, capture), "Abed Tahhan", tabs, PRODUCTS_TIMEOUT)
+
+
+async def read_product_sections(url, folder_name, journal, capture, page):
+    timestamp = journal.timestamp
+    try:
+        await page.wait_for("//slider-component[contains(@class, 'slider-component-desktop')]")
+    except TimeoutError as e:
+        logging.warning(e)
+    await page.report(url)
+    capture.collect(await page.json_responses(capture.patterns))
 
     # Accept cookies if present
     try:
-        cookie_accept = driver.find_element(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'AGREE')]")
-        cookie_accept.click()
-        time.sleep(1)
-    except:
-        pass
+        cookie_accept = await page.find("//button[contains(text(), 'Accept') or contains(text(), 'AGREE')]")
+        await cookie_accept.click()
+        await asyncio.sleep(1)
+    except (ElementMissing, *BROWSER_ERRORS) as e:
+        logging.info(f"No cookie banner accepted: {type(e).__name__}")
 
     product_data = []
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    section_cache = SectionCache(folder_name, timestamp)
 
     # Find all category sections with sliders
-    category_sections = driver.find_elements(By.XPATH, "//slider-component[contains(@class, 'slider-component-desktop')]")
+    category_sections = await page.find_all("//slider-component[contains(@class, 'slider-component-desktop')]")
 
     for section in category_sections:
         try:
             # Extract main category name
             try:
-                main_category = section.find_element(By.XPATH, ".//h2[contains(@class, 'h1')]").text.strip()
-            except:
-                main_category = section.find_element(By.XPATH, ".//h2").text.strip()
+                main_category = await (await section.find(".//h2[contains(@class, 'h1')]")).text()
+            except ElementMissing:
+                main_category = await (await section.find(".//h2")).text()
 
             print(f"\nScraping main category: {main_category}")
 
-            # Find all products in this category
-            products = section.find_elements(By.XPATH, ".//li[contains(@class, 'slider__slide')]")
-            print(f"Found {len(products)} products in {main_category}")
-
-            for product in products:
-                try:
-                    # Product Name
-                    try:
-                        name = product.find_element(By.XPATH, ".//h3[contains(@class, 'card__heading')]").text.strip()
-                        if not name:
-                            name = product.find_element(By.XPATH, ".//h3").text.strip()
-                        name = name.replace('"', "'")
-                    except:
-                        name = "N/A"
-
-                    # Product Category (brand)
-                    try:
-                        product_category = product.find_element(By.XPATH, ".//div[contains(@class, 'product__vendor')]").text.strip()
-                    except:
-                        product_category = "N/A"
+            with span("section", section=main_category):
+                key, fingerprint = section_cache.check(main_category, await section.html())
+                if journal.done(key):
+                    product_data.extend(journal.restore(key))
+                    continue
+                cached_rows = section_cache.cached_rows(key, fingerprint)
+                if cached_rows is not None:
+                    product_data.extend(cached_rows)
+                    journal.record(key, cached_rows)
+                    continue
+                captured = capture.section_products(main_category, await section.hrefs(capture.link_selector))
+                if captured is not None:
+                    rows = [product_row(timestamp, main_category, product) for product in captured]
+                    product_data.extend(rows)
+                    section_cache.store(key, fingerprint, rows)
+                    journal.record(key, rows)
+                    continue
+                section_start = len(product_data)
+                section_failed = False
 
-                    # Prices
-                    try:
-                        current_price = product.find_element(By.XPATH, ".//span[contains(@class, 'price-item--sale') or contains(@class, 'card_sale_price')]").text.strip()
-                    except:
-                        current_price = "N/A"
+                # Find all products in this category
+                products = await section.find_all(".//li[contains(@class, 'slider__slide')]")
+                print(f"Found {len(products)} products in {main_category}")
 
+                for product in products:
                     try:
-                        original_price = product.find_element(By.XPATH, ".//small[contains(@class, 'card_compare_price')]").text.strip()
-                        if not original_price:
-                            original_price = current_price  # If no sale, original = current
-                    except:
-                        original_price = current_price
-
-                    # Add to product data
-                    product_data.append({
-                        'Timestamp': timestamp,
-                        'Main Category': main_category,
-                        'Product Category': product_category,
-                        'Product Name': name,
-                        'Current Price': current_price,
-                        'Original Price': original_price
-                    })
-
-                except Exception as e:
-                    print(f"Error processing product in {main_category}: {e}")
-                    continue
+                        # Product Name
+                        try:
+                            name = await (await product.find(".//h3[contains(@class, 'card__heading')]")).text()
+                            if not name:
+                                name = await (await product.find(".//h3")).text()
+                            name = name.replace('"', "'")
+                        except ElementMissing:
+                            name = "N/A"
+
+                        try:
+                            product_url = await (await product.find(".//a[contains(@href, '/products/')]")).attribute("href")
+                        except ElementMissing:
+                            product_url = None
+
+                        # Product Category (brand)
+                        try:
+                            product_category = await (await product.find(".//div[contains(@class, 'product__vendor')]")).text()
+                        except ElementMissing:
+                            product_category = "N/A"
+
+                        # Prices
+                        try:
+                            current_price = await (await product.find(".//span[contains(@class, 'price-item--sale') or contains(@class, 'card_sale_price')]")).text()
+                        except ElementMissing:
+                            current_price = "N/A"
+
+                        try:
+                            original_price = await (await product.find(".//small[contains(@class, 'card_compare_price')]")).text()
+                            if not original_price:
+                                original_price = current_price  # If no sale, original = current
+                        except ElementMissing:
+                            original_price = current_price
+
+                        # Add to product data
+                        product_data.append({
+                            'Timestamp': timestamp,
+                            'Main Category': main_category,
+                            'Product Category': product_category,
+                            'Product Name': name,
+                            'Current Price': current_price,
+                            'Original Price': original_price,
+                            'Product URL': product_url
+                        })
+
+                    except Exception as e:
+                        raise_if_browser_lost(e)
+                        print(f"Error processing product in {main_category}: {e}")
+                        section_failed = True
+                        continue
+
+                # A section with failed products is parsed again next run
+                if not section_failed:
+                    section_cache.store(key, fingerprint, product_data[section_start:])
+                    journal.record(key, product_data[section_start:])
 
         except Exception as e:
+            raise_if_browser_lost(e)
             print(f"Error processing category section: {e}")
             continue
 
-    driver.quit()
-
-        # Save results
-    if product_data:
-        os.makedirs(folder_name, exist_ok=True)
-        df = pd.DataFrame(product_data)
-
-        csv_path = os.path.join(folder_name, "products.csv")
-
-        if os.path.exists(csv_path):
-            df.to_csv(csv_path, mode='a', header=False, index=False)  
-        else:
-            df.to_csv(csv_path, mode='w', header=True, index=False)   
-
-        print(f"\nSuccessfully extracted {len(product_data)} products")
-        return df
-    else:
-        print("No products found")
-        return None
+    section_cache.save()
+    capture.save(product_data)
+    return save_products(product_data, folder_name, journal)
     
+@timed("keywords")
 def extract_keywords(url, folder_name):
     soup = fetch_html(url)
     if not soup:
         return
     
     page_text = soup.get_text()
-    words = re.findall(r"\b[a-zA-Z]{3,}\b", page_text.lower())
-    filtered_words = [word for word in words if word not in stop_words]
-    
-    common_keywords = Counter(filtered_words).most_common(20)
-    
-    vectorizer = TfidfVectorizer(stop_words="english", max_features=50, ngram_range=(1, 2))
-    tfidf_matrix = vectorizer.fit_transform([" ".join(filtered_words)])
-    tfidf_keywords = vectorizer.get_feature_names_out()
+    # Tokenising and TF-IDF run in the process pool, off the GIL the Selenium threads need
+    with span("keyword_analysis"):
+        common_keywords, tfidf_keywords = analyze_pages([page_text], stop_words, offload=True)[0]
     
     df_common = pd.DataFrame(common_keywords, columns=["Keyword", "Count"])
-    df_common.to_csv(os.path.join(folder_name, "seo_keywords.csv"), index=False)
-    
     df_tfidf = pd.DataFrame(tfidf_keywords, columns=["TF-IDF Keywords"])
-    df_tfidf.to_csv(os.path.join(folder_name, "tfidf_keywords.csv"), index=False)
+    with span("csv_write", file=os.path.join(folder_name, "seo_keywords.csv")):
+        df_common.to_csv(os.path.join(folder_name, "seo_keywords.csv"), index=False)
+        df_tfidf.to_csv(os.path.join(folder_name, "tfidf_keywords.csv"), index=False)
     logging.info("Keywords extracted successfully")
 
 if __name__ == "__main__":
@@ -352,18 +509,22 @@ if __name__ == "__main__":
     url = "https://abedtahan.com/"
     folder_name = "Abed_Csv"
     os.makedirs(folder_name, exist_ok=True)
+    instrumentation.configure("Abed Tahhan")
     
-    threads = [
-        threading.Thread(target=extract_meta_data, args=(url, folder_name)),
-        threading.Thread(target=extract_headings_and_strong_words, args=(url, folder_name)),
-        threading.Thread(target=extract_keywords, args=(url, folder_name)),
-        threading.Thread(target=extract_backlinks, args=(url, folder_name)),
-    ]
-    
-    for thread in threads:
-        thread.start()
-    
-    for thread in threads:
-        thread.join()
+    # Browser tasks share one Chrome: their page loads overlap in its tabs, but their extraction
+    # runs one job at a time. The link graph is saved once every static fetch has been parsed
+    tabs = TabExecutor("Abed Tahhan")
+    scheduler = TaskScheduler()
+    scheduler.add("meta_data", extract_meta_data, url, folder_name, resource="http", retries=1)
+    scheduler.add("keywords", extract_keywords, url, folder_name, resource="http", retries=1)
+    scheduler.add("backlinks", extract_backlinks, url, folder_name, resource="http", retries=1)
+    scheduler.add("navbar", extract_navbar_data, url, folder_name, tabs=tabs, resource="browser", timeout=NAVBAR_TIMEOUT, retries=1)
+    scheduler.add("products", extract_headings_and_strong_words, url, folder_name, tabs=tabs, resource="browser", timeout=PRODUCTS_TIMEOUT, retries=1)
+    scheduler.add("link_graph", link_graph.save, folder_name, requires=["meta_data", "keywords", "backlinks"])
+    scheduler.add("meta_audit", meta_audit.save, folder_name, requires=["meta_data", "keywords", "backlinks"])
+    scheduler.add("enrichment", enrich_products, folder_name, requires=["products"], resource="http", timeout=600)
+    scheduler.run()
+    tabs.close()
+    scheduler.save_report(folder_name)
     
     print("completed. Check folder for results")
\ No newline at end of file
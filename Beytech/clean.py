@@ -19,7 +19,7 @@ def clean_beytech():
         # Drop fully empty rows
         df.dropna(how="all", inplace=True)
 
-        expected_columns = ["Timestamp", "Main Category", "Product Name", "Current Price", "Original Price"]
+        expected_columns = ["Timestamp", "Main Category", "Product Name", "Current Price", "Original Price", "Sections", "Product Key", "Product URL"]
         df = df[[col for col in expected_columns if col in df.columns]]
 
         # Clean price columns: remove $, commas, and "USD", then convert to float
@@ -1,43 +1,68 @@
 import os
-import time
+import sys
 import logging
+import asyncio
 import traceback
-from collections import Counter
-import re
-import threading
+from functools import partial
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from sklearn.feature_extraction.text import TfidfVectorizer
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 import nltk
 from nltk.corpus import stopwords
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from datetime import datetime
-
-from webdriver_manager.chrome import ChromeDriverManager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from link_graph import LinkGraph
+from meta_audit import MetaAudit
+import instrumentation
+from instrumentation import span, timed, count
+from keyword_pool import analyze_pages
+from scheduler import TaskScheduler
+from section_cache import SectionCache
+from checkpoint import RunJournal, raise_if_browser_lost
+from tab_executor import TabExecutor
+from browser_backend import run_extractor, ElementMissing, BROWSER_ERRORS
+from network_capture import NetworkCapture
+from product_dedup import product_key, dedupe_products, append_csv
+from product_enrichment import enrich_products
+import structured_data
+
+# Seconds each browser task may run, in the scheduler and as its tab job
+NAVBAR_TIMEOUT = 600
+PRODUCTS_TIMEOUT = 900
+
 logging.basicConfig(filename="scraper.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-# NLTK 
-nltk.download("stopwords")
+# NLTK; downloaded only when missing, since keyword pool workers re-import this module
+try:
+    stopwords.words("english")
+except LookupError:
+    nltk.download("stopwords")
 # stop_words = set(stopwords.words("english"))
 stop_words = set(stopwords.words("english")) | {"view", "add", "cart", "quick", "load", "original"}
 
+# Links from every page parsed by fetch_html, saved once the run finishes
+link_graph = LinkGraph()
+meta_audit = MetaAudit("Beytech")
+
 def fetch_html(url):
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        with span("fetch", url=url):
+            response = requests.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
         print('Access')
-        return BeautifulSoup(response.text, "html.parser")
+        count("pages")
+        with span("parse", url=url):
+            soup = BeautifulSoup(response.text, "html.parser")
+            link_graph.add_page(url, soup)
+            meta_audit.add_page(url, soup)
+        return soup
     except requests.exceptions.RequestException as e:
+        count("fetch_errors")
         logging.error(f"Error fetching {url}: {e}")
         return None
 
+@timed("meta_data")
 def extract_meta_data(url, folder_name):
     soup = fetch_html(url)
     if not soup:
@@ -61,27 +86,26 @@ def extract_meta_data(url, folder_name):
     os.makedirs(folder_name, exist_ok=True)
     # Save to CSV
     file_path = os.path.join(folder_name, "meta_data.csv")
-    df.to_csv(file_path, index=False)
+    with span("csv_write", file=file_path):
+        df.to_csv(file_path, index=False)
     logging.info(f"Meta data extracted successfully and saved to {file_path}")
 
+@timed("backlinks")
 def extract_backlinks(url, folder_name):
     try:
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get(url)
-        
-        # Wait for page to load
-        time.sleep(3)
+        # The top bar is server-rendered, so the static HTML is enough (no browser needed)
+        soup = fetch_html(url)
+        if not soup:
+            return None
         
         # Extract ALL links with href attribute
         all_links = []
-        elements = driver.find_elements(By.XPATH, "//div[@id='top-bar']//a[@href]")
+        elements = soup.select("div#top-bar a[href]")
         
         for element in elements:
-            href = element.get_attribute('href')
-            text = element.text.strip() if element.text.strip() else "N/A"
-            data_label = element.get_attribute('data-label') or "N/A"
+            href = urljoin(url, element["href"])
+            text = element.get_text(strip=True) or "N/A"
+            data_label = element.get('data-label') or "N/A"
             
             all_links.append({
                 'URL': href,
@@ -94,7 +118,8 @@ def extract_backlinks(url, folder_name):
             os.makedirs(folder_name, exist_ok=True)
             df = pd.DataFrame(all_links)
             output_path = os.path.join(folder_name, "backlinks.csv")
-            df.to_csv(output_path, index=False)
+            with span("csv_write", file=output_path):
+                df.to_csv(output_path, index=False)
             print(f"Saved {len(all_links)} links to {output_path}")
             return df
         else:
@@ -104,200 +129,354 @@ def extract_backlinks(url, folder_name):
     except Exception as e:
         print(f"Error extracting links: {e}")
         return None
-    finally:
-        driver.quit()
-    
-def extract_headings_and_strong_words(url, folder_name):
     
-    navbar_df = extract_navbar_data(url, folder_name)
-    
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")
-    
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.get(url)
-    time.sleep(5)
+@timed("products")
+def extract_headings_and_strong_words(url, folder_name, tabs=None):
+    journal = RunJournal(folder_name, "products")
+    timestamp = journal.timestamp
+
+    # Most runs never need the browser: the sections resolve from the static HTML and the Store API
+    if structured_data.ENABLED:
+        with span("structured_data", url=url):
+            product_data = extract_structured_products(url, timestamp)
+        if product_data:
+            count("structured_runs")
+            return save_products(product_data, folder_name, journal)
+
+    # Next, the JSON endpoints the last browser run saw filling the sections
+    capture = NetworkCapture("Beytech", folder_name)
+    replayed = capture.replay()
+    if replayed:
+        product_data = [product_row(timestamp, title, product) for title, products in replayed for product in products]
+        return save_products(product_data, folder_name, journal)
+
+    # The rest reads the rendered page: in a tab of the site's shared Chrome when the run has one
+    return run_extractor(url, partial(read_product_sections, url, folder_name, journal, capture), "Beytech", tabs, PRODUCTS_TIMEOUT)
+
+
+async def read_product_sections(url, folder_name, journal, capture, page):
+    timestamp = journal.timestamp
+    try:
+        await page.wait_for("//div[contains(@class, 'section-title-container')]")
+    except TimeoutError as e:
+        logging.warning(e)
+    await page.report(url)
+    capture.collect(await page.json_responses(capture.patterns))
 
     # Accept cookies
     try:
-        cookie_accept = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'AGREE')]"))
-        )
-        cookie_accept.click()
-        time.sleep(1)
-    except:
-        pass
+        cookie_accept = await page.wait_for("//button[contains(text(), 'Accept') or contains(text(), 'AGREE')]", timeout=5, visible=True)
+        await cookie_accept.click()
+        await asyncio.sleep(1)
+    except (TimeoutError, *BROWSER_ERRORS) as e:
+        logging.info(f"No cookie banner accepted: {type(e).__name__}")
 
     product_data = []
-    seen_products = set()
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    seen_products = {}  # product key -> its first priced row this run
+    section_cache = SectionCache(folder_name, timestamp)
 
-    def parse_product(product, section_title, product_type="carousel"):
+    async def parse_product(product, section_title, product_type="carousel"):
         try:
             if product_type == "carousel":
-                name = product.find_element(By.XPATH, ".//p[contains(@class, 'product-title')]/a | .//span[contains(@class, 'product-title')]").text.strip()
+                name = await (await product.find(".//p[contains(@class, 'product-title')]/a | .//span[contains(@class, 'product-title')]")).text()
             else:  # list type
-                name = product.find_element(By.XPATH, ".//span[contains(@class, 'product-title')]").text.strip()
+                name = await (await product.find(".//span[contains(@class, 'product-title')]")).text()
             name = name.replace('"', "'")
-        except:
+        except ElementMissing:
             name = "N/A"
         
-        if name == "N/A" or name in seen_products:
+        if name == "N/A":
             return None
-        seen_products.add(name)
+        section = section_name(section_title)
+
+        try:
+            product_url = await (await product.find(".//*[contains(@class, 'product-title')]//a[@href]")).attribute("href")
+        except ElementMissing:
+            try:
+                product_url = await (await product.find(".//a[@href]")).attribute("href")
+            except ElementMissing:
+                product_url = None
+
+        key = product_key(name, product_url)
+        if key in seen_products:
+            # Already priced in an earlier section; the membership row carries that price, so a
+            # cached copy of this section stays priced when the earlier section drops the product
+            priced = seen_products[key]
+            return {'Timestamp': timestamp, 'Main Category': section, 'Product Name': name,
+                    'Current Price': priced['Current Price'], 'Original Price': priced['Original Price'],
+                    'Product URL': product_url}
 
         # Price extraction
         try:
-            current_price = product.find_element(By.XPATH, ".//ins//span[contains(@class, 'amount')]").text.strip()
-        except:
+            current_price = await (await product.find(".//ins//span[contains(@class, 'amount')]")).text()
+        except ElementMissing:
             try:
-                current_price = product.find_element(By.XPATH, ".//span[contains(@class, 'amount')]").text.strip()
-            except:
+                current_price = await (await product.find(".//span[contains(@class, 'amount')]")).text()
+            except ElementMissing:
                 current_price = "N/A"
 
         try:
-            original_price = product.find_element(By.XPATH, ".//del//span[contains(@class, 'amount')]").text.strip()
-        except:
+            original_price = await (await product.find(".//del//span[contains(@class, 'amount')]")).text()
+        except ElementMissing:
             original_price = current_price
 
-        return {
+        row = {
             'Timestamp': timestamp,
-            'Main Category': section_title if section_title.strip() else "LATEST", 
+            'Main Category': section, 
             'Product Name': name,
             'Current Price': current_price,
             'Original Price': original_price,
+            'Product URL': product_url,
         }
+        seen_products[key] = row
+        return row
 
-    def process_carousel(section_title, container):
-        products = container.find_elements(By.XPATH, ".//div[contains(@class, 'product-small') and contains(@class, 'box')]")
+    async def process_carousel(section_title, container):
+        products = await container.find_all(".//div[contains(@class, 'product-small') and contains(@class, 'box')]")
         print(f"Found {len(products)} carousel products in {section_title}")
         for product in products:
             try:
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", product)
-                time.sleep(0.3)
-            except:
-                pass
-            result = parse_product(product, section_title, "carousel")
+                await product.scroll_into_view()
+                await asyncio.sleep(0.3)
+            except BROWSER_ERRORS as e:
+                logging.warning(f"Could not scroll to a product in {section_title}: {e}")
+            result = await parse_product(product, section_title, "carousel")
             if result:
                 product_data.append(result)
 
-    def process_list(section_title, ul_element):
-        products = ul_element.find_elements(By.XPATH, "./li")
+    async def process_list(section_title, ul_element):
+        products = await ul_element.find_all("./li")
         print(f"Found {len(products)} list products in {section_title}")
         for product in products:
-            result = parse_product(product, section_title, "list")
+            result = await parse_product(product, section_title, "list")
             if result:
                 product_data.append(result)
 
+    def remember(rows):
+        for row in rows:
+            seen_products.setdefault(product_key(row['Product Name'], row.get('Product URL')), row)
+
+    async def process_section(section_title, container, product_type):
+        key, fingerprint = section_cache.check(section_title, await container.html())
+        if journal.done(key):
+            rows = journal.restore(key)
+            remember(rows)
+            product_data.extend(rows)
+            return
+
+        cached_rows = section_cache.cached_rows(key, fingerprint)
+        # Caches written before membership rows carried prices are walked again
+        if cached_rows is not None and all(row['Current Price'] is not None for row in cached_rows):
+            remember(cached_rows)
+            product_data.extend(cached_rows)
+            journal.record(key, cached_rows)
+            return
+
+        # Titled as its rows are, so the learned endpoint and the saved sections line up
+        captured = capture.section_products(section_name(section_title), await container.hrefs(capture.link_selector))
+        if captured is not None:
+            rows = [product_row(timestamp, section_title, product) for product in captured]
+            remember(rows)
+            product_data.extend(rows)
+            section_cache.store(key, fingerprint, rows)
+            journal.record(key, rows)
+            return
+
+        section_start = len(product_data)
+        if product_type == "carousel":
+            await process_carousel(section_title, container)
+        else:
+            await process_list(section_title, container)
+        section_cache.store(key, fingerprint, product_data[section_start:])
+        journal.record(key, product_data[section_start:])
+
     # Process all sections (both carousels and lists)
     try:
-        sections = driver.find_elements(By.XPATH, "//div[contains(@class, 'section-title-container')]")
+        sections = await page.find_all("//div[contains(@class, 'section-title-container')]")
         print(f"Found {len(sections)} sections")
 
         for section in sections:
             try:
-                section_title = section.find_element(By.XPATH, ".//span[contains(@class, 'section-title-main')]").text.strip()
+                section_title = await (await section.find(".//span[contains(@class, 'section-title-main')]")).text()
                 print(f"\nProcessing section: {section_title}")
                 
-                # First try to find a carousel
-                try:
-                    carousel = section.find_element(By.XPATH, "./following-sibling::div[contains(@class, 'row') and contains(@class, 'slider')][1]")
-                    process_carousel(section_title, carousel)
-                except:
-                    # If no carousel, try to find a product list
+                with span("section", section=section_title):
+                    # First try to find a carousel
                     try:
-                        ul = section.find_element(By.XPATH, "./following::ul[contains(@class, 'product_list_widget') or contains(@class, 'ux-products-list')][1]")
-                        process_list(section_title, ul)
-                    except:
-                        print(f"No recognizable product format in section: {section_title}")
+                        carousel = await section.find("./following-sibling::div[contains(@class, 'row') and contains(@class, 'slider')][1]")
+                        await process_section(section_title, carousel, "carousel")
+                    except ElementMissing:
+                        # If no carousel, try to find a product list
+                        try:
+                            ul = await section.find("./following::ul[contains(@class, 'product_list_widget') or contains(@class, 'ux-products-list')][1]")
+                            await process_section(section_title, ul, "list")
+                        except ElementMissing:
+                            print(f"No recognizable product format in section: {section_title}")
             except Exception as e:
+                raise_if_browser_lost(e)
                 print(f"Error processing section: {e}")
-    except Exception as e:
+    except Exception:
         print("Error finding sections")
         traceback.print_exc()
 
     # Process special widgets - Skip if we've already processed them as sections
     try:
-        widgets = driver.find_elements(By.XPATH, "//div[contains(@id, 'block-') and contains(@class, 'widget_block') and not(contains(@class, 'section-title-container'))]")
+        widgets = await page.find_all("//div[contains(@id, 'block-') and contains(@class, 'widget_block') and not(contains(@class, 'section-title-container'))]")
         for widget in widgets:
             try:
-                section_title = widget.find_element(By.XPATH, ".//span[contains(@class, 'section-title-main')]").text.strip()
+                section_title = await (await widget.find(".//span[contains(@class, 'section-title-main')]")).text()
                 print(f"\nProcessing widget: {section_title}")
-                ul = widget.find_element(By.XPATH, ".//ul[contains(@class, 'product_list_widget') or contains(@class, 'ux-products-list')]")
-                process_list(section_title, ul)
+                with span("section", section=section_title):
+                    ul = await widget.find(".//ul[contains(@class, 'product_list_widget') or contains(@class, 'ux-products-list')]")
+                    await process_section(section_title, ul, "list")
             except Exception as e:
+                raise_if_browser_lost(e)
                 print(f"Error processing widget: {e}")
-    except Exception as e:
+    except Exception:
         print("Error finding widgets")
         traceback.print_exc()
 
-    driver.quit()
+    section_cache.save()
+    capture.save(product_data)
+    return save_products(product_data, folder_name, journal)
+
+
+def extract_structured_products(url, timestamp):
+    """Homepage sections over plain HTTP: product slugs from the static cards, names and prices
+    from the page's JSON-LD, else from the WooCommerce Store API. Empty when a card cannot be
+    resolved, so the browser walk runs instead."""
+    soup = structured_data.fetch_soup(url)
+    if soup is None:
+        return []
+
+    def is_slider(tag):
+        return tag.name == "div" and {"row", "slider"} <= set(tag.get("class", []))
+
+    list_classes = ["product_list_widget", "ux-products-list"]
+    sections = []
+    for container in soup.select("div.section-title-container"):
+        title = container.select_one("span.section-title-main")
+        products = container.find_next_sibling(is_slider) or container.find_next("ul", class_=list_classes)
+        if title and products:
+            sections.append((title.get_text(" ", strip=True), products))
+    for widget in soup.select("div.widget_block[id*='block-']:not(.section-title-container)"):
+        title = widget.select_one("span.section-title-main")
+        products = widget.find("ul", class_=list_classes)
+        if title and products:
+            sections.append((title.get_text(" ", strip=True), products))
+
+    section_slugs = [(title, structured_data.linked_slugs(products, "product")) for title, products in sections]
+    all_slugs = list(dict.fromkeys(slug for _, slugs in section_slugs for slug in slugs))
+    if not all_slugs:
+        return []
+    # JSON-LD offers carry no regular price; the card's struck-through price is the one the browser reads
+    catalogue = structured_data.json_ld_catalogue(soup, url, "product")
+    for _, products in sections:
+        for slug, card in structured_data.cards_by_slug(products, "div.product-small, li", "product").items():
+            if slug in catalogue:
+                catalogue[slug]["original_price"] = structured_data.card_text(card, "del .amount")
+    missing = [slug for slug in all_slugs if slug not in catalogue]
+    if missing:
+        catalogue.update(structured_data.woocommerce_products(url, missing))
+
+    product_data = []
+    for section_title, slugs in section_slugs:
+        for slug in slugs:
+            product = catalogue.get(slug)
+            if product is None:
+                print(f"No structured data for {slug} in {section_title}; walking the page in the browser")
+                return []
+            product_data.append(product_row(timestamp, section_title, product))
+    return product_data
+
+
+def section_name(section_title):
+    """Main Category of a section's rows; the untitled latest-products section is LATEST"""
+    return section_title if section_title.strip() else "LATEST"
 
-    # Save results
+
+def product_row(timestamp, section_title, product):
+    """A products.csv row from structured product fields"""
+    return {
+        'Timestamp': timestamp,
+        'Main Category': section_name(section_title),
+        'Product Name': (product['name'] or "N/A").replace('"', "'"),
+        'Current Price': product['price'] or "N/A",
+        'Original Price': product['original_price'] or product['price'] or "N/A",
+        'Product URL': product['url'],
+    }
+
+
+def save_products(product_data, folder_name, journal):
     if product_data:
         os.makedirs(folder_name, exist_ok=True)
-        df = pd.DataFrame(product_data)
+        df = dedupe_products(pd.DataFrame(product_data))
 
         columns_order = [
             'Timestamp', 'Main Category', 'Product Name', 
-            'Current Price', 'Original Price']
+            'Current Price', 'Original Price', 'Sections', 'Product Key', 'Product URL']
         df = df[columns_order]
 
         csv_path = os.path.join(folder_name, "products.csv")
 
-        if os.path.exists(csv_path):
-            df.to_csv(csv_path, mode='a', header=False, index=False)  
-        else:
-            df.to_csv(csv_path, mode='w', header=True, index=False)   
+        with span("csv_write", file=csv_path):
+            append_csv(df, csv_path)
+        count("products", len(df))
+        journal.finish()
 
         print(f"\nSuccessfully extracted {len(df)} products. Saved to {csv_path}")
         return df
     else:
         print("No products found.")
+        journal.finish()
         return None
 
 
-def extract_navbar_data(url, folder_name):
-
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")
+@timed("navbar")
+def extract_navbar_data(url, folder_name, tabs=None):
+    return run_extractor(url, partial(read_navbar, url, folder_name), "Beytech", tabs, NAVBAR_TIMEOUT)
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
 
+async def read_navbar(url, folder_name, page):
     data = []
+    journal = RunJournal(folder_name, "navbar")
 
     try:
-        driver.get(url)
-        wait = WebDriverWait(driver, 5)
+        await page.report(url)
         
         # Step 1: Get all main categories
-        main_categories = wait.until(EC.presence_of_all_elements_located(
-            (By.XPATH, "//ul[contains(@class, 'mega-menu')]/li[contains(@class, 'mega-menu-item')]/a")))
+        await page.wait_for("//ul[contains(@class, 'mega-menu')]/li[contains(@class, 'mega-menu-item')]/a", timeout=5)
+        main_categories = await page.find_all("//ul[contains(@class, 'mega-menu')]/li[contains(@class, 'mega-menu-item')]/a")
         
         for category in main_categories:
-            main_category = category.text.strip()
+            main_category = await category.text()
             if not main_category:
                 continue
+            if journal.done(main_category):
+                data.extend(journal.restore(main_category))
+                continue
+            category_start = len(data)
+            category_url = await category.attribute("href") or "N/A"
             
-            ActionChains(driver).move_to_element(category).perform()
-            time.sleep(0.5)
+            await category.hover()
+            await asyncio.sleep(0.5)
             
-            parent_li = category.find_element(By.XPATH, "./ancestor::li")
-            has_children = "mega-menu-item-has-children" in parent_li.get_attribute("class")
+            parent_li = await category.find("./ancestor::li")
+            has_children = "mega-menu-item-has-children" in await parent_li.attribute("class")
             
             # If no children exist, add main category with N/A values
             if not has_children:
                 data.append({
                     'Main Category': main_category,
                     'Subcategory': "N/A", 
-                    'Items': "N/A"
+                    'Items': "N/A",
+                    'URL': category_url
                 })
+                journal.record(main_category, data[category_start:])
                 continue
                 
             # Step 2: Process subcategories
-            subcategories = parent_li.find_elements(By.XPATH, 
+            subcategories = await parent_li.find_all(
                 ".//ul[contains(@class, 'mega-sub-menu')]//li[contains(@class, 'mega-menu-item') and contains(@class, 'mega-menu-item-has-children')]")
             
             # If no subcategories found but parent has children class
@@ -305,15 +484,17 @@ def extract_navbar_data(url, folder_name):
                 data.append({
                     'Main Category': main_category,
                     'Subcategory': "N/A",
-                    'Items': "N/A"
+                    'Items': "N/A",
+                    'URL': category_url
                 })
+                journal.record(main_category, data[category_start:])
                 continue
                 
             for subcategory in subcategories:
                 try:
                     # Get subcategory title
-                    subcategory_link = subcategory.find_element(By.XPATH, ".//a[contains(@class, 'mega-menu-link')]")
-                    subcategory_title = subcategory_link.text.strip()
+                    subcategory_link = await subcategory.find(".//a[contains(@class, 'mega-menu-link')]")
+                    subcategory_title = await subcategory_link.text()
                     
                     if not subcategory_title:
                         continue
@@ -322,40 +503,45 @@ def extract_navbar_data(url, folder_name):
                     items = []
                     
                     # Step 3: Get items if they exist
-                    if "mega-menu-item-has-children" in subcategory.get_attribute("class"):
-                        item_elements = subcategory.find_elements(By.XPATH, 
-                            ".//ul[contains(@class, 'mega-sub-menu')]/li/a")
-                        items = [item.text.strip() for item in item_elements if item.text.strip()]
+                    if "mega-menu-item-has-children" in await subcategory.attribute("class"):
+                        item_elements = await subcategory.find_all(".//ul[contains(@class, 'mega-sub-menu')]/li/a")
+                        items = [text for text in [await item.text() for item in item_elements] if text]
                     
                     # Add to data
 
                     data.append({
                         'Main Category': main_category,
                         'Subcategory': subcategory_title,
-                        'Items': ", ".join(items) if items else "N/A"
+                        'Items': ", ".join(items) if items else "N/A",
+                        'URL': await subcategory_link.attribute("href") or "N/A"
                     })
                     
                 except Exception as e:
+                    raise_if_browser_lost(e)
                     print(f"Error processing subcategory: {e}")
                     continue
+
+            journal.record(main_category, data[category_start:])
         
         # Save data to CSV
         if data:
             df = pd.DataFrame(data)
             os.makedirs(folder_name, exist_ok=True)
             output_path = os.path.join(folder_name, "navbar.csv")
-            df.to_csv(output_path, index=False)
+            with span("csv_write", file=output_path):
+                df.to_csv(output_path, index=False)
             print(f"Navbar data saved to: {output_path}")
+            journal.finish()
         else:
             print("No data collected")
             
     except Exception as e:
+        raise_if_browser_lost(e)
         print(f"An error occurred: {str(e)}")
         traceback.print_exc()
-    finally:
-        driver.quit()
 
  
+@timed("keywords")
 def extract_keywords(url, folder_name):
     soup = fetch_html(url)
     if not soup:
@@ -366,20 +552,15 @@ def extract_keywords(url, folder_name):
         script.decompose()
     
     page_text = soup.get_text()
-    words = re.findall(r"\b[a-zA-Z]{3,}\b", page_text.lower())
-    filtered_words = [word for word in words if word not in stop_words]
-    
-    common_keywords = Counter(filtered_words).most_common(20)
-    
-    vectorizer = TfidfVectorizer(stop_words="english", max_features=50, ngram_range=(1, 2))
-    tfidf_matrix = vectorizer.fit_transform([" ".join(filtered_words)])
-    tfidf_keywords = vectorizer.get_feature_names_out()
+    # Tokenising and TF-IDF run in the process pool, off the GIL the Selenium threads need
+    with span("keyword_analysis"):
+        common_keywords, tfidf_keywords = analyze_pages([page_text], stop_words, offload=True)[0]
     
     df_common = pd.DataFrame(common_keywords, columns=["Keyword", "Count"])
-    df_common.to_csv(os.path.join(folder_name, "seo_keywords.csv"), index=False)
-    
     df_tfidf = pd.DataFrame(tfidf_keywords, columns=["TF-IDF Keywords"])
-    df_tfidf.to_csv(os.path.join(folder_name, "tfidf_keywords.csv"), index=False)
+    with span("csv_write", file=os.path.join(folder_name, "seo_keywords.csv")):
+        df_common.to_csv(os.path.join(folder_name, "seo_keywords.csv"), index=False)
+        df_tfidf.to_csv(os.path.join(folder_name, "tfidf_keywords.csv"), index=False)
     logging.info("Keywords extracted successfully")
     
 if __name__ == "__main__":
@@ -388,18 +569,22 @@ if __name__ == "__main__":
     # folder_name = input("Enter the folder name to save data: ").strip()
     folder_name = "Beytech_Csv"
     os.makedirs(folder_name, exist_ok=True)
+    instrumentation.configure("Beytech")
     
-    threads = [
-        threading.Thread(target=extract_meta_data, args=(url, folder_name)),
-        threading.Thread(target=extract_headings_and_strong_words, args=(url, folder_name)),
-        threading.Thread(target=extract_keywords, args=(url, folder_name)),
-        threading.Thread(target=extract_backlinks, args=(url, folder_name)),
-    ]
-    
-    for thread in threads:
-        thread.start()
-    
-    for thread in threads:
-        thread.join()
+    # Browser tasks share one Chrome: their page loads overlap in its tabs, but their extraction
+    # runs one job at a time. The link graph is saved once every static fetch has been parsed
+    tabs = TabExecutor("Beytech")
+    scheduler = TaskScheduler()
+    scheduler.add("meta_data", extract_meta_data, url, folder_name, resource="http", retries=1)
+    scheduler.add("keywords", extract_keywords, url, folder_name, resource="http", retries=1)
+    scheduler.add("backlinks", extract_backlinks, url, folder_name, resource="http", retries=1)
+    scheduler.add("navbar", extract_navbar_data, url, folder_name, tabs=tabs, resource="browser", timeout=NAVBAR_TIMEOUT, retries=1)
+    scheduler.add("products", extract_headings_and_strong_words, url, folder_name, tabs=tabs, resource="browser", timeout=PRODUCTS_TIMEOUT, retries=1)
+    scheduler.add("link_graph", link_graph.save, folder_name, requires=["meta_data", "keywords", "backlinks"])
+    scheduler.add("meta_audit", meta_audit.save, folder_name, requires=["meta_data", "keywords", "backlinks"])
+    scheduler.add("enrichment", enrich_products, folder_name, requires=["products"], resource="http", timeout=600)
+    scheduler.run()
+    tabs.close()
+    scheduler.save_report(folder_name)
     
     print("completed. Check folder for results")
\ No newline at end of file
@@ -16,7 +16,7 @@ def clean_hamdan():
         df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
         df.dropna(how="all", inplace=True)
 
-        expected_columns = ["Timestamp", "Main Category", "Product Name", "Current Price", "Original Price"]
+        expected_columns = ["Timestamp", "Main Category", "Product Name", "Current Price", "Original Price", "Sections", "Product Key", "Product URL"]
         df = df[[col for col in expected_columns if col in df.columns]]
 
         def clean_price(val):
@@ -1,46 +1,68 @@
 import os
-import time
+import sys
 import logging
-import traceback
-from collections import Counter
-import re
-import threading
+import asyncio
+from functools import partial
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from sklearn.feature_extraction.text import TfidfVectorizer
 from urllib.parse import urlparse
 import nltk
 from nltk.corpus import stopwords
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from datetime import datetime
 
-
-from webdriver_manager.chrome import ChromeDriverManager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from link_graph import LinkGraph
+from meta_audit import MetaAudit
+import instrumentation
+from instrumentation import span, timed, count
+from keyword_pool import analyze_pages
+from scheduler import TaskScheduler
+from section_cache import SectionCache
+from checkpoint import RunJournal, raise_if_browser_lost
+from tab_executor import TabExecutor
+from browser_backend import run_extractor, ElementMissing, BROWSER_ERRORS
+from network_capture import NetworkCapture
+from product_dedup import dedupe_products, append_csv
+from product_enrichment import enrich_products
+import structured_data
+
+# Seconds each browser task may run, in the scheduler and as its tab job
+NAVBAR_TIMEOUT = 600
+PRODUCTS_TIMEOUT = 900
 
 logging.basicConfig(filename="scraper.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# NLTK 
-nltk.download("stopwords")
+# NLTK; downloaded only when missing, since keyword pool workers re-import this module
+try:
+    stopwords.words("english")
+except LookupError:
+    nltk.download("stopwords")
 # stop_words = set(stopwords.words("english"))
 stop_words = set(stopwords.words("english")) | {"view", "add", "cart", "quick", "load", "original"}
 
+# Links from every page parsed by fetch_html, saved once the run finishes
+link_graph = LinkGraph()
+meta_audit = MetaAudit("Hamdan electronics")
+
 
 def fetch_html(url):
     headers = {"User-Agent": "Mozilla/5.0"}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "html.parser")
+        with span("fetch", url=url):
+            response = requests.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+        count("pages")
+        with span("parse", url=url):
+            soup = BeautifulSoup(response.text, "html.parser")
+            link_graph.add_page(url, soup)
+            meta_audit.add_page(url, soup)
+        return soup
     except requests.exceptions.RequestException as e:
+        count("fetch_errors")
         logging.error(f"Error fetching {url}: {e}")
         return None
 
+@timed("meta_data")
 def extract_meta_data(url, folder_name):
         soup = fetch_html(url)
         if not soup:
@@ -67,10 +89,12 @@ def extract_meta_data(url, folder_name):
 
         # Save to CSV
         file_path = os.path.join(folder_name, "meta_data.csv")
-        df.to_csv(file_path, index=False)
+        with span("csv_write", file=file_path):
+            df.to_csv(file_path, index=False)
 
         logging.info(f"Meta data extracted successfully and saved to {file_path}")
 
+@timed("backlinks")
 def extract_backlinks(url, folder_name):
     try:
         soup = fetch_html(url)
@@ -99,226 +123,347 @@ def extract_backlinks(url, folder_name):
         # Save to CSV
         file_path = os.path.join(folder_name, "backlinks.csv")
         df_links = pd.DataFrame(backlinks)
-        df_links.to_csv(file_path, index=False)
+        with span("csv_write", file=file_path):
+            df_links.to_csv(file_path, index=False)
         print(f"External links saved to {file_path}")
 
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
-def extract_headings_and_strong_words(url, folder_name):
+@timed("navbar")
+def extract_navbar_data(url, folder_name, tabs=None):
+    return run_extractor(url, partial(read_navbar, url, folder_name), "Hamdan electronics", tabs, NAVBAR_TIMEOUT)
 
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized") 
-    options.add_argument("--headless")
-    
-    # Initialize the WebDriver
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    
+
+async def read_navbar(url, folder_name, page):
     data = []
+    journal = RunJournal(folder_name, "navbar")
 
     try:
-        # Navigate to the URL
-        driver.get(url)
-        wait = WebDriverWait(driver, 15)
+        await page.report(url)
 
         # Get all top-level menu items
-        main_categories = wait.until(EC.presence_of_all_elements_located(
-            (By.XPATH, "//ul[@class='menu-content']/li[contains(@class, 'level-1')]/a/span")))
+        await page.wait_for("//ul[@class='menu-content']/li[contains(@class, 'level-1')]/a/span", timeout=15)
+        main_categories = await page.find_all("//ul[@class='menu-content']/li[contains(@class, 'level-1')]/a/span")
         
         for category in main_categories:
-            main_category = category.text.strip()
+            main_category = await category.text()
             if not main_category:
                 continue
+            if journal.done(main_category):
+                data.extend(journal.restore(main_category))
+                continue
+            category_start = len(data)
+            category_url = await (await category.find("./parent::a")).attribute("href") or "N/A"
 
             # Check if this category has a dropdown by looking for the dropdown icon
-            parent_li = category.find_element(By.XPATH, "./ancestor::li")
-            has_dropdown = len(parent_li.find_elements(By.XPATH, ".//span[contains(@class, 'icon-drop-mobile')]")) > 0
+            parent_li = await category.find("./ancestor::li")
+            has_dropdown = len(await parent_li.find_all(".//span[contains(@class, 'icon-drop-mobile')]")) > 0
             
             if has_dropdown:
                 # Hover to reveal dropdown menu
-                ActionChains(driver).move_to_element(category).perform()
-                time.sleep(1) 
+                await category.hover()
+                await asyncio.sleep(1) 
                 
                 try:
-                    dropdown = parent_li.find_element(By.XPATH, ".//div[contains(@class, 'lab-sub-menu')]")
+                    dropdown = await parent_li.find(".//div[contains(@class, 'lab-sub-menu')]")
                     
                     # Process each column in the dropdown menu
-                    columns = dropdown.find_elements(By.XPATH, ".//div[contains(@class, 'lab-menu-col')]")
+                    columns = await dropdown.find_all(".//div[contains(@class, 'lab-menu-col')]")
                     
                     for col in columns:
                         # Get subcategory header
                         try:
-                            header = col.find_element(By.XPATH, ".//li[contains(@class, 'item-header')]/a")
-                            subcategory = header.text.strip()
-                        except:
+                            header = await col.find(".//li[contains(@class, 'item-header')]/a")
+                            subcategory = await header.text()
+                        except ElementMissing:
                             continue
                         
                         # Get all items under this subcategory
-                        items = col.find_elements(By.XPATH, ".//li[contains(@class, 'item-line')]/a[normalize-space(text())]")
-                        item_list = [item.text.strip() for item in items if item.text.strip()]
+                        items = await col.find_all(".//li[contains(@class, 'item-line')]/a[normalize-space(text())]")
+                        item_list = [text for text in [await item.text() for item in items] if text]
                         
                         if subcategory and item_list:
                             data.append({
                                 'Main Category': main_category,
                                 'Subcategory': subcategory,
-                                'Items': ", ".join(item_list)
+                                'Items': ", ".join(item_list),
+                                'URL': await header.attribute("href") or "N/A"
                             })
                 except Exception as e:
+                    raise_if_browser_lost(e)
                     print(f"Couldn't process dropdown for {main_category}")
                     data.append({
                         'Main Category': main_category,
                         'Subcategory': 'N/A',
-                        'Items': 'N/A'
+                        'Items': 'N/A',
+                        'URL': category_url
                     })
             else:
                 # For categories without dropdowns
                 data.append({
                     'Main Category': main_category,
                     'Subcategory': 'N/A',
-                    'Items': 'N/A'
+                    'Items': 'N/A',
+                    'URL': category_url
                 })
 
+            journal.record(main_category, data[category_start:])
+
         # Save to CSV
         if data:
             # Create DataFrame and save to CSV
             df = pd.DataFrame(data)
             os.makedirs(folder_name, exist_ok=True)
-            df.to_csv(os.path.join(folder_name, "navbar.csv"), index=False)
+            with span("csv_write", file=os.path.join(folder_name, "navbar.csv")):
+                df.to_csv(os.path.join(folder_name, "navbar.csv"), index=False)
             print("Navbar data extracted successfully")
+            journal.finish()
         else:
             print("No data was collected from the page")
 
     except Exception as e:
+        raise_if_browser_lost(e)
         print(f"An error occurred: {str(e)}")
-    finally:
-        driver.quit()
 
-        # ------------------------------- PRODUCT EXTRACTION -----------------------------------------------
-        
-    # Re-initialize WebDriver 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.get(url)
-    time.sleep(5)  
+# ------------------------------- PRODUCT EXTRACTION -----------------------------------------------
+
+@timed("products")
+def extract_headings_and_strong_words(url, folder_name, tabs=None):
+    journal = RunJournal(folder_name, "products")
+    timestamp = journal.timestamp
+
+    # Most runs never need the browser: the product cards carry microdata in the static HTML
+    if structured_data.ENABLED:
+        with span("structured_data", url=url):
+            product_data = extract_structured_products(url, timestamp)
+        if product_data:
+            count("structured_runs")
+            return save_products(product_data, folder_name, journal)
+
+    # Next, the JSON endpoints the last browser run saw filling the sections
+    capture = NetworkCapture("Hamdan electronics", folder_name)
+    replayed = capture.replay()
+    if replayed:
+        product_data = [product_row(timestamp, title, product) for title, products in replayed for product in products]
+        return save_products(product_data, folder_name, journal)
+
+    # The rest reads the rendered page: in a tab of the site's shared Chrome when the run has one
+    return run_extractor(url, partial(read_product_sections, url, folder_name, journal, capture), "Hamdan electronics", tabs, PRODUCTS_TIMEOUT)
+
+
+async def read_product_sections(url, folder_name, journal, capture, page):
+    timestamp = journal.timestamp
+    try:
+        await page.wait_for("//article[contains(@class, 'product-miniature')]")
+    except TimeoutError as e:
+        logging.warning(e)
+    await page.report(url)
+    capture.collect(await page.json_responses(capture.patterns))
 
 
     try:
-        cookie_accept = driver.find_element(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'AGREE')]")
-        cookie_accept.click()
-        time.sleep(1)
-    except:
-        pass
+        cookie_accept = await page.find("//button[contains(text(), 'Accept') or contains(text(), 'AGREE')]")
+        await cookie_accept.click()
+        await asyncio.sleep(1)
+    except (ElementMissing, *BROWSER_ERRORS) as e:
+        logging.info(f"No cookie banner accepted: {type(e).__name__}")
 
     product_data = []
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    section_cache = SectionCache(folder_name, timestamp)
 
     # Find all category sections with sliders
-    category_sections = driver.find_elements(By.XPATH, "//div[contains(@class, 'laberProdCategory') or contains(@class, 'Lab-featured-prod column')]")
+    category_sections = await page.find_all("//div[contains(@class, 'laberProdCategory') or contains(@class, 'Lab-featured-prod column')]")
 
     for section in category_sections:
         try:
             # main category name
             try:
-                main_category = section.find_element(By.XPATH, ".//h3//span[contains(@class, 'strong')]").text.strip()
-            except:
-                main_category = section.find_element(By.XPATH, ".//h3").text.strip()
+                main_category = await (await section.find(".//h3//span[contains(@class, 'strong')]")).text()
+            except ElementMissing:
+                main_category = await (await section.find(".//h3")).text()
 
             print(f"\nScraping main category: {main_category}")
 
-            # Find products ONLY within this section
-            products = section.find_elements(By.XPATH, ".//article[contains(@class, 'product-miniature')]")
-            print(f"Found {len(products)} products in category: {main_category}")
+            with span("section", section=main_category):
+                key, fingerprint = section_cache.check(main_category, await section.html())
+                if journal.done(key):
+                    product_data.extend(journal.restore(key))
+                    continue
+                cached_rows = section_cache.cached_rows(key, fingerprint)
+                if cached_rows is not None:
+                    product_data.extend(cached_rows)
+                    journal.record(key, cached_rows)
+                    continue
+                captured = capture.section_products(main_category, await section.hrefs(capture.link_selector))
+                if captured is not None:
+                    rows = [product_row(timestamp, main_category, product) for product in captured]
+                    product_data.extend(rows)
+                    section_cache.store(key, fingerprint, rows)
+                    journal.record(key, rows)
+                    continue
+                section_start = len(product_data)
+                section_failed = False
 
-            for product in products:
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", product)
-                    time.sleep(0.2)
+                # Find products ONLY within this section
+                products = await section.find_all(".//article[contains(@class, 'product-miniature')]")
+                print(f"Found {len(products)} products in category: {main_category}")
 
-                    # Product Name
-                    try:
-                        name = product.find_element(By.XPATH, ".//h2[contains(@class, 'productName')]").text.strip()
-                        if not name:
-                            name = product.find_element(By.XPATH, ".//h2").text.strip()
-                        name = name.replace('"', "'")
-                    except:
-                        name = "N/A"
-
-                    # Prices
+                for product in products:
                     try:
-                        current_price = product.find_element(By.XPATH, ".//span[@class='price' and @itemprop='price']").text.strip()
-                    except:
-                        current_price = "N/A"
+                        await product.scroll_into_view()
+                        await asyncio.sleep(0.2)
 
-                    try:
-                        original_price = product.find_element(By.XPATH, ".//span[contains(@class, 'regular-price')]").text.strip()
-                        if not original_price:
-                            original_price = current_price 
-                    except:
-                        original_price = current_price
-
-                    # Add to product data
-                    product_data.append({
-                        'Timestamp': timestamp,
-                        'Main Category': main_category,
-                        'Product Name': name,
-                        'Current Price': current_price,
-                        'Original Price': original_price
-                    })
+                        # Product Name
+                        try:
+                            name = await (await product.find(".//h2[contains(@class, 'productName')]")).text()
+                            if not name:
+                                name = await (await product.find(".//h2")).text()
+                            name = name.replace('"', "'")
+                        except ElementMissing:
+                            name = "N/A"
 
-                except Exception as e:
-                    print(f"Error processing product in {main_category}: {e}")
-                    continue
+                        try:
+                            product_url = await (await product.find(".//h2[contains(@class, 'productName')]//a | .//a[contains(@class, 'thumbnail')]")).attribute("href")
+                        except ElementMissing:
+                            product_url = None
+
+                        # Prices
+                        try:
+                            current_price = await (await product.find(".//span[@class='price' and @itemprop='price']")).text()
+                        except ElementMissing:
+                            current_price = "N/A"
+
+                        try:
+                            original_price = await (await product.find(".//span[contains(@class, 'regular-price')]")).text()
+                            if not original_price:
+                                original_price = current_price 
+                        except ElementMissing:
+                            original_price = current_price
+
+                        # Add to product data
+                        product_data.append({
+                            'Timestamp': timestamp,
+                            'Main Category': main_category,
+                            'Product Name': name,
+                            'Current Price': current_price,
+                            'Original Price': original_price,
+                            'Product URL': product_url
+                        })
+
+                    except Exception as e:
+                        raise_if_browser_lost(e)
+                        print(f"Error processing product in {main_category}: {e}")
+                        section_failed = True
+                        continue
+
+                # A section with failed products is parsed again next run
+                if not section_failed:
+                    section_cache.store(key, fingerprint, product_data[section_start:])
+                    journal.record(key, product_data[section_start:])
 
         except Exception as e:
+            raise_if_browser_lost(e)
             print(f"Error processing category section: {e}")
             continue
 
-    driver.quit()
+    section_cache.save()
+    capture.save(product_data)
+    return save_products(product_data, folder_name, journal)
+
+
+def extract_structured_products(url, timestamp):
+    """Homepage sections over plain HTTP, read from the page's JSON-LD products, else from the
+    schema.org/Product microdata PrestaShop puts on every product card. Empty when a card has
+    no name or price, so the browser walk runs instead."""
+    soup = structured_data.fetch_soup(url)
+    if soup is None:
+        return []
 
-# Save results (Modified for appending)
+    json_ld = structured_data.json_ld_catalogue(soup, url)
+    product_data = []
+    for section in soup.select("div.laberProdCategory, div[class*='Lab-featured-prod column']"):
+        heading = section.select_one("h3 span.strong") or section.select_one("h3")
+        main_category = heading.get_text(" ", strip=True) if heading else ""
+        microdata = {}  # id of the card -> its microdata; equal-looking cards are still distinct
+        for scope, product in structured_data.microdata_products(section):
+            microdata.setdefault(id(scope if scope.name == "article" else scope.find_parent("article") or scope), product)
+
+        for card in section.select("article.product-miniature"):
+            link = card.select_one("a[href]")
+            product = json_ld.get(structured_data.product_ref(link["href"], url)) if link else None
+            product = product or microdata.get(id(card))
+            if product is None:
+                print(f"Product cards in {main_category} carry no structured data; walking the page in the browser")
+                return []
+            price = card.select_one("span.price")
+            regular_price = card.select_one("span.regular-price")
+            current_price = price.get_text(strip=True) if price else product['price']
+            if not product['name'] or not current_price:
+                print(f"Incomplete structured data in {main_category}; walking the page in the browser")
+                return []
+            product_data.append(product_row(timestamp, main_category, {
+                **product,
+                'price': current_price,
+                'original_price': regular_price.get_text(strip=True) if regular_price else None,
+            }))
+    return product_data
+
+
+def product_row(timestamp, main_category, product):
+    """A products.csv row from structured product fields"""
+    return {
+        'Timestamp': timestamp,
+        'Main Category': main_category,
+        'Product Name': (product['name'] or "N/A").replace('"', "'"),
+        'Current Price': product['price'] or "N/A",
+        'Original Price': product['original_price'] or product['price'] or "N/A",
+        'Product URL': product['url']
+    }
+
+
+def save_products(product_data, folder_name, journal):
     if product_data:
         os.makedirs(folder_name, exist_ok=True)
         df = pd.DataFrame(product_data)
     
     
         df['Product Name'] = df['Product Name'].str.strip()
-        df = df[df['Product Name'] != "N/A"]  
     
-        df = df.drop_duplicates(subset=['Main Category', 'Product Name'], keep='first')
+        # One row per product; the sections it appeared in go to the Sections column
+        df = dedupe_products(df)
     
         file_path = os.path.join(folder_name, "products.csv")
     
-        if os.path.exists(file_path):
-            df.to_csv(file_path, mode='a', header=False, index=False)
-        else:
-            df.to_csv(file_path, mode='w', header=True, index=False)
+        with span("csv_write", file=file_path):
+            append_csv(df, file_path)
+        count("products", len(df))
+        journal.finish()
 
         print(f"\nSuccessfully extracted {len(df)} unique products")
         return df
     else:
         print("No products found")
+        journal.finish()
         return None
 
     
+@timed("keywords")
 def extract_keywords(url, folder_name):
     soup = fetch_html(url)
     if not soup:
         return
     
     page_text = soup.get_text()
-    words = re.findall(r"\b[a-zA-Z]{3,}\b", page_text.lower())
-    filtered_words = [word for word in words if word not in stop_words]
-    
-    common_keywords = Counter(filtered_words).most_common(20)
-    
-    vectorizer = TfidfVectorizer(stop_words="english", max_features=50, ngram_range=(1, 2))
-    tfidf_matrix = vectorizer.fit_transform([" ".join(filtered_words)])
-    tfidf_keywords = vectorizer.get_feature_names_out()
+    # Tokenising and TF-IDF run in the process pool, off the GIL the Selenium threads need
+    with span("keyword_analysis"):
+        common_keywords, tfidf_keywords = analyze_pages([page_text], stop_words, offload=True)[0]
     
     df_common = pd.DataFrame(common_keywords, columns=["Keyword", "Count"])
-    df_common.to_csv(os.path.join(folder_name, "seo_keywords.csv"), index=False)
-    
     df_tfidf = pd.DataFrame(tfidf_keywords, columns=["TF-IDF Keywords"])
-    df_tfidf.to_csv(os.path.join(folder_name, "tfidf_keywords.csv"), index=False)
+    with span("csv_write", file=os.path.join(folder_name, "seo_keywords.csv")):
+        df_common.to_csv(os.path.join(folder_name, "seo_keywords.csv"), index=False)
+        df_tfidf.to_csv(os.path.join(folder_name, "tfidf_keywords.csv"), index=False)
     logging.info("Keywords extracted successfully")
 
 if __name__ == "__main__":
@@ -327,18 +472,22 @@ if __name__ == "__main__":
     url = "https://hamdanelectronics.com/"
     folder_name = "Hamdan_Csv"
     os.makedirs(folder_name, exist_ok=True)
+    instrumentation.configure("Hamdan electronics")
     
-    threads = [
-        threading.Thread(target=extract_meta_data, args=(url, folder_name)),
-        threading.Thread(target=extract_headings_and_strong_words, args=(url, folder_name)),
-        threading.Thread(target=extract_keywords, args=(url, folder_name)),
-        threading.Thread(target=extract_backlinks, args=(url, folder_name)),
-    ]
-    
-    for thread in threads:
-        thread.start()
-    
-    for thread in threads:
-        thread.join()
+    # Browser tasks share one Chrome: their page loads overlap in its tabs, but their extraction
+    # runs one job at a time. The link graph is saved once every static fetch has been parsed
+    tabs = TabExecutor("Hamdan electronics")
+    scheduler = TaskScheduler()
+    scheduler.add("meta_data", extract_meta_data, url, folder_name, resource="http", retries=1)
+    scheduler.add("keywords", extract_keywords, url, folder_name, resource="http", retries=1)
+    scheduler.add("backlinks", extract_backlinks, url, folder_name, resource="http", retries=1)
+    scheduler.add("navbar", extract_navbar_data, url, folder_name, tabs=tabs, resource="browser", timeout=NAVBAR_TIMEOUT, retries=1)
+    scheduler.add("products", extract_headings_and_strong_words, url, folder_name, tabs=tabs, resource="browser", timeout=PRODUCTS_TIMEOUT, retries=1)
+    scheduler.add("link_graph", link_graph.save, folder_name, requires=["meta_data", "keywords", "backlinks"])
+    scheduler.add("meta_audit", meta_audit.save, folder_name, requires=["meta_data", "keywords", "backlinks"])
+    scheduler.add("enrichment", enrich_products, folder_name, requires=["products"], resource="http", timeout=600)
+    scheduler.run()
+    tabs.close()
+    scheduler.save_report(folder_name)
     
     print("completed. Check folder for results")
\ No newline at end of file
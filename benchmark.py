@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+import importlib.util
+from datetime import datetime
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from sites import SITES, ROOT, site_path
+
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+THRESHOLDS_PATH = os.path.join(BENCH_DIR, "thresholds.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.csv")
+THRESHOLD_HEADROOM = 1.5  # saved thresholds allow 50% over the recorded median
+
+# Extractors replayed against the static snapshot (fetch_html) and the rendered DOM (Selenium)
+STATIC_EXTRACTORS = ["extract_meta_data", "extract_keywords", "extract_backlinks"]
+BROWSER_EXTRACTORS = ["extract_headings_and_strong_words", "extract_navbar_data"]
+
+
+def fixture_dir(site_name):
+    return os.path.join(FIXTURES_DIR, site_name.lower().replace(" ", "_"))
+
+
+def record(site_names, with_browser=False):
+    """Snapshot each homepage as fetch_html sees it and, optionally, as Chrome renders it"""
+    for site_name in site_names:
+        url = SITES[site_name]["url"]
+        folder = fixture_dir(site_name)
+        os.makedirs(folder, exist_ok=True)
+
+        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        response.raise_for_status()
+        with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"Recorded static HTML for {site_name} ({len(response.text)} chars)")
+
+        if with_browser:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            options = webdriver.ChromeOptions()
+            options.add_argument("--headless")
+            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+            try:
+                driver.get(url)
+                time.sleep(5)
+                rendered = BeautifulSoup(driver.page_source, "html.parser")
+            finally:
+                driver.quit()
+
+            # Scripts are dropped so the replay is deterministic and never leaves localhost
+            for script in rendered(["script", "noscript"]):
+                script.decompose()
+            os.makedirs(os.path.join(folder, "rendered"), exist_ok=True)
+            with open(os.path.join(folder, "rendered", "index.html"), "w", encoding="utf-8") as f:
+                f.write(str(rendered))
+            print(f"Recorded rendered DOM for {site_name}")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Local HTTP stand-in serving one site's recorded fixtures"""
+
+    def __init__(self, directory):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=directory))
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def load_module(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(func, repeat, setup=None, warmup=1):
+    """Latency stats for repeated calls; setup runs before every call and is not timed"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    return {
+        "Calls": repeat,
+        "Median s": statistics.median(timings),
+        "P95 s": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        "Throughput/s": repeat / sum(timings) if sum(timings) else float("inf"),
+    }
+
+
+def site_benchmarks(site_name, work_dir, server_url, with_browser):
+    """Yield (benchmark name, callable, setup) for one site"""
+    site = SITES[site_name]
+    scraper = load_module(site_path(site_name, "scraper_dir", "scrape.py"), f"bench_scrape_{site['data_folder']}")
+    cleaner = load_module(site_path(site_name, "scraper_dir", "clean.py"), f"bench_clean_{site['data_folder']}")
+    out_folder = os.path.join(work_dir, "out")
+    os.makedirs(out_folder, exist_ok=True)
+
+    for name in STATIC_EXTRACTORS:
+        if hasattr(scraper, name):
+            yield name, partial(getattr(scraper, name), server_url, out_folder), None
+
+    if with_browser and os.path.exists(os.path.join(fixture_dir(site_name), "rendered", "index.html")):
+        for name in BROWSER_EXTRACTORS:
+            if hasattr(scraper, name):
+                yield name, partial(getattr(scraper, name), server_url + "rendered/", out_folder), None
+
+    # clean.py reads ../<data folder>/products.csv relative to its working directory
+    clean_root = os.path.join(work_dir, "clean")
+    data_copy = os.path.join(clean_root, site["data_folder"])
+    os.makedirs(os.path.join(clean_root, "work"), exist_ok=True)
+    os.makedirs(data_copy, exist_ok=True)
+    for file_name in ("products.csv", "backlinks.csv"):
+        if os.path.exists(site_path(site_name, "data_folder", file_name)):
+            shutil.copy(site_path(site_name, "data_folder", file_name), data_copy)
+
+    def reset_clean_output():
+        os.chdir(os.path.join(clean_root, "work"))
+        cleaned = os.path.join(data_copy, "cleaned_Csv.csv")
+        if os.path.exists(cleaned):
+            os.remove(cleaned)
+
+    yield "clean." + site["clean_function"], getattr(cleaner, site["clean_function"]), reset_clean_output
+
+    import dashboard_data
+    company = dashboard_data.companies[site_name]
+    yield "dashboard.load_company_data", partial(
+        dashboard_data.load_company_data,
+        os.path.join(ROOT, company["seo_path"]),
+        os.path.join(ROOT, company["products_path"])
+    ), None
+
+
+def run(site_names, repeat=5, with_browser=False, save_thresholds=False):
+    thresholds = {}
+    if os.path.exists(THRESHOLDS_PATH):
+        with open(THRESHOLDS_PATH, encoding="utf-8") as f:
+            thresholds = json.load(f)
+
+    # Keep the scrapers' spans out of the real run history
+    os.environ["SCRAPER_RUNS_DIR"] = os.path.join(BENCH_DIR, "runs")
+    results = []
+    original_cwd = os.getcwd()
+
+    for site_name in site_names:
+        fixtures = fixture_dir(site_name)
+        if not os.path.exists(os.path.join(fixtures, "index.html")):
+            print(f"No fixtures for {site_name}; run 'python benchmark.py record' first")
+            continue
+
+        with tempfile.TemporaryDirectory() as work_dir, FixtureServer(fixtures) as server:
+            os.chdir(work_dir)  # scraper.log and other relative outputs stay in the temp dir
+            try:
+                for name, func, setup in site_benchmarks(site_name, work_dir, server.url, with_browser):
+                    stats = measure(func, repeat, setup)
+                    os.chdir(work_dir)
+                    key = f"{site_name}/{name}"
+                    limit = thresholds.get(key)
+                    status = "ok" if limit is None or stats["Median s"] <= limit else "REGRESSION"
+                    results.append({"Site": site_name, "Benchmark": name, **stats, "Threshold s": limit, "Status": status})
+                    print(f"{key:<60} median {stats['Median s']:.4f}s  p95 {stats['P95 s']:.4f}s  "
+                          f"{stats['Throughput/s']:.1f}/s  {status}")
+            finally:
+                os.chdir(original_cwd)
+
+    if not results:
+        return 0
+
+    df = pd.DataFrame(results).round(5)
+    df.insert(0, "Timestamp", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    df.to_csv(RESULTS_PATH, mode="a", header=not os.path.exists(RESULTS_PATH), index=False)
+
+    if save_thresholds:
+        for row in results:
+            thresholds[f"{row['Site']}/{row['Benchmark']}"] = round(row["Median s"] * THRESHOLD_HEADROOM, 4)
+        with open(THRESHOLDS_PATH, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2, sort_keys=True)
+        print(f"Thresholds saved to {THRESHOLDS_PATH}")
+
+    regressions = df[df["Status"] == "REGRESSION"]
+    if not regressions.empty:
+        print(f"\n{len(regressions)} benchmark(s) slower than their threshold")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scrapers, cleaners and dashboard loading")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in ("record", "run"):
+        sub = subparsers.add_parser(command)
+        sub.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+        sub.add_argument("--browser", action="store_true", help="Include the Selenium extractors (needs Chrome)")
+    subparsers.choices["run"].add_argument("--repeat", type=int, default=5)
+    subparsers.choices["run"].add_argument("--save-thresholds", action="store_true",
+                                           help="Store the measured medians (+50%%) as regression thresholds")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.sites, args.browser)
+    else:
+        sys.exit(run(args.sites, args.repeat, args.browser, args.save_thresholds))
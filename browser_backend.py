@@ -0,0 +1,449 @@
+import os
+import json
+import time
+import asyncio
+import fnmatch
+import logging
+import argparse
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+
+from sites import SITES
+from browser_profile import new_driver, blocked_patterns, current_target, tab_performance_entries, report_page
+from tab_executor import with_page, JOB_TIMEOUT
+from collection_crawler import CARD_SELECTOR, TITLE_SELECTORS, PRICE_SELECTORS, site_categories
+from instrumentation import span, count
+
+try:
+    from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeout
+except ImportError:  # optional; the Selenium backend needs nothing extra
+    async_playwright = None
+    PlaywrightError = PlaywrightTimeout = WebDriverException
+
+# SCRAPER_BROWSER=playwright runs the scrapers' extractors on Playwright when it is installed
+BACKEND = os.environ.get("SCRAPER_BROWSER", "selenium")
+CONCURRENCY = 10  # pages open at once in run_pages
+PAGES = 30  # category pages per site in the backend comparison
+
+# What the extractors catch where they used to catch WebDriverException
+BROWSER_ERRORS = (WebDriverException, PlaywrightError)
+
+
+class ElementMissing(LookupError):
+    """No element matched; the backend-neutral NoSuchElementException"""
+
+
+def is_xpath(selector):
+    return selector.startswith(("/", "./", "(", ".."))
+
+
+class Element:
+    """An element of a Page. Selectors are XPath when they start with / . or (, else CSS."""
+
+    async def scroll_into_view(self):
+        await self.page.evaluate("arguments[0].scrollIntoView({block:'center'});", self)
+
+    async def html(self):
+        return await self.attribute("outerHTML") or ""
+
+    async def hrefs(self, css):
+        """href of every descendant matching css, in one round trip"""
+        return await self.page.evaluate(
+            "return Array.from(arguments[0].querySelectorAll(arguments[1]), a => a.href);", self, css
+        )
+
+
+class Page:
+    """The browser calls the extractors make, as coroutines, so one extractor runs on either backend.
+
+    Pages: goto, wait_for, find, find_all, evaluate, report, json_responses.
+    Elements: find, find_all, text, attribute, click, hover, scroll_into_view, html, hrefs.
+    find raises ElementMissing and wait_for raises TimeoutError, like find_element and
+    WebDriverWait.until. evaluate takes a Selenium-style script body reading arguments[i].
+    """
+
+    @staticmethod
+    def _unwrap(value):
+        return value.element if isinstance(value, SeleniumElement) else value.handle if isinstance(value, PlaywrightElement) else value
+
+
+# ------------------------------- SELENIUM -----------------------------------------------
+
+def _locator(selector):
+    return (By.XPATH if is_xpath(selector) else By.CSS_SELECTOR, selector)
+
+
+class SeleniumElement(Element):
+    def __init__(self, page, element):
+        self.page = page
+        self.element = element
+
+    async def find(self, selector):
+        return await self.page._find(self.element, selector)
+
+    async def find_all(self, selector):
+        return await self.page._find_all(self.element, selector)
+
+    async def text(self):
+        return (await self.page.call(lambda: self.element.text)).strip()
+
+    async def attribute(self, name):
+        return await self.page.call(self.element.get_attribute, name)
+
+    async def click(self):
+        await self.page.call(self.element.click)
+
+    async def hover(self):
+        await self.page.call(lambda: ActionChains(self.page.driver).move_to_element(self.element).perform())
+
+
+class SeleniumPage(Page):
+    """A WebDriver session behind the Page interface; each command runs in a worker thread"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._lock = asyncio.Lock()
+        self._entries = []
+        self._target = None  # DevTools target id of the tab, looked up on the first log read
+
+    async def call(self, func, *args):
+        # A session takes one command at a time
+        async with self._lock:
+            return await asyncio.to_thread(func, *args)
+
+    async def _find(self, root, selector):
+        try:
+            return SeleniumElement(self, await self.call(root.find_element, *_locator(selector)))
+        except NoSuchElementException:
+            raise ElementMissing(selector) from None
+
+    async def _find_all(self, root, selector):
+        return [SeleniumElement(self, element) for element in await self.call(root.find_elements, *_locator(selector))]
+
+    async def goto(self, url):
+        self._entries = []
+        with span("selenium_get", url=url):
+            await self.call(self.driver.get, url)
+
+    async def wait_for(self, selector, timeout=10, visible=False):
+        condition = EC.element_to_be_clickable if visible else EC.presence_of_element_located
+        try:
+            element = await self.call(WebDriverWait(self.driver, timeout).until, condition(_locator(selector)))
+        except TimeoutException:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {selector}") from None
+        return SeleniumElement(self, element)
+
+    async def find(self, selector):
+        return await self._find(self.driver, selector)
+
+    async def find_all(self, selector):
+        return await self._find_all(self.driver, selector)
+
+    async def evaluate(self, script, *args):
+        return await self.call(self.driver.execute_script, script, *[self._unwrap(arg) for arg in args])
+
+    async def _read_log(self):
+        # Reading the performance log drains it, so every read is kept for json_responses.
+        # Tabs of one session share the log; only this tab's entries are taken.
+        if self._target is None:
+            self._target = await self.call(current_target, self.driver) or ""
+        entries = await self.call(tab_performance_entries, self.driver, self._target or None)
+        self._entries.extend(entries or [])
+        return entries
+
+    async def report(self, url):
+        entries = await self._read_log()
+        return report_page(self.driver, url, entries) if entries is not None else None
+
+    async def json_responses(self, patterns):
+        """(url, data) of the JSON responses since goto whose URL matches one of the patterns"""
+        await self._read_log()
+        candidates = {}
+        for entry in self._entries:
+            message = json.loads(entry["message"])["message"]
+            if message.get("method") == "Network.responseReceived":
+                response = message.get("params", {}).get("response", {})
+                if "json" in response.get("mimeType", "") and any(p.search(response.get("url", "")) for p in patterns):
+                    candidates[message["params"]["requestId"]] = response["url"]
+
+        responses = []
+        for request_id, url in candidates.items():
+            try:
+                body = await self.call(self.driver.execute_cdp_cmd, "Network.getResponseBody", {"requestId": request_id})
+                responses.append((url, json.loads(body.get("body", ""))))
+            except (WebDriverException, json.JSONDecodeError) as e:
+                logging.debug(f"No JSON body for {url}: {e}")
+        return responses
+
+
+class SeleniumBackend:
+    """Every page is a Chrome session of its own"""
+
+    name = "selenium"
+
+    def __init__(self, site_name=None):
+        self.site_name = site_name
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def new_page(self):
+        return SeleniumPage(await asyncio.to_thread(new_driver, self.site_name))
+
+    async def close_page(self, page):
+        try:
+            await asyncio.to_thread(page.driver.quit)
+        except WebDriverException as e:
+            logging.debug(f"Quitting the browser failed: {e}")
+
+
+# ------------------------------- PLAYWRIGHT -----------------------------------------------
+
+def _playwright_selector(selector):
+    return f"xpath={selector}" if is_xpath(selector) else selector
+
+
+class PlaywrightElement(Element):
+    def __init__(self, page, handle):
+        self.page = page
+        self.handle = handle
+
+    async def find(self, selector):
+        handle = await self.handle.query_selector(_playwright_selector(selector))
+        if handle is None:
+            raise ElementMissing(selector)
+        return PlaywrightElement(self.page, handle)
+
+    async def find_all(self, selector):
+        return [PlaywrightElement(self.page, handle) for handle in await self.handle.query_selector_all(_playwright_selector(selector))]
+
+    async def text(self):
+        return (await self.handle.inner_text()).strip()
+
+    async def attribute(self, name):
+        # The property when there is one, like Selenium's get_attribute (absolute hrefs)
+        return await self.handle.evaluate(
+            "(el, name) => typeof el[name] === 'string' ? el[name] : el.getAttribute(name)", name
+        )
+
+    async def click(self):
+        await self.handle.click()
+
+    async def hover(self):
+        await self.handle.hover()
+
+
+class PlaywrightPage(Page):
+    """A Playwright tab behind the Page interface; its calls share the caller's event loop"""
+
+    def __init__(self, page):
+        self.page = page
+        self.loaded = self.blocked = 0
+        self._responses = []
+        page.on("response", self._responses.append)
+        page.on("requestfinished", self._finished)
+
+    def _finished(self, request):
+        self.loaded += 1
+
+    async def goto(self, url):
+        self._responses = []
+        self.loaded = self.blocked = 0
+        with span("playwright_get", url=url):
+            await self.page.goto(url, wait_until="domcontentloaded")
+
+    async def wait_for(self, selector, timeout=10, visible=False):
+        try:
+            handle = await self.page.wait_for_selector(
+                _playwright_selector(selector), state="visible" if visible else "attached", timeout=timeout * 1000
+            )
+        except PlaywrightTimeout:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {selector}") from None
+        return PlaywrightElement(self, handle)
+
+    async def find(self, selector):
+        handle = await self.page.query_selector(_playwright_selector(selector))
+        if handle is None:
+            raise ElementMissing(selector)
+        return PlaywrightElement(self, handle)
+
+    async def find_all(self, selector):
+        return [PlaywrightElement(self, handle) for handle in await self.page.query_selector_all(_playwright_selector(selector))]
+
+    async def evaluate(self, script, *args):
+        return await self.page.evaluate(f"(args) => (function() {{ {script} }}).apply(null, args)",
+                                        [self._unwrap(arg) for arg in args])
+
+    async def report(self, url):
+        count("requests_loaded", self.loaded)
+        count("requests_blocked", self.blocked)
+        logging.info(f"{url}: {self.loaded} requests, {self.blocked} blocked")
+        return {"requests": self.loaded, "blocked": self.blocked}
+
+    async def json_responses(self, patterns):
+        responses = []
+        for response in self._responses:
+            if "json" in response.headers.get("content-type", "") and any(p.search(response.url) for p in patterns):
+                try:
+                    responses.append((response.url, await response.json()))
+                except (PlaywrightError, ValueError) as e:
+                    logging.debug(f"No JSON body for {response.url}: {e}")
+        return responses
+
+
+class PlaywrightBackend:
+    """Every page is a tab of one headless Chromium, driven from one event loop"""
+
+    name = "playwright"
+
+    def __init__(self, site_name=None):
+        if async_playwright is None:
+            raise RuntimeError("Playwright is not installed (pip install playwright && playwright install chromium)")
+        self.site_name = site_name
+        # The same blocking profile as the Selenium sessions; page.route takes a URL predicate.
+        # CDP globs only know *, so a ? stays literal here too
+        self.patterns = [pattern.replace("?", "[?]") for pattern in blocked_patterns(site_name)]
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(headless=True, args=["--blink-settings=imagesEnabled=false"])
+        self.context = await self.browser.new_context()
+        count("playwright_sessions")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.browser.close()
+        await self._playwright.stop()
+        return False
+
+    async def new_page(self):
+        page = PlaywrightPage(await self.context.new_page())
+
+        async def block(route):
+            page.blocked += 1
+            await route.abort()
+
+        await page.page.route(self.blocked, block)
+        return page
+
+    def blocked(self, url):
+        return any(fnmatch.fnmatch(url, pattern) for pattern in self.patterns)
+
+    async def close_page(self, page):
+        await page.page.close()
+
+
+BACKENDS = {"selenium": SeleniumBackend, "playwright": PlaywrightBackend}
+
+
+# ------------------------------- RUNNING EXTRACTORS -----------------------------------------------
+
+async def run_pages(backend, urls, extractor, concurrency=CONCURRENCY):
+    """{url: extractor(page) result, or the exception it raised}, with at most concurrency pages
+    open at once; pages are reused from one url to the next"""
+    pages = asyncio.Queue()
+    for page in await asyncio.gather(*(backend.new_page() for _ in range(max(1, min(concurrency, len(urls)))))):
+        pages.put_nowait(page)
+
+    async def one(url):
+        page = await pages.get()
+        try:
+            await page.goto(url)
+            return await extractor(page)
+        finally:
+            pages.put_nowait(page)
+
+    try:
+        results = await asyncio.gather(*(one(url) for url in urls), return_exceptions=True)
+    finally:
+        while not pages.empty():
+            await backend.close_page(pages.get_nowait())
+    return dict(zip(urls, results))
+
+
+async def _run_playwright(url, extractor, site_name):
+    async with PlaywrightBackend(site_name) as backend:
+        page = await backend.new_page()
+        await page.goto(url)
+        return await extractor(page)
+
+
+def run_extractor(url, extractor, site_name, tabs=None, timeout=JOB_TIMEOUT):
+    """Run the coroutine extractor(page) on url from a scraper thread: on Playwright when
+    SCRAPER_BROWSER=playwright and it is installed, else on Selenium in a tab of the shared browser,
+    where timeout bounds the job once its tab starts loading it"""
+    if BACKEND == "playwright":
+        if async_playwright is not None:
+            return asyncio.run(_run_playwright(url, extractor, site_name))
+        logging.warning("SCRAPER_BROWSER=playwright but Playwright is not installed; using Selenium")
+    return with_page(url, lambda driver: asyncio.run(extractor(SeleniumPage(driver))), site_name, tabs, timeout)
+
+
+# ------------------------------- BACKEND COMPARISON -----------------------------------------------
+
+async def _first_text(card, selectors):
+    for selector in selectors:
+        try:
+            return await (await card.find(selector)).text()
+        except ElementMissing:
+            continue
+    return None
+
+
+async def listing_cards(page):
+    """Name and price of every product card on a rendered category listing"""
+    products = []
+    for card in await page.find_all(CARD_SELECTOR):
+        name = await _first_text(card, TITLE_SELECTORS)
+        if name:
+            products.append({"name": name, "price": await _first_text(card, PRICE_SELECTORS)})
+    return products
+
+
+def compare(site_name, backend_names, pages=PAGES, concurrency=CONCURRENCY):
+    """Render the site's category pages on each backend and print the throughput"""
+    urls = [url for _, _, url in site_categories(site_name)][:pages]
+    if not urls:
+        print(f"No category pages to compare for {site_name}")
+        return {}
+
+    results = {}
+    for name in backend_names:
+        if name == "playwright" and async_playwright is None:
+            print("Playwright is not installed; skipping it")
+            continue
+
+        async def measure():
+            async with BACKENDS[name](site_name) as backend:
+                started = time.perf_counter()
+                pages_done = await run_pages(backend, urls, listing_cards, concurrency)
+                return pages_done, time.perf_counter() - started
+
+        with span("backend_compare", backend=name, site=site_name):
+            pages_done, elapsed = asyncio.run(measure())
+        done = [result for result in pages_done.values() if not isinstance(result, Exception)]
+        products = sum(len(result) for result in done)
+        results[name] = {"pages": len(done), "failed": len(urls) - len(done), "products": products,
+                         "seconds": round(elapsed, 2), "pages_per_second": round(len(done) / elapsed, 2)}
+        print(f"{site_name} on {name}: {len(done)}/{len(urls)} pages, {products} products "
+              f"in {elapsed:.1f}s ({len(done) / elapsed:.2f} pages/s, {concurrency} at once)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare page throughput of the Selenium and Playwright backends")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--pages", type=int, default=PAGES)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="Pages open at once; on Selenium every page is a Chrome process")
+    args = parser.parse_args()
+    for site_name in args.sites:
+        compare(site_name, args.backends, args.pages, args.concurrency)
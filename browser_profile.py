@@ -0,0 +1,202 @@
+import re
+import json
+import time
+import logging
+import argparse
+import threading
+import weakref
+from collections import Counter
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+
+from sites import SITES
+from instrumentation import span, count
+
+# Requests the scrapers never need: they only read DOM text and attributes
+BLOCKED_URLS = {
+    "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m3u8"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*connect.facebook.net*",
+        "*facebook.com/tr*", "*analytics.tiktok.com*", "*hotjar.com*", "*clarity.ms*", "*snap.licdn.com*",
+    ],
+    "widgets": ["*tawk.to*", "*zopim.com*", "*crisp.chat*", "*youtube.com/embed*", "*maps.googleapis.com*"],
+}
+
+# Whole-URL globs of one file extension; asset URLs usually carry ?v= or ?ver=, so they also
+# get a query-string variant ("*.jpg" alone would never match "/cat.jpg?v=3")
+EXTENSION_PATTERN = re.compile(r"^\*\.\w+$")
+
+# Per-site additions (deny) and default patterns a site's pages still need (allow)
+SITE_PROFILES = {
+    "Abed Tahhan": {"deny": ["*monorail-edge.shopifysvc.com*", "*/web-pixels*", "*shop.app*"], "allow": []},
+    "Beytech": {"deny": ["*wp-content/plugins/*whatsapp*"], "allow": []},
+    "Hamdan electronics": {"deny": [], "allow": []},
+}
+
+
+def blocked_patterns(site_name=None):
+    profile = SITE_PROFILES.get(site_name, {"deny": [], "allow": []})
+    patterns = [pattern for group in BLOCKED_URLS.values() for pattern in group]
+    patterns = [pattern for pattern in patterns if pattern not in profile["allow"]] + profile["deny"]
+    return [variant for pattern in patterns
+            for variant in ((pattern, pattern + "?*") if EXTENSION_PATTERN.match(pattern) else (pattern,))]
+
+
+def chrome_options(block=True):
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    # Hand the DOM over at DOMContentLoaded; callers wait for the elements they read
+    options.page_load_strategy = "eager"
+    if block:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def apply_blocking(driver, site_name=None):
+    """Send the site's blocking profile to the driver's current tab; DevTools network state is per tab"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_patterns(site_name)})
+
+
+def new_driver(site_name=None, block=True):
+    """Headless Chrome with the site's blocking profile applied through the DevTools protocol"""
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options(block))
+    count("webdriver_sessions")
+    if block:
+        apply_blocking(driver, site_name)
+    return driver
+
+
+def wait_for(driver, xpath, timeout=10):
+    """Wait until xpath matches, instead of sleeping a fixed time after an eager page load"""
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.XPATH, xpath)))
+        return True
+    except TimeoutException:
+        logging.warning(f"Timed out after {timeout}s waiting for {xpath}")
+        return False
+
+
+def performance_entries(driver):
+    """Chrome's performance log since the last read (reading drains it), or None"""
+    try:
+        return driver.get_log("performance")
+    except WebDriverException as e:
+        logging.debug(f"No performance log: {e}")
+        return None
+
+
+# driver -> {target id: performance log entries its tab has not read yet}
+_tab_logs = weakref.WeakKeyDictionary()
+_tab_logs_lock = threading.Lock()
+
+
+def current_target(driver):
+    """DevTools target id of the driver's current tab, or None; log entries name it as their webview"""
+    try:
+        return driver.execute_cdp_cmd("Target.getTargetInfo", {})["targetInfo"]["targetId"]
+    except (WebDriverException, KeyError) as e:
+        logging.debug(f"No target id for the current tab: {e}")
+        return None
+
+
+def tab_performance_entries(driver, target_id):
+    """performance_entries of one tab, or None. The log belongs to the whole session, so it is
+    drained here and the entries of the session's other tabs stay buffered until they read."""
+    if target_id is None:
+        return performance_entries(driver)
+    entries = performance_entries(driver)
+    with _tab_logs_lock:
+        buffers = _tab_logs.setdefault(driver, {})
+        for entry in entries or []:
+            webview = json.loads(entry["message"]).get("webview", target_id)
+            buffers.setdefault(webview, []).append(entry)
+        mine = buffers.pop(target_id, [])
+    return mine if entries is not None or mine else None
+
+
+def network_summary(driver, entries=None):
+    """Requests loaded and blocked since the last log read, from Chrome's performance log"""
+    entries = entries if entries is not None else performance_entries(driver)
+    if entries is None:
+        return None
+
+    resource_types = {}
+    loaded = blocked = loaded_bytes = 0
+    blocked_types = Counter()
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            resource_types[params["requestId"]] = params.get("type", "Other")
+        elif method == "Network.loadingFinished":
+            loaded += 1
+            loaded_bytes += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            blocked += 1
+            blocked_types[resource_types.get(params["requestId"], params.get("type", "Other"))] += 1
+    return {"requests": loaded, "bytes": loaded_bytes, "blocked": blocked, "blocked_types": dict(blocked_types)}
+
+
+def report_page(driver, url, entries=None):
+    """Log and count what one page load fetched and what the profile kept it from fetching"""
+    summary = network_summary(driver, entries)
+    if summary is None:
+        return None
+    count("requests_loaded", summary["requests"])
+    count("bytes_loaded", summary["bytes"])
+    count("requests_blocked", summary["blocked"])
+    logging.info(
+        f"{url}: {summary['requests']} requests, {summary['bytes'] / 1024:.0f} KiB loaded, "
+        f"{summary['blocked']} blocked {summary['blocked_types']}"
+    )
+    return summary
+
+
+def compare(site_name, url=None):
+    """Load a site's homepage with and without the profile and print what blocking saved"""
+    url = url or SITES[site_name]["url"]
+    results = {}
+    for label, block in (("unblocked", False), ("profile", True)):
+        driver = new_driver(site_name, block=block)
+        try:
+            if not block:
+                driver.execute_cdp_cmd("Network.enable", {})
+            started = time.perf_counter()
+            with span("selenium_get", url=url, profile=label):
+                driver.get(url)
+            elapsed = time.perf_counter() - started
+            time.sleep(3)  # let late requests land in the log
+            summary = network_summary(driver) or {"requests": 0, "bytes": 0, "blocked": 0}
+            memory = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+            results[label] = {**summary, "seconds": round(elapsed, 2), "js_heap": memory}
+        finally:
+            driver.quit()
+
+    before, after = results["unblocked"], results["profile"]
+    print(f"{site_name}: {before['requests'] - after['requests']} requests and "
+          f"{(before['bytes'] - after['bytes']) / 1024:.0f} KiB avoided, "
+          f"page load {before['seconds']}s -> {after['seconds']}s, "
+          f"JS heap {before['js_heap']} -> {after['js_heap']} bytes")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure what the browser profile saves on each site's homepage")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    args = parser.parse_args()
+    for site_name in args.sites:
+        compare(site_name)
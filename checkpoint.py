@@ -0,0 +1,97 @@
+import os
+import json
+import glob
+import logging
+from datetime import datetime
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+
+from instrumentation import count
+
+JOURNAL_DIR = ".checkpoints"
+WINDOW_FORMAT = "%Y%m%d%H"  # one journal per task per hour, matching the scrape schedule
+BROWSER_LOST_MESSAGES = ("invalid session id", "chrome not reachable", "disconnected", "session deleted",
+                         "browser has been closed", "target closed")
+
+
+class RunJournal:
+    """Rows of each finished section, flushed to disk as soon as the section is done.
+
+    A rerun in the same hourly window restores finished sections from the journal instead
+    of walking them again, and reuses the first attempt's timestamp. The journal is removed
+    once the extractor has written its CSV; journals of earlier windows are pruned.
+    """
+
+    def __init__(self, folder_name, task, window=None):
+        self.window = window or datetime.now().strftime(WINDOW_FORMAT)
+        self.directory = os.path.join(folder_name, JOURNAL_DIR)
+        self.path = os.path.join(self.directory, f"{task}-{self.window}.jsonl")
+        self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.sections = {}
+
+        for old_path in glob.glob(os.path.join(self.directory, f"{task}-*.jsonl")):
+            if old_path != self.path:
+                os.remove(old_path)
+
+        if os.path.exists(self.path):
+            damaged = False
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        damaged = True
+                        continue
+                    if not self.sections:
+                        self.timestamp = entry["timestamp"]
+                    self.sections[entry["section"]] = entry["rows"]
+            if damaged:
+                # A crash mid-write leaves a partial last line; rewrite so appends start clean
+                logging.warning(f"Dropping a partly written entry from {self.path}")
+                sections, self.sections = self.sections, {}
+                os.remove(self.path)
+                for key, rows in sections.items():
+                    self.record(key, rows)
+            print(f"Resuming {task}: {len(self.sections)} section(s) already finished this hour")
+
+    def done(self, key):
+        return key in self.sections
+
+    def restore(self, key):
+        count("sections_resumed")
+        return self.sections[key]
+
+    def record(self, key, rows):
+        self.sections[key] = rows
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"section": key, "timestamp": self.timestamp, "rows": rows}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def finish(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def browser_lost(error):
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    # Playwright's errors come from its own package; both name a lost browser in the message
+    browser_error = isinstance(error, WebDriverException) or type(error).__module__.startswith("playwright")
+    return browser_error and any(message in str(error).lower() for message in BROWSER_LOST_MESSAGES)
+
+
+def raise_if_browser_lost(error, driver=None):
+    """Re-raise when Chrome is gone, so the task fails and its retry resumes from the journal
+    instead of recording every remaining section as empty"""
+    if not browser_lost(error):
+        return
+    logging.error(f"Browser session lost: {error}")
+    # Pages from browser_backend are closed by whoever opened them
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug(f"Quitting the lost session failed: {e}")
+    raise error
@@ -0,0 +1,258 @@
+import os
+import time
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from itertools import zip_longest
+from urllib.parse import urljoin, urlparse, urlencode, parse_qsl, urlunparse
+
+import requests
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import structured_data
+from sites import SITES, site_path
+from link_graph import normalise_domain, normalise_url
+from instrumentation import span, count
+from product_dedup import dedupe_products
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+CATALOGUE_FILE = "catalogue.csv"
+PER_HOST = 2  # requests in flight per shop
+DELAY = 0.5  # seconds between request starts on one shop
+MAX_PAGES = 50  # listing pages per category
+BUDGET_MINUTES = 20  # the crawl shares the hourly window with the scrapers
+
+# Static listing cards: PrestaShop miniatures, WooCommerce loop items and Flatsome boxes.
+# Field selectors are tried in order, so a sale price wins over the price wrapper.
+CARD_SELECTOR = "article.product-miniature, li.product, div.product-small.box"
+TITLE_SELECTORS = (".product-title", ".woocommerce-loop-product__title", ".productName", "[itemprop=name]")
+PRICE_SELECTORS = (".price ins .amount", ".price .amount", "span.price")
+ORIGINAL_PRICE_SELECTORS = (".price del .amount", "span.regular-price")
+
+CATALOGUE_COLUMNS = [
+    "Timestamp", "Main Category", "Category", "Product Name", "Current Price",
+    "Original Price", "Product URL", "Sections", "Product Key",
+]
+
+
+class HostLimiter:
+    """At most per_host requests in flight per host, started at least delay seconds apart"""
+
+    def __init__(self, per_host=PER_HOST, delay=DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._slots.setdefault(host, threading.Semaphore(self.per_host))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.delay
+            time.sleep(start - now)
+            yield
+
+
+def _first(card, selectors):
+    for selector in selectors:
+        tag = card.select_one(selector)
+        if tag:
+            return tag
+    return None
+
+
+def _text(card, selectors):
+    tag = _first(card, selectors)
+    return tag.get_text(" ", strip=True) if tag else None
+
+
+def listing_products(soup, page_url):
+    """Products of one static listing page: microdata when the cards carry it, else the card markup"""
+    products = []
+    microdata = structured_data.microdata_products(soup)
+    if microdata:
+        for scope, product in microdata:
+            card = scope if scope.name == "article" else scope.find_parent("article") or scope
+            products.append({
+                "name": product["name"],
+                "price": _text(card, ("span.price",)) or product["price"],
+                "original_price": _text(card, ORIGINAL_PRICE_SELECTORS),
+                "url": product["url"],
+            })
+    else:
+        for card in soup.select(CARD_SELECTOR):
+            title = _first(card, TITLE_SELECTORS)
+            link = (title.find("a", href=True) if title else None) or card.find("a", href=True)
+            products.append({
+                "name": title.get_text(" ", strip=True) if title else None,
+                "price": _text(card, PRICE_SELECTORS),
+                "original_price": _text(card, ORIGINAL_PRICE_SELECTORS),
+                "url": link["href"] if link else None,
+            })
+
+    for product in products:
+        product["url"] = normalise_url(product["url"], page_url) if product["url"] else None
+    return [product for product in products if product["name"] and product["url"]]
+
+
+def page_url(url, page, platform):
+    """Listing page N of a category: /page/N/ on WooCommerce, ?page=N elsewhere"""
+    if page == 1:
+        return url
+    if platform == "woocommerce":
+        parsed = urlparse(url)
+        return urlunparse(parsed._replace(path=parsed.path.rstrip("/") + f"/page/{page}/"))
+    parsed = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parsed.query) if k != "page"] + [("page", str(page))]
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def site_categories(site_name):
+    """(main category, category, url) of every on-site category link in navbar.csv"""
+    path = site_path(site_name, "data_folder", "navbar.csv")
+    if not os.path.exists(path):
+        print(f"No navbar.csv for {site_name}; run the scraper first")
+        return []
+    df = pd.read_csv(path)
+    if "URL" not in df.columns:
+        print(f"navbar.csv of {site_name} has no URL column yet")
+        return []
+
+    domain = SITES[site_name]["domain"]
+    categories = {}
+    df = df.dropna(subset=["URL"])
+    for main_category, subcategory, href in zip(df["Main Category"], df["Subcategory"], df["URL"]):
+        url = normalise_url(href, SITES[site_name]["url"]) if href != "N/A" else None
+        if not url or normalise_domain(urlparse(url).netloc) != domain:
+            continue
+        if SITES[site_name]["platform"] == "shopify" and not structured_data.url_slug(url, "collections"):
+            continue
+        subcategory = subcategory if isinstance(subcategory, str) and subcategory != "N/A" else None
+        categories.setdefault(url, (main_category, subcategory or main_category, url))
+    return list(categories.values())
+
+
+class CatalogueCrawler:
+    """Walks every category's listing pages over plain HTTP, a few requests per shop at a time"""
+
+    def __init__(self, per_host=PER_HOST, delay=DELAY, max_pages=MAX_PAGES, budget_minutes=BUDGET_MINUTES):
+        self.limiter = HostLimiter(per_host, delay)
+        self.per_host = per_host
+        self.max_pages = max_pages
+        self.deadline = time.monotonic() + budget_minutes * 60
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers.update(HEADERS)
+        return self._local.session
+
+    def get(self, url):
+        with self.limiter.slot(url), span("catalogue_page", url=url):
+            response = self.session.get(url, timeout=15)
+        count("catalogue_pages")
+        return response
+
+    def crawl_category(self, site_name, main_category, category, url):
+        platform = SITES[site_name]["platform"]
+        base_url = SITES[site_name]["url"]
+        products = {}
+
+        for page in range(1, self.max_pages + 1):
+            if time.monotonic() > self.deadline:
+                count("catalogue_budget_exhausted")
+                logging.warning(f"Catalogue budget used up at {url} page {page}")
+                break
+
+            if platform == "shopify":
+                # The collection's JSON is the endpoint its infinite scroll pages through
+                collection = structured_data.url_slug(url, "collections")
+                target = urljoin(base_url, f"/collections/{collection}/products.json?limit=250&page={page}")
+                response = self.get(target)
+                if response.status_code == 404:
+                    break
+                response.raise_for_status()
+                batch = [structured_data.shopify_fields(product, base_url) for product in response.json().get("products", [])]
+            else:
+                target = page_url(url, page, platform)
+                response = self.get(target)
+                if response.status_code == 404 or (page > 1 and normalise_url(response.url, response.url) == url):
+                    break  # past the last page (WooCommerce 404s, some themes redirect to page 1)
+                response.raise_for_status()
+                batch = listing_products(BeautifulSoup(response.text, "html.parser"), target)
+
+            new = [product for product in batch if product["url"] not in products]
+            if not new:
+                break
+            products.update((product["url"], product) for product in new)
+
+        return [{
+            "Main Category": main_category,
+            "Category": category,
+            "Product Name": product["name"],
+            "Current Price": product["price"] or "N/A",
+            "Original Price": product["original_price"] or product["price"] or "N/A",
+            "Product URL": product["url"],
+        } for product in products.values()]
+
+    def crawl(self, site_names):
+        """{site: rows}; categories of different shops are interleaved so every host stays busy"""
+        per_site = [[(site_name, *category) for category in site_categories(site_name)] for site_name in site_names]
+        jobs = [job for group in zip_longest(*per_site) for job in group if job]
+        rows = {site_name: [] for site_name in site_names}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.per_host * len(site_names))) as pool:
+            futures = {pool.submit(self.crawl_category, *job): job for job in jobs}
+            for future in as_completed(futures):
+                site_name, _, category, url = futures[future]
+                try:
+                    rows[site_name].extend(future.result())
+                except Exception as e:
+                    count("catalogue_errors")
+                    print(f"Error crawling {category} ({url}): {e}")
+        return rows
+
+
+def crawl_catalogues(site_names=None, **options):
+    """Snapshot the full catalogue of each site to <data folder>/catalogue.csv"""
+    site_names = list(site_names or SITES)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    results = CatalogueCrawler(**options).crawl(site_names)
+
+    snapshots = {}
+    for site_name, rows in results.items():
+        if not rows:
+            print(f"No catalogue products found for {site_name}")
+            continue
+        df = dedupe_products(pd.DataFrame(rows).assign(Timestamp=timestamp), section_column="Category")
+        df = df[CATALOGUE_COLUMNS]
+        path = site_path(site_name, "data_folder", CATALOGUE_FILE)
+        df.to_csv(path, index=False)
+        count("catalogue_products", len(df))
+        print(f"Catalogue of {len(df)} products saved to {path}")
+        snapshots[site_name] = df
+    return snapshots
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl every navbar category's listing pages into catalogue.csv")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    parser.add_argument("--delay", type=float, default=DELAY)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    parser.add_argument("--budget-minutes", type=float, default=BUDGET_MINUTES)
+    args = parser.parse_args()
+    crawl_catalogues(args.sites, per_host=args.per_host, delay=args.delay,
+                     max_pages=args.max_pages, budget_minutes=args.budget_minutes)
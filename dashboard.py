@@ -1,38 +1,23 @@
 import streamlit as st
 import pandas as pd
-import os
-import matplotlib.pyplot as plt
 import plotly.express as px
-import plotly.graph_objects as go
 import altair as alt
 from itertools import cycle
 
+from dashboard_data import companies, load_company_data as read_company_data, load_link_analysis, load_link_summary, load_price_comparison, load_product_tags
+
 # Set Streamlit page configuration
 st.set_page_config(page_title="SEO Analysis Dashboard", layout="wide")
 
-# Company folder and file mapping
-companies = {
-    "Abed Tahhan": {
-        "seo_path": "Abed Tahhan/csv",
-        "products_path": "Abed_Csv"
-    },
-    "Beytech": {
-        "seo_path": "Beytech/csv",
-        "products_path": "Beytech_Csv"
-    },
-    "Hamdan electronics": {
-        "seo_path": "Hamdan electronics/csv",
-        "products_path": "Hamdan_Csv"
-    }
-}
-
 # Sidebar: Select companies for comparison
+# Only these two controls rerun the whole page; every panel below is a fragment that
+# reruns on its own widgets, and draws figures memoised on that panel's inputs.
 st.sidebar.title("📊 Company Selector")
 comparison_mode = st.sidebar.checkbox("Enable Comparison Mode", False)
 
 if comparison_mode:
     selected_companies = st.sidebar.multiselect(
-        "Choose Companies to Compare", 
+        "Choose Companies to Compare",
         list(companies.keys()),
         default=list(companies.keys())[:2]
     )
@@ -43,27 +28,37 @@ if comparison_mode:
 else:
     selected_company = st.sidebar.selectbox("Choose a Company", list(companies.keys()))
     selected_companies = [selected_company]
-    
+
+# Cached functions take company names as a tuple, so it hashes cheaply and in a fixed order
+selected = tuple(selected_companies)
+
+# The scrapers rewrite the CSVs every hour; cached data and figures expire well before the next run
+DATA_TTL = 600
 
 
 # Cache the data loading
-@st.cache_data
+@st.cache_data(ttl=DATA_TTL)
 def load_company_data(seo_path, products_path):
-    data = {
-        "meta_data": pd.read_csv(os.path.join(seo_path, "meta_data.csv")),
-        "backlinks": pd.read_csv(os.path.join(products_path, "backlinks.csv")),
-        "navbar": pd.read_csv(os.path.join(seo_path, "navbar.csv")),
-        "seo_keywords": pd.read_csv(os.path.join(seo_path, "seo_keywords.csv")),
-        "tfidf_keywords": pd.read_csv(os.path.join(seo_path, "tfidf_keywords.csv")),
-        "products":  pd.read_csv(os.path.join(products_path, "cleaned_Csv.csv"), parse_dates=["Timestamp"])
-    }
-    return data
-
-# Load all selected companies' data
-all_data = {}
-for company_name in selected_companies:
+    return read_company_data(seo_path, products_path)
+
+def company_data(company_name):
     company = companies[company_name]
-    all_data[company_name] = load_company_data(company["seo_path"], company["products_path"])
+    return load_company_data(company["seo_path"], company["products_path"])
+
+@st.cache_data(ttl=DATA_TTL)
+def price_comparison():
+    return load_price_comparison()
+
+@st.cache_data(ttl=DATA_TTL)
+def link_data(company_names):
+    link_pages = {name: load_link_analysis(companies[name]["products_path"]) for name in company_names}
+    return load_link_summary(), {name: df for name, df in link_pages.items() if df is not None}
+
+@st.cache_data(ttl=DATA_TTL)
+def product_tags(company_names):
+    tags = [load_product_tags(companies[name]["products_path"]) for name in company_names]
+    tags = [df.assign(Company=name) for name, df in zip(company_names, tags) if df is not None]
+    return pd.concat(tags, ignore_index=True) if tags else None
 
 # Title
 if comparison_mode:
@@ -77,34 +72,34 @@ def create_comparison_chart(data_dict, metric_func, title, chart_type='bar'):
     metrics = {}
     for company_name, data in data_dict.items():
         metrics[company_name] = metric_func(data)
-    
+
     df = pd.DataFrame.from_dict(metrics, orient='index', columns=['Value'])
     df.reset_index(inplace=True)
     df.rename(columns={'index': 'Company'}, inplace=True)
-    
+
     if chart_type == 'bar':
         fig = px.bar(df, x='Company', y='Value', title=title, color='Company')
     elif chart_type == 'pie':
         fig = px.pie(df, values='Value', names='Company', title=title)
     else:
         fig = px.line(df, x='Company', y='Value', title=title)
-    
+
     return fig
 
 
 #Backlinks
-with st.container():
-    st.subheader("🔗 Backlink Platforms Comparison" if comparison_mode else "🔗 Backlink Platforms")
-    
-    if comparison_mode: 
+@st.cache_data(ttl=DATA_TTL)
+def backlink_figures(company_names, comparison_mode):
+    """Backlink platform charts, or an empty list when no platform or type column exists"""
+    if comparison_mode:
         # Create a combined backlinks DataFrame for comparison
-        
+
         backlinks_dfs = []
-        for company_name, data in all_data.items():
-            df = data["backlinks"].copy()
+        for company_name in company_names:
+            df = company_data(company_name)["backlinks"].copy()
             df['Company'] = company_name
             backlinks_dfs.append(df)
-        
+
         combined_backlinks = pd.concat(backlinks_dfs)
 
         # Use 'Platform' if exists, otherwise try 'Type'
@@ -114,94 +109,99 @@ with st.container():
                 platform_col = col
                 break
 
-        if platform_col:
-            # Comparison of total backlinks
-            total_backlinks = combined_backlinks.groupby('Company').size().reset_index(name='Count')
-            fig_total = px.bar(
-                total_backlinks,
-                x='Company',
-                y='Count',
-                title="Total Backlinks Comparison",
-                color='Company',
-                color_discrete_sequence=px.colors.qualitative.Plotly
-            )
-            st.plotly_chart(fig_total, use_container_width=True)
+        if not platform_col:
+            return []
 
-            platform_counts = combined_backlinks.groupby(['Company', platform_col]).size().reset_index(name='Count')
+        # Comparison of total backlinks
+        total_backlinks = combined_backlinks.groupby('Company').size().reset_index(name='Count')
+        fig_total = px.bar(
+            total_backlinks,
+            x='Company',
+            y='Count',
+            title="Total Backlinks Comparison",
+            color='Company',
+            color_discrete_sequence=px.colors.qualitative.Plotly
+        )
 
-            # Create a complete grid of all companies and all platforms
-            all_companies = combined_backlinks['Company'].unique()
-            all_platforms = combined_backlinks[platform_col].unique()
-            full_index = pd.MultiIndex.from_product([all_companies, all_platforms], names=['Company', platform_col])
-            
-            # Reindex and fill missing combinations with zero
-            platform_counts = platform_counts.set_index(['Company', platform_col]).reindex(full_index, fill_value=0).reset_index()
+        platform_counts = combined_backlinks.groupby(['Company', platform_col]).size().reset_index(name='Count')
 
-            fig_platform = px.bar(
-                platform_counts,
-                x='Company',
-                y='Count',
-                color=platform_col,
-                title=f"Backlinks by {platform_col} Comparison",
-                barmode='group',
-                category_orders={
-                    "Company": list(all_data.keys()),
-                    platform_col: sorted([str(p) for p in all_platforms])
-                }
-            )
+        # Create a complete grid of all companies and all platforms
+        all_companies = combined_backlinks['Company'].unique()
+        all_platforms = combined_backlinks[platform_col].unique()
+        full_index = pd.MultiIndex.from_product([all_companies, all_platforms], names=['Company', platform_col])
 
-            st.plotly_chart(fig_platform, use_container_width=True)
-        else:
-            st.warning("No platform or type column found in backlinks data.")
-    
-    else:
-        # Single company view
-        backlinks_df = all_data[selected_companies[0]]["backlinks"]
+        # Reindex and fill missing combinations with zero
+        platform_counts = platform_counts.set_index(['Company', platform_col]).reindex(full_index, fill_value=0).reset_index()
 
-        # Use 'Platform' if exists, otherwise try 'Type'
-        platform_col = None
-        for col in ["Platform", "Type"]:
-            if col in backlinks_df.columns:
-                platform_col = col
-                break
-
-        if platform_col:
-            backlink_counts = backlinks_df[platform_col].value_counts().reset_index()
-            backlink_counts.columns = [platform_col, "Count"]
-
-            fig = px.pie(
-                backlink_counts,
-                values="Count",
-                names=platform_col,
-                title="Distribution of Backlink Platforms",
-                hole=0.4
-            )
+        fig_platform = px.bar(
+            platform_counts,
+            x='Company',
+            y='Count',
+            color=platform_col,
+            title=f"Backlinks by {platform_col} Comparison",
+            barmode='group',
+            category_orders={
+                "Company": list(company_names),
+                platform_col: sorted([str(p) for p in all_platforms])
+            }
+        )
+        return [fig_total, fig_platform]
+
+    # Single company view
+    backlinks_df = company_data(company_names[0])["backlinks"]
+
+    # Use 'Platform' if exists, otherwise try 'Type'
+    platform_col = None
+    for col in ["Platform", "Type"]:
+        if col in backlinks_df.columns:
+            platform_col = col
+            break
+
+    if not platform_col:
+        return []
+
+    backlink_counts = backlinks_df[platform_col].value_counts().reset_index()
+    backlink_counts.columns = [platform_col, "Count"]
+
+    fig = px.pie(
+        backlink_counts,
+        values="Count",
+        names=platform_col,
+        title="Distribution of Backlink Platforms",
+        hole=0.4
+    )
+    return [fig]
+
+@st.fragment
+def backlinks_panel(company_names, comparison_mode):
+    with st.container():
+        st.subheader("🔗 Backlink Platforms Comparison" if comparison_mode else "🔗 Backlink Platforms")
+        figures = backlink_figures(company_names, comparison_mode)
+        for fig in figures:
             st.plotly_chart(fig, use_container_width=True)
-        else:
+        if not figures:
             st.warning("No platform or type column found in backlinks data.")
 
-# --- Keyword Comparison
-st.subheader("🔑 Keyword Insights Comparison" if comparison_mode else "🔑 Keyword Insights")
+backlinks_panel(selected, comparison_mode)
 
-if comparison_mode:
-    # Top keywords comparison
-    top_n = st.slider("Number of top keywords to compare", 5, 20, 10)
-    
+# --- Keyword Comparison
+@st.cache_data(ttl=DATA_TTL)
+def keyword_comparison_figure(company_names, top_n):
     # Create a combined keywords DataFrame for comparison
     keywords_dfs = []
-    for company_name, data in all_data.items():
-        df = data["seo_keywords"].copy()
+    for company_name in company_names:
+        df = company_data(company_name)["seo_keywords"].copy()
         df['Company'] = company_name
         keywords_dfs.append(df)
-    
+
     combined_keywords = pd.concat(keywords_dfs)
-    
+
     # Get top keywords across all companies
     top_keywords_all = combined_keywords.groupby('Keyword')['Count'].sum().nlargest(top_n).index
-    
+
     # Filter for only the top keywords
     filtered_keywords = combined_keywords[combined_keywords['Keyword'].isin(top_keywords_all)]
-    
+
     # Create comparison chart
     fig = px.bar(
         filtered_keywords,
@@ -212,120 +212,96 @@ if comparison_mode:
         barmode='group'
     )
     fig.update_layout(xaxis={'categoryorder':'total descending'})
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Show individual company keyword data side-by-side
-    st.markdown("### 📊 Top Keyword Frequency Charts per Company")
-
-    charts_per_row = 2  # You can change this to 3 or more based on screen space
-    companies = list(all_data.keys())
-    rows = (len(companies) + charts_per_row - 1) // charts_per_row
-
-    for i in range(rows):
-        cols = st.columns(charts_per_row)
-        for j in range(charts_per_row):
-            idx = i * charts_per_row + j
-            if idx < len(companies):
-                company_name = companies[idx]
-                top_keywords = all_data[company_name]["seo_keywords"].sort_values("Count", ascending=False).head(top_n)
-                fig_freq = px.bar(
-                    top_keywords,
-                    x="Count",
-                    y="Keyword",
-                    orientation="h",
-                    title=f"{company_name} - Top {top_n} Keywords",
-                    color="Count",
-                    color_continuous_scale="Tealgrn"
-                )
-                fig_freq.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    height=top_n * 30 + 150
-                )
-                with cols[j]:
-                    st.plotly_chart(fig_freq, use_container_width=True)
+    return fig
 
-else:
-    # Single company view for keywords
-    data = all_data[selected_companies[0]]
-    col1, col2 = st.columns([1.2, 1])
-    
-    with col1:
-        st.subheader("### 📈 Top Keywords by Frequency")
-        top_keywords = data["seo_keywords"].sort_values("Count", ascending=False).head(20)
-        fig_freq = px.bar(
-            top_keywords,
-            x="Count",
-            y="Keyword",
-            orientation="h",
-            title="Top 20 Keywords by Frequency",
-            color="Count",
-            color_continuous_scale="Tealgrn"
-        )
-        fig_freq.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    height=20 * 30 + 150
-                )
-        st.plotly_chart(fig_freq, use_container_width=True)
+@st.cache_data(ttl=DATA_TTL)
+def keyword_frequency_figure(company_name, top_n, title):
+    top_keywords = company_data(company_name)["seo_keywords"].sort_values("Count", ascending=False).head(top_n)
+    fig_freq = px.bar(
+        top_keywords,
+        x="Count",
+        y="Keyword",
+        orientation="h",
+        title=title,
+        color="Count",
+        color_continuous_scale="Tealgrn"
+    )
+    fig_freq.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        height=top_n * 30 + 150
+    )
+    return fig_freq
+
+@st.fragment
+def keywords_panel(company_names, comparison_mode):
+    st.subheader("🔑 Keyword Insights Comparison" if comparison_mode else "🔑 Keyword Insights")
+
+    if comparison_mode:
+        # Top keywords comparison
+        top_n = st.slider("Number of top keywords to compare", 5, 20, 10)
+        st.plotly_chart(keyword_comparison_figure(company_names, top_n), use_container_width=True)
+
+        # Show individual company keyword data side-by-side
+        st.markdown("### 📊 Top Keyword Frequency Charts per Company")
+
+        charts_per_row = 2  # You can change this to 3 or more based on screen space
+        rows = (len(company_names) + charts_per_row - 1) // charts_per_row
+
+        for i in range(rows):
+            cols = st.columns(charts_per_row)
+            for j in range(charts_per_row):
+                idx = i * charts_per_row + j
+                if idx < len(company_names):
+                    company_name = company_names[idx]
+                    fig_freq = keyword_frequency_figure(company_name, top_n, f"{company_name} - Top {top_n} Keywords")
+                    with cols[j]:
+                        st.plotly_chart(fig_freq, use_container_width=True)
+
+    else:
+        # Single company view for keywords
+        col1, col2 = st.columns([1.2, 1])
+
+        with col1:
+            st.subheader("### 📈 Top Keywords by Frequency")
+            fig_freq = keyword_frequency_figure(company_names[0], 20, "Top 20 Keywords by Frequency")
+            st.plotly_chart(fig_freq, use_container_width=True)
+
+keywords_panel(selected, comparison_mode)
 
 
 # --- Product Data Comparison
-st.sidebar.header("🛍️ Filter Products")
-if comparison_mode:
-    # Apply the same filters to all companies being compared
+@st.cache_data(ttl=DATA_TTL)
+def combined_products(company_names):
+    # The same filters apply to all companies being compared
     products_dfs = []
-    for company_name in selected_companies:
-        products_df = all_data[company_name]["products"].copy()
+    for company_name in company_names:
+        products_df = company_data(company_name)["products"].copy()
         products_df['Company'] = company_name
         products_dfs.append(products_df)
-    
-    combined_products = pd.concat(products_dfs)
-    
-    # Filters
-    main_categories = ["All"] + sorted(combined_products["Main Category"].dropna().unique())
-    selected_main = st.sidebar.selectbox("Main Category", main_categories)
-    
-    price_min = float(combined_products["Current Price"].min())
-    price_max = float(combined_products["Current Price"].max())
-    price_range = st.sidebar.slider("Price Range", price_min, price_max, (price_min, price_max))
-
-    
-    # Apply filters
-    filtered_products = combined_products.copy()
-    if selected_main != "All":
-        filtered_products = filtered_products[filtered_products["Main Category"] == selected_main]
-    
-    filtered_products = filtered_products[
-        (filtered_products["Current Price"] >= price_range[0]) & 
-        (filtered_products["Current Price"] <= price_range[1])
-    ]
-else:
-    # Single company product filters
-    products_df = all_data[selected_companies[0]]["products"]
-    main_categories = ["All"] + sorted(products_df["Main Category"].dropna().unique())
-    selected_main = st.sidebar.selectbox("Main Category", main_categories)
-
-    price_min = float(products_df["Current Price"].min())
-    price_max = float(products_df["Current Price"].max())
-    price_range = st.sidebar.slider("Price Range", price_min, price_max, (price_min, price_max))
+    return pd.concat(products_dfs)
 
-    # Apply filters
-    filtered_products = products_df.copy()
+@st.cache_data(ttl=DATA_TTL)
+def filter_products(company_names, selected_main, price_range):
+    filtered_products = combined_products(company_names)
     if selected_main != "All":
         filtered_products = filtered_products[filtered_products["Main Category"] == selected_main]
-    
-    filtered_products = filtered_products[
-        (filtered_products["Current Price"] >= price_range[0]) & 
+
+    return filtered_products[
+        (filtered_products["Current Price"] >= price_range[0]) &
         (filtered_products["Current Price"] <= price_range[1])
     ]
 
-# --- Product Overview Comparison
-with st.container():
-    st.subheader("📦 Product Overview Comparison" if comparison_mode else "📦 Product Overview")
-    
+@st.cache_data(ttl=DATA_TTL)
+def product_figures(company_names, comparison_mode, selected_main, price_range):
+    """(product count, category, price distribution) figures of the filtered products; a single
+    company gets Streamlit's own charts, so its category chart is a Series and it has no price figure"""
+    filtered_products = filter_products(company_names, selected_main, price_range)
+    count_fig = category_fig = price_fig = None
+
     if comparison_mode:
         # Show product count by company
         product_counts = filtered_products.groupby('Company').size().reset_index(name='Count')
-        fig = px.bar(
+        count_fig = px.bar(
             product_counts,
             x='Company',
             y='Count',
@@ -333,17 +309,10 @@ with st.container():
             color='Company',
             color_discrete_sequence=px.colors.qualitative.Plotly
         )
-        st.plotly_chart(fig, use_container_width=True)
 
-# --- Product Visualizations
-col3, col4 = st.columns(2)
-with col3:
-    st.subheader("🧺 Product Categories Count")
-    
-    if comparison_mode:
         if "Product Category" in filtered_products.columns:
             category_counts = filtered_products.groupby(['Company', 'Product Category']).size().reset_index(name='Count')
-            fig = px.bar(
+            category_fig = px.bar(
                 category_counts,
                 x='Product Category',
                 y='Count',
@@ -351,10 +320,9 @@ with col3:
                 barmode='group',
                 title="Product Category Count Comparison"
             )
-            st.plotly_chart(fig, use_container_width=True)
         elif "Main Category" in filtered_products.columns:
             category_counts = filtered_products.groupby(['Company', 'Main Category']).size().reset_index(name='Count')
-            fig = px.bar(
+            category_fig = px.bar(
                 category_counts,
                 x='Main Category',
                 y='Count',
@@ -362,23 +330,9 @@ with col3:
                 barmode='group',
                 title="Main Category Count Comparison"
             )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("No category column available for comparison.")
-    else:
-        if "Product Category" in filtered_products.columns:
-            st.bar_chart(filtered_products["Product Category"].value_counts())
-        elif "Main Category" in filtered_products.columns:
-            st.bar_chart(filtered_products["Main Category"].value_counts())
-        else:
-            st.warning("No category column available for this company.")
-
-with col4:
-    st.subheader("💰 Price Distribution")
-    
-    if not filtered_products.empty:
-        if comparison_mode:
-            fig = px.histogram(
+
+        if not filtered_products.empty:
+            price_fig = px.histogram(
                 filtered_products,
                 x='Current Price',
                 color='Company',
@@ -387,8 +341,53 @@ with col4:
                 barmode='overlay',
                 opacity=0.7
             )
-            st.plotly_chart(fig, use_container_width=True)
+    else:
+        if "Product Category" in filtered_products.columns:
+            category_fig = filtered_products["Product Category"].value_counts()
+        elif "Main Category" in filtered_products.columns:
+            category_fig = filtered_products["Main Category"].value_counts()
+    return count_fig, category_fig, price_fig
+
+@st.fragment
+def products_panel(company_names, comparison_mode):
+    st.subheader("📦 Product Overview Comparison" if comparison_mode else "📦 Product Overview")
+
+    # Filters sit with the charts they drive, so moving them reruns only this panel
+    products_df = combined_products(company_names)
+    filter_main, filter_price = st.columns(2)
+    main_categories = ["All"] + sorted(products_df["Main Category"].dropna().unique())
+    selected_main = filter_main.selectbox("🛍️ Main Category", main_categories)
+
+    price_min = float(products_df["Current Price"].min())
+    price_max = float(products_df["Current Price"].max())
+    price_range = filter_price.slider("Price Range", price_min, price_max, (price_min, price_max))
+
+    count_fig, category_fig, price_fig = product_figures(company_names, comparison_mode, selected_main, price_range)
+    if count_fig is not None:
+        st.plotly_chart(count_fig, use_container_width=True)
+
+    # --- Product Visualizations
+    col3, col4 = st.columns(2)
+    with col3:
+        st.subheader("🧺 Product Categories Count")
+
+        if category_fig is None:
+            st.warning("No category column available for comparison." if comparison_mode else "No category column available for this company.")
+        elif comparison_mode:
+            st.plotly_chart(category_fig, use_container_width=True)
         else:
+            st.bar_chart(category_fig)
+
+    with col4:
+        st.subheader("💰 Price Distribution")
+
+        filtered_products = filter_products(company_names, selected_main, price_range)
+        if filtered_products.empty:
+            st.warning("No products to show for this filter.")
+        elif comparison_mode:
+            st.plotly_chart(price_fig, use_container_width=True)
+        else:
+            # An Altair spec is cheap to build; only the filtered frame behind it is cached
             price_hist = (
                 alt.Chart(filtered_products)
                 .mark_bar()
@@ -399,12 +398,171 @@ with col4:
                 .properties(width=400, height=300)
             )
             st.altair_chart(price_hist, use_container_width=True)
-    else:
-        st.warning("No products to show for this filter.")
+
+products_panel(selected, comparison_mode)
+
+
+# --- Same Product, Price per Shop
+@st.cache_data(ttl=DATA_TTL)
+def matched_prices(company_names, search):
+    """(price comparison rows, product x shop price table) of the products at least two of the shops sell"""
+    comparison = price_comparison()
+    if comparison is None:
+        return None, None
+    comparison = comparison[comparison["Site"].isin(company_names)]
+    comparison = comparison[comparison.groupby("Group")["Site"].transform("nunique") > 1]
+    if search:
+        comparison = comparison[comparison.groupby("Group")["Product Name"].transform(
+            lambda names: names.str.contains(search, case=False, regex=False).any()
+        )]
+    if comparison.empty:
+        return comparison, None
+    return comparison, comparison.pivot_table(index="Product", columns="Site", values="Current Price", aggfunc="min")
+
+@st.cache_data(ttl=DATA_TTL)
+def price_gap_figures(company_names, search):
+    comparison, prices = matched_prices(company_names, search)
+    cheapest = comparison[comparison["Cheapest"]].groupby("Site").size().reset_index(name="Products")
+    cheapest_fig = px.bar(cheapest, x="Site", y="Products", color="Site", title=f"Cheapest Shop across {len(prices)} Matched Products")
+    spread = (prices.max(axis=1) - prices.min(axis=1)).sort_values(ascending=False).head(15).index
+    gaps_fig = px.bar(
+        comparison[comparison["Product"].isin(spread)], x="Product", y="Current Price", color="Site",
+        barmode="group", hover_data=["Product Name"], title="Largest Price Gaps"
+    )
+    return cheapest_fig, gaps_fig
+
+@st.fragment
+def price_comparison_panel(company_names):
+    with st.container():
+        st.subheader("🏷️ Same Product, Price per Shop")
+        comparison, _ = matched_prices(company_names, "")
+
+        if comparison is None or comparison.empty:
+            st.info("No products matched across the selected shops yet. Run product_matching.py after a scrape.")
+            return
+
+        search = st.text_input("Search matched products", "")
+        comparison, prices = matched_prices(company_names, search)
+        if prices is None:
+            st.info(f"No matched product contains \"{search}\".")
+            return
+
+        cheapest_fig, gaps_fig = price_gap_figures(company_names, search)
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.plotly_chart(cheapest_fig, use_container_width=True)
+        with col_b:
+            st.plotly_chart(gaps_fig, use_container_width=True)
+        st.dataframe(prices, use_container_width=True)
+
+price_comparison_panel(selected)
+
+
+# --- Brands and Specs
+@st.cache_data(ttl=DATA_TTL)
+def brand_figures(company_names, top_n):
+    """(top brands, top specs) bar charts from the dictionary tags of each shop's products"""
+    tags = product_tags(company_names)
+    brands = tags[tags["Brand"] != ""].groupby(["Company", "Brand"]).size().reset_index(name="Products")
+    top_brands = brands.groupby("Brand")["Products"].sum().nlargest(top_n).index
+    brand_fig = px.bar(
+        brands[brands["Brand"].isin(top_brands)], x="Brand", y="Products", color="Company",
+        barmode="group", title=f"Top {top_n} Brands by Product Count"
+    )
+    brand_fig.update_layout(xaxis={'categoryorder': 'total descending'})
+
+    specs = tags.assign(Spec=tags["Specs"].str.split("; ")).explode("Spec")
+    specs = specs[specs["Spec"].fillna("") != ""]
+    spec_counts = specs.groupby(["Company", "Spec"]).size().reset_index(name="Products")
+    top_specs = spec_counts.groupby("Spec")["Products"].sum().nlargest(top_n).index
+    spec_fig = px.bar(
+        spec_counts[spec_counts["Spec"].isin(top_specs)], x="Spec", y="Products", color="Company",
+        barmode="group", title=f"Top {top_n} Specs (GB, KG, inches, W...)"
+    )
+    spec_fig.update_layout(xaxis={'categoryorder': 'total descending'})
+    return brand_fig, spec_fig
+
+@st.fragment
+def brands_panel(company_names, comparison_mode):
+    with st.container():
+        st.subheader("🏭 Brands and Specs Comparison" if comparison_mode else "🏭 Brands and Specs")
+        tags = product_tags(company_names)
+        if tags is None or tags.empty:
+            st.info("No product tags yet. Run dictionary_tagger.py after a scrape.")
+            return
+
+        top_n = st.slider("Number of top brands and specs", 5, 30, 10)
+        brand_fig, spec_fig = brand_figures(company_names, top_n)
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.plotly_chart(brand_fig, use_container_width=True)
+        with col_b:
+            st.plotly_chart(spec_fig, use_container_width=True)
+        with st.expander(f"Tagged products ({len(tags)})"):
+            st.dataframe(tags, use_container_width=True)
+
+brands_panel(selected, comparison_mode)
+
+
+# --- Internal Link Structure
+@st.cache_data(ttl=DATA_TTL)
+def link_comparison_figures(company_names):
+    link_summary, link_pages = link_data(company_names)
+    link_summary = link_summary[link_summary["Site"].isin(company_names)].rename(columns={"Site": "Company"})
+    issues_fig = px.bar(
+        link_summary[["Company", "Orphans", "Unreachable", "Deep Products"]].melt(id_vars="Company", var_name="Issue", value_name="Pages"),
+        x="Issue", y="Pages", color="Company", barmode="group", title="Orphaned, Unreachable and Deep Pages"
+    )
+    depths = pd.concat([df.assign(Company=name) for name, df in link_pages.items()])
+    depth_counts = depths.dropna(subset=["Depth"]).groupby(["Company", "Depth"]).size().reset_index(name="Pages")
+    depth_fig = px.bar(depth_counts, x="Depth", y="Pages", color="Company", barmode="group", title="Pages by Click Depth from the Homepage")
+    return issues_fig, depth_fig, link_summary
+
+@st.fragment
+def link_structure_panel(company_names, comparison_mode):
+    with st.container():
+        st.subheader("🕸️ Internal Link Structure Comparison" if comparison_mode else "🕸️ Internal Link Structure")
+        link_summary, link_pages = link_data(company_names)
+
+        if link_summary is None or not link_pages:
+            st.info("No link analysis yet. Run link_analysis.py after a scrape.")
+        elif comparison_mode:
+            issues_fig, depth_fig, link_summary = link_comparison_figures(company_names)
+            col_a, col_b = st.columns(2)
+            with col_a:
+                st.plotly_chart(issues_fig, use_container_width=True)
+            with col_b:
+                st.plotly_chart(depth_fig, use_container_width=True)
+            st.dataframe(link_summary, use_container_width=True)
+        else:
+            pages = link_pages[company_names[0]]
+            site_summary = link_summary[link_summary["Site"] == company_names[0]]
+            if not site_summary.empty:
+                site_summary = site_summary.iloc[0]
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Pages", int(site_summary["Pages"]), f"{int(site_summary['Pages Crawled'])} crawled", delta_color="off")
+                m2.metric("Orphan Pages", int(site_summary["Orphans"]))
+                product_depth = site_summary["Median Product Depth"]
+                m3.metric("Median Product Depth", "n/a" if pd.isna(product_depth) else f"{product_depth:g} clicks")
+                m4.metric("Product PageRank Share", f"{site_summary['Product PageRank Share']:.1%}")
+
+            col_a, col_b = st.columns(2)
+            with col_a:
+                st.markdown("**Pages by Click Depth**")
+                st.bar_chart(pages["Depth"].value_counts().sort_index())
+            with col_b:
+                st.markdown("**Top Pages by Internal PageRank**")
+                st.dataframe(pages.head(10)[["URL", "Page Type", "PageRank", "Inbound Links"]], use_container_width=True)
+
+            orphans = pages[pages["Orphan"]]
+            if not orphans.empty:
+                with st.expander(f"Orphan pages ({len(orphans)})"):
+                    st.dataframe(orphans[["URL", "Page Type", "In Sitemap"]], use_container_width=True)
+
+link_structure_panel(selected, comparison_mode)
 
 
 # --- Export Visualizations
 with st.expander("📤 Export Visualizations"):
     st.markdown("You can right-click on any plot and **save as image**.")
     st.markdown("To export as PDF, use browser print/save feature or use a screenshot + PDF tool.")
-
@@ -0,0 +1,48 @@
+import os
+import pandas as pd
+
+from sites import SITES, ROOT
+
+# Company folder and file mapping
+companies = {
+    name: {
+        "seo_path": site["seo_folder"],
+        "products_path": site["data_folder"]
+    }
+    for name, site in SITES.items()
+}
+
+
+def load_company_data(seo_path, products_path):
+    data = {
+        "meta_data": pd.read_csv(os.path.join(seo_path, "meta_data.csv")),
+        "backlinks": pd.read_csv(os.path.join(products_path, "backlinks.csv")),
+        "navbar": pd.read_csv(os.path.join(seo_path, "navbar.csv")),
+        "seo_keywords": pd.read_csv(os.path.join(seo_path, "seo_keywords.csv")),
+        "tfidf_keywords": pd.read_csv(os.path.join(seo_path, "tfidf_keywords.csv")),
+        "products":  pd.read_csv(os.path.join(products_path, "cleaned_Csv.csv"), parse_dates=["Timestamp"])
+    }
+    return data
+
+
+def load_link_analysis(products_path):
+    """Per-page PageRank, click depth and orphan flags, or None before link_analysis.py has run"""
+    path = os.path.join(products_path, "link_analysis.csv")
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def load_price_comparison():
+    """Products matched across shops with each shop's price, or None before product_matching.py has run"""
+    path = os.path.join(ROOT, "price_comparison.csv")
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def load_product_tags(products_path):
+    """Brand, category, tech term and spec tags per product name, or None before dictionary_tagger.py has run"""
+    path = os.path.join(products_path, "product_tags.csv")
+    return pd.read_csv(path, keep_default_na=False) if os.path.exists(path) else None
+
+
+def load_link_summary():
+    path = os.path.join(ROOT, "link_summary.csv")
+    return pd.read_csv(path) if os.path.exists(path) else None
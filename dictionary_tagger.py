@@ -0,0 +1,263 @@
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import logging
+import argparse
+from collections import deque
+
+import pandas as pd
+
+from sites import SITES, ROOT, site_path
+from product_dedup import normalise_name, MISSING_NAMES
+from product_matching import UNITS
+from collection_crawler import CATALOGUE_FILE
+from instrumentation import span, count
+
+AUTOMATON_PATH = os.path.join(ROOT, "tagger", "automaton.pickle")
+PRODUCT_TAGS_FILE = "product_tags.csv"
+AUTOMATON_VERSION = 2  # bump when the automaton's layout changes
+
+KINDS = ("brands", "categories", "tech", "specs")
+TAG_COLUMNS = ["Brands", "Categories", "Tech Terms", "Specs"]
+TAG_SEPARATOR = "; "
+
+# From the notebook's technology retail keyword dictionary
+TECH_TERMS = [
+    "technology retail", "electronics store", "online electronics store", "tech shop", "buy electronics online",
+    "smartphones", "laptops", "desktop computers", "tablets", "smartwatches", "fitness trackers", "headphones",
+    "speakers", "televisions", "smart TVs", "OLED TVs", "LED TVs", "cameras", "digital cameras", "DSLR cameras",
+    "gaming consoles", "PlayStation", "Xbox", "Nintendo Switch", "computer accessories", "keyboards", "mouse",
+    "monitors", "mobile accessories", "phone cases", "chargers", "screen protectors", "home appliances",
+    "smart home devices", "drones", "virtual reality", "VR headsets", "printers", "networking devices", "routers",
+    "Samsung smartphones", "Apple iPhones", "Sony headphones", "best smartphones", "cheap laptops", "discount TVs",
+    "buy smartphones online", "electronics store near me", "computer store in Lebanon",
+    "where to buy smartphones in Lebanon", "latest technology", "new technology", "price of smartphones",
+    "price of laptops", "deals on electronics", "offers on smartphones", "smart speakers", "eReaders", "projectors",
+    "gaming laptops", "computer parts", "camera lenses", "car electronics",
+]
+
+# Brands the shops carry; the Abed Tahhan "Shop by Brand" menu adds the rest on every navbar pass
+BRANDS = [
+    "Samsung", "Apple", "Huawei", "Xiaomi", "Sony", "HP", "Dell", "Lenovo", "LG", "TCL", "Toshiba", "Hisense",
+    "Hyundai", "Campomatic", "Bosch", "Beko", "Ariston", "Candy", "Sharp", "Tefal", "Philips", "Braun", "Kenwood",
+    "Moulinex", "Taurus", "Grundig", "KitchenAid", "Bergner", "Fitbit", "Beurer", "Midea", "Whirlpool", "Electrolux",
+    "Olimpic", "Iparah", "Kumtel", "Sensus", "Westmark", "JBL", "Babyliss", "Haier", "Bialetti", "Oscal", "Ninja",
+    "Ufesa", "Magimix", "Russell Hobbs", "Remington", "Dyson", "Panasonic", "Hausberg", "Smeg", "Domo", "Luxell",
+    "Hoover", "Valera", "Gorenje", "SuperChef", "Big Chef", "Hoco", "Bissell", "Jura", "Frigidaire", "Segway", "Acer",
+    "Twistshake", "MasterPro", "BergHOFF", "Kinelco", "Kelon", "Elica", "G3 Ferrari",
+]
+
+# "in" is left out of the spec units: in running text "top 10 in Lebanon" is not a size
+SPEC_UNITS = {unit: canonical for unit, canonical in UNITS.items() if unit != "in"}
+SKIPPED_CATEGORIES = {"other", "others", "sale!", "gift card", "new arrivals", "brands"}
+# "12,000 btu" has a thousands separator, "1,5 l" a decimal comma
+NUMBER_BEFORE = re.compile(r"(?:(\d{1,3}(?:,\d{3})+)|(\d+(?:[.,]\d+)?))\s*$")
+
+
+class Automaton:
+    """Aho-Corasick automaton: every occurrence of every term in one left-to-right pass over a text.
+
+    Nodes are trie states numbered from 0 (the root); goto holds each node's edges, fail its
+    failure link and out the indexes of the terms ending there, failure chain included.
+    """
+
+    def __init__(self, terms=()):
+        self.terms = []  # (length, kind, label)
+        self.goto, self.fail, self.out = [{}], [0], [[]]
+        for term, kind, label in terms:
+            node = 0
+            for char in term:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][char] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = child
+            self.out[node].append(len(self.terms))
+            self.terms.append((len(term), kind, label))
+
+        # Breadth first, so a node's failure target is finished before the node itself
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                target = self.fail[node]
+                while target and char not in self.goto[target]:
+                    target = self.fail[target]
+                self.fail[child] = self.goto[target].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def state(self):
+        """The automaton as plain lists, picklable without a reference to this class"""
+        return {"terms": self.terms, "goto": self.goto, "fail": self.fail, "out": self.out}
+
+    @classmethod
+    def from_state(cls, state):
+        automaton = cls()
+        automaton.terms, automaton.goto, automaton.fail, automaton.out = (
+            state["terms"], state["goto"], state["fail"], state["out"]
+        )
+        return automaton
+
+    def find(self, text):
+        """(start, end, term index) of every term occurrence in text"""
+        goto, fail, out, terms = self.goto, self.fail, self.out, self.terms
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                yield end - terms[index][0], end, index
+
+
+def _navbar_terms(site_name):
+    """(brands, categories) named in a site's navbar.csv"""
+    path = site_path(site_name, "data_folder", "navbar.csv")
+    if not os.path.exists(path):
+        return [], []
+    navbar = pd.read_csv(path)
+    brands, categories = [], []
+    for main, sub, items in zip(navbar["Main Category"], navbar["Subcategory"], navbar["Items"]):
+        names = [item.strip() for item in str(items).split(",")] if isinstance(items, str) else []
+        if str(main).strip().lower() == "brands":
+            brands.extend(names)
+        else:
+            categories.extend([main, sub] + names)
+    return brands, [name for name in categories if isinstance(name, str)]
+
+
+def dictionary(site_names=None):
+    """Sorted (term, kind, label) entries: brands, categories, tech terms and spec units"""
+    entries = {}
+
+    def add(label, kind):
+        label = str(label).strip()
+        term = normalise_name(label)
+        if len(term) >= 2 or kind == "specs":
+            entries.setdefault((term, kind), label)
+
+    for brand in BRANDS:
+        add(brand, "brands")
+    for term in TECH_TERMS:
+        add(term, "tech")
+    for site_name in site_names or SITES:
+        brands, categories = _navbar_terms(site_name)
+        for brand in brands:
+            add(brand, "brands")
+        for category in categories:
+            term = normalise_name(category)
+            # Some menus list brands (Hamdan's TVs); a brand stays a brand
+            if term not in SKIPPED_CATEGORIES and (term, "brands") not in entries:
+                add(category, "categories")
+    for unit, canonical in SPEC_UNITS.items():
+        entries[(unit, "specs")] = canonical
+    return sorted((term, kind, label) for (term, kind), label in entries.items())
+
+
+def fingerprint(entries):
+    digest = hashlib.sha1(f"v{AUTOMATON_VERSION}".encode())
+    digest.update(json.dumps(entries, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Tagger:
+    """Brand, category, tech term and spec tags of any text, from one automaton pass"""
+
+    def __init__(self, automaton):
+        self.automaton = automaton
+
+    @classmethod
+    def load(cls, path=AUTOMATON_PATH):
+        """The tagger for the current dictionary of every site; the automaton is only rebuilt when it changed"""
+        entries = dictionary()
+        key = fingerprint(entries)
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    stored = pickle.load(f)
+                if stored["fingerprint"] == key:
+                    return cls(Automaton.from_state(stored["automaton"]))
+            # AttributeError/ImportError: an old pickle naming the class, e.g. as __main__.Automaton
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError, ImportError, TypeError) as e:
+                logging.warning(f"Ignoring unreadable automaton {path}: {e}")
+
+        with span("automaton_build", terms=len(entries)):
+            automaton = Automaton(entries)
+        count("automaton_builds")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"fingerprint": key, "automaton": automaton.state()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"Built the tagging automaton: {len(entries)} terms, {len(automaton.goto)} states")
+        return cls(automaton)
+
+    def tag(self, text):
+        """{kind: [labels]} found in text, each label once, in order of appearance"""
+        text = normalise_name(text)
+        found = {kind: {} for kind in KINDS}
+        for start, end, index in self.automaton.find(text):
+            if end < len(text) and text[end].isalnum():
+                continue
+            _, kind, label = self.automaton.terms[index]
+            if kind == "specs":
+                # A unit counts only right after a number: "13 kg", "64gb"
+                number = NUMBER_BEFORE.search(text[max(0, start - 16):start])
+                if not number:
+                    continue
+                thousands, plain = number.groups()
+                value = float(thousands.replace(",", "")) if thousands else float(plain.replace(",", "."))
+                label = f"{value:g}{label}"
+            elif start > 0 and text[start - 1].isalnum():
+                continue
+            found[kind].setdefault(label, None)
+        return {kind: list(labels) for kind, labels in found.items()}
+
+    def tag_row(self, text):
+        """tag() flattened to the TAG_COLUMNS of a CSV row"""
+        tags = self.tag(text)
+        return {column: TAG_SEPARATOR.join(tags[kind]) for column, kind in zip(TAG_COLUMNS, KINDS)}
+
+
+def tag_products(site_names=None, tagger=None):
+    """Tag every distinct product name of each site into <data folder>/product_tags.csv"""
+    site_names = list(site_names or SITES)
+    tagger = tagger or Tagger.load()
+    results = {}
+    for site_name in site_names:
+        names = []
+        for file_name in (CATALOGUE_FILE, "cleaned_Csv.csv"):
+            path = site_path(site_name, "data_folder", file_name)
+            if os.path.exists(path):
+                names.extend(pd.read_csv(path, usecols=["Product Name"])["Product Name"].dropna().astype(str))
+        names = [name for name in dict.fromkeys(names) if normalise_name(name) not in MISSING_NAMES]
+        if not names:
+            continue
+
+        started = time.perf_counter()
+        with span("product_tagging", site=site_name, names=len(names)):
+            rows = [{"Product Name": name, **tagger.tag_row(name)} for name in names]
+        df = pd.DataFrame(rows, columns=["Product Name"] + TAG_COLUMNS)
+        df.insert(1, "Brand", df["Brands"].str.split(TAG_SEPARATOR).str[0])
+        df.to_csv(site_path(site_name, "data_folder", PRODUCT_TAGS_FILE), index=False)
+        count("products_tagged", len(df))
+        print(f"{site_name}: tagged {len(df)} product names in {time.perf_counter() - started:.2f}s, "
+              f"{(df['Brand'] != '').sum()} with a brand")
+        results[site_name] = df
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tag product names with brands, categories, tech terms and specs")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--text", help="Print the tags of one text instead")
+    args = parser.parse_args()
+    if args.text:
+        print(Tagger.load().tag(args.text))
+    else:
+        tag_products(args.sites)
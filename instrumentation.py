@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import atexit
+import argparse
+import cProfile
+import functools
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# One JSON-lines file per run. master_scrape.py exports SCRAPER_RUN_ID so every
+# scraper subprocess of the same run appends to the same file.
+RUNS_DIR = os.environ.get("SCRAPER_RUNS_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs")
+RUN_ID = os.environ.get("SCRAPER_RUN_ID") or datetime.now().strftime("%Y%m%d-%H%M%S")
+# SCRAPER_PROFILE=all or a comma separated list of stages, e.g. "products,navbar"
+PROFILE_STAGES = {s.strip() for s in os.environ.get("SCRAPER_PROFILE", "").split(",") if s.strip()}
+MAX_RUN_FILES = 48
+
+_site = os.environ.get("SCRAPER_SITE", "master")
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def run_path(run_id=RUN_ID):
+    return os.path.join(RUNS_DIR, f"{run_id}.jsonl")
+
+
+def configure(site):
+    """Label every event written by this process with the site being scraped"""
+    global _site
+    _site = site
+
+
+def _write(event):
+    event = {"run": RUN_ID, "site": _site, "pid": os.getpid(), **event}
+    line = json.dumps(event, default=str) + "\n"
+    with _lock:
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        with open(run_path(), "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def count(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+@atexit.register
+def flush_counters():
+    with _lock:
+        counters = dict(_counters)
+        _counters.clear()
+    for name, value in counters.items():
+        _write({"type": "counter", "name": name, "value": value})
+
+
+@contextmanager
+def span(stage, **tags):
+    """Time a block of work and write it as one event, marking it as failed if it raises"""
+    start = time.time()
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _write({
+            "type": "span",
+            "stage": stage,
+            "thread": threading.current_thread().name,
+            "start": datetime.fromtimestamp(start).isoformat(timespec="milliseconds"),
+            "duration": round(time.perf_counter() - started, 4),
+            "status": status,
+            **tags
+        })
+
+
+@contextmanager
+def profile(stage):
+    """Profile a block with pyinstrument when installed, cProfile otherwise"""
+    if "all" not in PROFILE_STAGES and stage not in PROFILE_STAGES:
+        yield
+        return
+
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    base = os.path.join(RUNS_DIR, f"{RUN_ID}-{_site}-{stage}")
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(base + ".html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(base + ".prof")
+
+
+def timed(stage):
+    """Decorator: wrap an extractor in a span (and the optional profiler hook)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage), profile(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def prune_runs(keep=MAX_RUN_FILES):
+    if not os.path.isdir(RUNS_DIR):
+        return
+    run_files = sorted(f for f in os.listdir(RUNS_DIR) if f.endswith(".jsonl"))
+    for name in run_files[:-keep]:
+        os.remove(os.path.join(RUNS_DIR, name))
+
+
+def load_events(last_runs=5):
+    if not os.path.isdir(RUNS_DIR):
+        return []
+    run_files = sorted(f for f in os.listdir(RUNS_DIR) if f.endswith(".jsonl"))[-last_runs:]
+    events = []
+    for name in run_files:
+        with open(os.path.join(RUNS_DIR, name), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # partially written line from a crashed run
+    return events
+
+
+def summary(last_runs=5, top=15):
+    """Print the slowest (site, stage) pairs and the counter totals over the most recent runs"""
+    events = load_events(last_runs)
+    if not events:
+        print(f"No run files found in {RUNS_DIR}")
+        return
+
+    durations = defaultdict(list)
+    errors = Counter()
+    counters = defaultdict(Counter)
+    for event in events:
+        if event.get("type") == "span":
+            key = (event["site"], event["stage"])
+            durations[key].append(event["duration"])
+            if event.get("status", "ok") != "ok":
+                errors[key] += 1
+        elif event.get("type") == "counter":
+            counters[event["site"]][event["name"]] += event["value"]
+
+    runs = sorted({event["run"] for event in events})
+    print(f"Slowest stages over {len(runs)} run(s): {runs[0]} .. {runs[-1]}")
+    print(f"{'Site':<22}{'Stage':<22}{'Calls':>7}{'Total s':>10}{'Mean s':>9}{'Max s':>9}{'Errors':>8}")
+    ranked = sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True)
+    for (site, stage), values in ranked[:top]:
+        print(f"{site:<22}{stage:<22}{len(values):>7}{sum(values):>10.2f}"
+              f"{sum(values) / len(values):>9.2f}{max(values):>9.2f}{errors[(site, stage)]:>8}")
+
+    print("\nCounters")
+    for site, site_counters in sorted(counters.items()):
+        totals = ", ".join(f"{name}={value}" for name, value in sorted(site_counters.items()))
+        print(f"  {site}: {totals}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper run instrumentation")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summary_parser = subparsers.add_parser("summary", help="List the slowest stages across recent runs")
+    summary_parser.add_argument("--runs", type=int, default=5, help="Number of recent runs to include")
+    summary_parser.add_argument("--top", type=int, default=15, help="Number of stages to list")
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        summary(args.runs, args.top)
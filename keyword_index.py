@@ -0,0 +1,139 @@
+import re
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+WHITESPACE = re.compile(r"\s+")
+EMPTY = np.array([], dtype=np.int32)
+
+
+def normalise_keyword(keyword):
+    return WHITESPACE.sub(" ", str(keyword)).strip().lower()
+
+
+class KeywordIndex:
+    """Keywords interned to integer IDs; every site, page and dictionary is a sorted ID array.
+
+    Strings are normalised once, when they are interned. Overlaps, differences and
+    dictionary coverage are then NumPy set operations on small integer arrays.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.keywords = []
+        self.pages = {}  # site -> {page: ids}
+        self.sites = {}  # site -> union of its pages' ids
+        self.dictionaries = {}  # name -> ids
+        self.display = {}  # id -> original spelling of dictionary terms
+
+    def intern(self, keywords):
+        """Sorted unique IDs for an iterable of raw keywords (new keywords get new IDs)"""
+        ids = []
+        for keyword in keywords:
+            if keyword is None or (isinstance(keyword, float) and np.isnan(keyword)):
+                continue
+            normalised = normalise_keyword(keyword)
+            if not normalised:
+                continue
+            keyword_id = self.ids.get(normalised)
+            if keyword_id is None:
+                keyword_id = self.ids[normalised] = len(self.keywords)
+                self.keywords.append(normalised)
+            ids.append(keyword_id)
+        return np.unique(np.array(ids, dtype=np.int32)) if ids else EMPTY
+
+    def decode(self, ids):
+        return sorted(self.keywords[i] for i in ids)
+
+    def add_page(self, site, page, keywords):
+        """Replace one page's keywords and refresh the site's vocabulary"""
+        self.pages.setdefault(site, {})[page] = self.intern(keywords)
+        self.sites[site] = reduce(np.union1d, self.pages[site].values(), EMPTY).astype(np.int32)
+        return self.sites[site]
+
+    def add_site(self, site, keywords):
+        return self.add_page(site, None, keywords)
+
+    def add_dictionary(self, name, terms):
+        terms = list(terms)
+        self.dictionaries[name] = self.intern(terms)
+        for term in terms:
+            self.display.setdefault(self.ids[normalise_keyword(term)], term)
+        return self.dictionaries[name]
+
+    def membership_matrix(self, site_names=None):
+        """Sparse sites x vocabulary matrix with a 1 where the site uses the keyword"""
+        site_names = list(site_names or self.sites)
+        rows = np.repeat(np.arange(len(site_names)), [len(self.sites[s]) for s in site_names])
+        cols = np.concatenate([self.sites[s] for s in site_names]) if site_names else EMPTY
+        data = np.ones(len(cols), dtype=np.int8)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(site_names), len(self.keywords)))
+
+    def site_counts(self, site_names=None):
+        """How many of the given sites use each keyword (one column sum, however many sites)"""
+        return np.asarray(self.membership_matrix(site_names).sum(axis=0)).ravel()
+
+    def common(self, site_names=None):
+        """IDs used by every site"""
+        site_names = list(site_names or self.sites)
+        if not site_names:
+            return EMPTY
+        return np.flatnonzero(self.site_counts(site_names) == len(site_names)).astype(np.int32)
+
+    def unique_to(self, site, site_names=None):
+        """IDs only this site uses, among site_names (default: all sites)"""
+        site_names = list(site_names or self.sites)
+        if site not in site_names:
+            site_names.append(site)
+        counts = self.site_counts(site_names)
+        return self.sites[site][counts[self.sites[site]] == 1]
+
+    def compare(self, site, dictionary):
+        """Exact (normalised) comparison of a site against a dictionary"""
+        site_ids, dictionary_ids = self.sites[site], self.dictionaries[dictionary]
+        return {
+            "common": np.intersect1d(site_ids, dictionary_ids, assume_unique=True),
+            "unique": np.setdiff1d(site_ids, dictionary_ids, assume_unique=True),
+            "missing": np.setdiff1d(dictionary_ids, site_ids, assume_unique=True),
+        }
+
+    def coverage(self, site, dictionary):
+        """Percentage of the dictionary's terms the site uses"""
+        dictionary_ids = self.dictionaries[dictionary]
+        if not len(dictionary_ids):
+            return 0.0
+        matched = np.intersect1d(self.sites[site], dictionary_ids, assume_unique=True)
+        return len(matched) / len(dictionary_ids) * 100
+
+    def substring_matches(self, site, dictionary):
+        """Dictionary IDs that occur inside any of the site's keywords"""
+        # Keywords are newline-free, so one search over the joined vocabulary
+        # finds a term exactly when some keyword contains it
+        blob = "\n".join(self.keywords[i] for i in self.sites[site])
+        found = [i for i in self.dictionaries[dictionary] if self.keywords[i] in blob]
+        return np.array(found, dtype=np.int32)
+
+    def analysis_frame(self, dictionary, labels=None):
+        """The cross-site and dictionary comparison in the keyword_analysis_output.csv layout"""
+        labels = labels or {}
+        join = "; ".join
+        rows = [("Common Across All Websites", "All", "Common Keywords", join(self.decode(self.common())))]
+        for site in self.sites:
+            rows.append(("Unique to Website", labels.get(site, site), "Unique Keywords", join(self.decode(self.unique_to(site)))))
+
+        for site in self.sites:
+            name = labels.get(site, site)
+            exact = self.compare(site, dictionary)
+            found = self.substring_matches(site, dictionary)
+            missing = np.setdiff1d(self.dictionaries[dictionary], found, assume_unique=True)
+            rows += [
+                ("Exact Match", name, "Common Tech Keywords", join(self.decode(exact["common"]))),
+                ("Exact Match", name, "Unique to Website", join(self.decode(exact["unique"]))),
+                ("Exact Match", name, "Missing Tech Keywords", join(self.decode(exact["missing"]))),
+                ("Substring Match", name, "Tech Keywords Found as Substrings", join(self.decode(found))),
+                ("Substring Match", name, "Unique to Website (Original Case)", join(self.decode(exact["unique"]))),
+                ("Substring Match", name, "Missing Tech Keywords (Substring)", join(sorted(self.display[i] for i in missing))),
+            ]
+        return pd.DataFrame(rows, columns=["Category", "Website", "Type", "Keywords"])
@@ -0,0 +1,110 @@
+import os
+import re
+import atexit
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+WORD_PATTERN = re.compile(r"\b[a-zA-Z]{3,}\b")
+TOP_KEYWORDS = 20
+TFIDF_FEATURES = 50
+# Smaller batches run in the calling process, unless the caller offloads them: starting the
+# pool re-imports the caller's main module in every worker
+INLINE_PAGES = 4
+
+_executor = None
+_executor_workers = 0
+
+
+def keyword_tables(page_text, stop_words):
+    """Top keyword counts and TF-IDF terms for one page (same rules the scrapers always used)"""
+    words = WORD_PATTERN.findall(page_text.lower())
+    filtered_words = [word for word in words if word not in stop_words]
+
+    common_keywords = Counter(filtered_words).most_common(TOP_KEYWORDS)
+
+    tfidf_keywords = []
+    if filtered_words:
+        vectorizer = TfidfVectorizer(stop_words="english", max_features=TFIDF_FEATURES, ngram_range=(1, 2))
+        try:
+            vectorizer.fit_transform([" ".join(filtered_words)])
+            tfidf_keywords = vectorizer.get_feature_names_out().tolist()
+        except ValueError:
+            pass  # only sklearn stop words left on the page
+    return common_keywords, tfidf_keywords
+
+
+def _analyze_batch(shm_name, offsets, stop_words):
+    """Worker: decode its slice of page texts from shared memory and analyse them"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        results = []
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            page_text = bytes(shm.buf[start:end]).decode("utf-8")
+            results.append(keyword_tables(page_text, stop_words))
+        return results
+    finally:
+        shm.close()
+
+
+def get_executor(workers=None):
+    """(executor, worker count); the pool is started once, with the first caller's worker count"""
+    global _executor, _executor_workers
+    if _executor is None:
+        # forkserver/spawn: forking next to live Selenium threads is not safe
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _executor_workers = workers or os.cpu_count() or 1
+        _executor = ProcessPoolExecutor(max_workers=_executor_workers, mp_context=multiprocessing.get_context(method))
+    return _executor, _executor_workers
+
+
+@atexit.register
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def analyze_pages(page_texts, stop_words, workers=None, offload=False):
+    """Keyword tables for a batch of page texts (from any site), computed across processes.
+
+    The texts are packed once into a shared memory block; each worker receives only the
+    block name and a small array of byte offsets for its slice. Batches under INLINE_PAGES
+    pages are analysed in the calling process unless offload is set, for callers whose other
+    threads need the GIL meanwhile (a scraper's Selenium threads).
+    Returns one (common_keywords, tfidf_keywords) pair per page, in input order.
+    """
+    if not page_texts:
+        return []
+    if len(page_texts) < INLINE_PAGES and not offload:
+        return [keyword_tables(page_text, stop_words) for page_text in page_texts]
+
+    encoded = [text.encode("utf-8") for text in page_texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+
+    shm = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+    try:
+        for data, start in zip(encoded, offsets[:-1]):
+            shm.buf[start:start + len(data)] = data
+
+        executor, workers = get_executor(workers)
+        chunks = np.array_split(np.arange(len(encoded)), min(len(encoded), workers * 2))
+        stop_words = frozenset(stop_words)
+        futures = [
+            executor.submit(_analyze_batch, shm.name, offsets[chunk[0]:chunk[-1] + 2], stop_words)
+            for chunk in chunks if len(chunk)
+        ]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
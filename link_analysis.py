@@ -0,0 +1,173 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from sites import SITES, ROOT, site_path
+from link_graph import normalise_url
+from instrumentation import span, count
+from sitemap import INVENTORY_FILE, PAGE_LINKS_FILE, page_type
+
+ANALYSIS_FILE = "link_analysis.csv"
+SUMMARY_PATH = os.path.join(ROOT, "link_summary.csv")
+DAMPING = 0.85
+TOLERANCE = 1e-10  # L1 change in the rank vector at which power iteration stops
+MAX_ITERATIONS = 100
+DEEP_CLICKS = 3  # products further than this from the homepage count as buried
+
+ANALYSIS_COLUMNS = ["URL", "Page Type", "In Sitemap", "Crawled", "Inbound Links", "Outbound Links", "Depth", "PageRank", "Orphan"]
+
+
+def load_links(site_name):
+    """(internal Source/Target edges, sitemap inventory) of a site, from the scraper and sitemap crawls"""
+    folder = site_path(site_name, "data_folder")
+    frames = []
+    path = os.path.join(folder, "link_edges.csv")
+    if os.path.exists(path):
+        edges = pd.read_csv(path)
+        frames.append(edges.loc[edges["Internal"].astype(str) == "True", ["Source", "Target"]])
+    path = os.path.join(folder, PAGE_LINKS_FILE)
+    if os.path.exists(path):
+        frames.append(pd.read_csv(path, usecols=["Source", "Target"]))
+    edges = pd.concat(frames, ignore_index=True).dropna() if frames else pd.DataFrame(columns=["Source", "Target"])
+
+    path = os.path.join(folder, INVENTORY_FILE)
+    inventory = pd.read_csv(path, usecols=["URL", "Page Type"]) if os.path.exists(path) else pd.DataFrame(columns=["URL", "Page Type"])
+    return edges, inventory
+
+
+def build_matrix(sources, targets, pages=()):
+    """CSR adjacency of the link graph, with URLs numbered 0..n-1 in the returned Index.
+
+    A page linking to another several times is one edge, and self-links are dropped.
+    pages adds URLs that may have no links at all (sitemap entries nothing points to).
+    """
+    ids, urls = pd.factorize(pd.concat([pd.Series(sources), pd.Series(targets), pd.Series(pages)], ignore_index=True))
+    n_edges = len(sources)
+    source_ids, target_ids = ids[:n_edges], ids[n_edges:2 * n_edges]
+    keep = source_ids != target_ids
+    matrix = sparse.csr_matrix(
+        (np.ones(keep.sum()), (source_ids[keep], target_ids[keep])), shape=(len(urls), len(urls))
+    )
+    matrix.data[:] = 1.0  # duplicates were summed on conversion
+    return matrix, urls
+
+
+def pagerank(matrix, damping=DAMPING, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """(rank vector summing to 1, iterations) by power iteration; dangling pages spread their rank evenly"""
+    n = matrix.shape[0]
+    out_degree = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    # Column-stochastic transition matrix: rank flows from each page along its links
+    transition = (sparse.diags(inverse) @ matrix).T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for iteration in range(1, max_iterations + 1):
+        updated = damping * (transition @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        change = np.abs(updated - rank).sum()
+        rank = updated
+        if change < tolerance:
+            break
+    return rank, iteration
+
+
+def click_depth(matrix, root):
+    """Fewest clicks from root to every page, -1 where no path exists; one CSR row slice per level"""
+    depth = np.full(matrix.shape[0], -1, dtype=np.int32)
+    depth[root] = 0
+    frontier = np.array([root])
+    level = 0
+    while frontier.size:
+        level += 1
+        targets = np.unique(matrix[frontier].indices)
+        frontier = targets[depth[targets] < 0]
+        depth[frontier] = level
+    return depth
+
+
+def analyse_site(site_name):
+    """Per-page PageRank, click depth and orphan flags of one site, written to its link_analysis.csv"""
+    edges, inventory = load_links(site_name)
+    if edges.empty:
+        print(f"{site_name}: no internal links recorded yet")
+        return None, None
+
+    started = time.perf_counter()
+    home = normalise_url(SITES[site_name]["url"], SITES[site_name]["url"])
+    with span("link_matrix", site=site_name, edges=len(edges)):
+        matrix, urls = build_matrix(edges["Source"], edges["Target"], pd.concat([inventory["URL"], pd.Series([home])]))
+    with span("pagerank", site=site_name, pages=len(urls)):
+        rank, iterations = pagerank(matrix)
+    depth = click_depth(matrix, urls.get_loc(home))
+    inbound = np.diff(matrix.tocsc().indptr)
+    outbound = np.diff(matrix.indptr)
+    count("link_analysis_pages", len(urls))
+
+    types = {**dict(zip(inventory["URL"], inventory["Page Type"])), home: "home"}
+    platform = SITES[site_name]["platform"]
+    pages = pd.DataFrame({
+        "URL": urls,
+        "Page Type": [types.get(url) or page_type(url, "", platform) for url in urls],
+        "In Sitemap": urls.isin(inventory["URL"]),
+        # Only crawled pages have known outbound links; an uncrawled page may link on further
+        "Crawled": urls.isin(edges["Source"]),
+        "Inbound Links": inbound,
+        "Outbound Links": outbound,
+        "Depth": pd.Series(depth).where(depth >= 0).astype("Int64"),
+        "PageRank": rank.round(8),
+        "Orphan": (inbound == 0) & (urls != home),
+    }, columns=ANALYSIS_COLUMNS).sort_values("PageRank", ascending=False, ignore_index=True)
+    pages.to_csv(site_path(site_name, "data_folder", ANALYSIS_FILE), index=False)
+
+    products = pages[pages["Page Type"] == "product"]
+    summary = {
+        "Site": site_name,
+        "Pages": len(pages),
+        "Pages Crawled": int(pages["Crawled"].sum()),
+        "Internal Links": int(matrix.nnz),
+        "Orphans": int(pages["Orphan"].sum()),
+        "Unreachable": int(pages["Depth"].isna().sum()),
+        "Median Depth": pages["Depth"].median(),
+        "Max Depth": pages["Depth"].max(),
+        "Products": len(products),
+        "Median Product Depth": products["Depth"].median() if not products.empty else None,
+        "Deep Products": int((products["Depth"] > DEEP_CLICKS).sum()),
+        "Product PageRank Share": round(float(products["PageRank"].sum()), 4),
+        "Top Page": pages["URL"].iloc[0],
+        "Iterations": iterations,
+        "Seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"{site_name}: {summary['Pages']} pages, {summary['Internal Links']} internal links, "
+          f"{summary['Orphans']} orphans, PageRank in {iterations} iterations ({summary['Seconds']}s)")
+    return pages, summary
+
+
+def analyse_links(site_names=None):
+    """Link analysis of every site with link data; the per-site summaries go to link_summary.csv"""
+    summaries = []
+    for site_name in site_names or SITES:
+        try:
+            _, summary = analyse_site(site_name)
+        except Exception as e:
+            print(f"Link analysis of {site_name} failed: {e}")
+            continue
+        if summary:
+            summaries.append(summary)
+
+    if not summaries:
+        return None
+    df = pd.DataFrame(summaries)
+    df.to_csv(SUMMARY_PATH, index=False)
+    print(f"Link summaries saved to {SUMMARY_PATH}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Internal PageRank, click depth and orphan pages of each site")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    args = parser.parse_args()
+    analyse_links(args.sites)
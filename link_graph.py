@@ -0,0 +1,173 @@
+import os
+import threading
+from collections import Counter
+from urllib.parse import urljoin, urldefrag, urlparse, urlunparse, parse_qsl, urlencode
+
+import pandas as pd
+
+# Known social / contact platforms, matched on the link's domain
+PLATFORMS = {
+    "facebook.com": "Facebook",
+    "fb.com": "Facebook",
+    "instagram.com": "Instagram",
+    "youtube.com": "YouTube",
+    "youtu.be": "YouTube",
+    "twitter.com": "Twitter",
+    "x.com": "Twitter",
+    "linkedin.com": "LinkedIn",
+    "tiktok.com": "TikTok",
+    "pinterest.com": "Pinterest",
+    "snapchat.com": "Snapchat",
+    "wa.me": "WhatsApp",
+    "whatsapp.com": "WhatsApp",
+    "t.me": "Telegram",
+}
+
+SKIPPED_SCHEMES = ("javascript", "data")
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+
+def normalise_domain(netloc):
+    domain = netloc.lower().split("@")[-1]
+    domain = domain.rsplit(":", 1)[0] if domain.endswith((":80", ":443")) else domain
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def normalise_url(href, base_url):
+    """Resolve an href against its page and strip fragments, tracking params and trailing slashes"""
+    href = (href or "").strip()
+    if not href or href.startswith("#"):
+        return None
+
+    parsed = urlparse(urljoin(base_url, href))
+    scheme = parsed.scheme.lower()
+    if scheme in SKIPPED_SCHEMES:
+        return None
+    if scheme in ("mailto", "tel"):
+        return f"{scheme}:{parsed.path.lower()}"
+
+    query = urlencode([(k, v) for k, v in parse_qsl(parsed.query) if not k.lower().startswith(TRACKING_PARAMS)])
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((scheme, normalise_domain(parsed.netloc), path, "", query, ""))
+
+
+def url_domain(url):
+    parsed = urlparse(url)
+    if parsed.scheme in ("mailto", "tel"):
+        return parsed.scheme
+    return parsed.netloc
+
+
+def platform_for(domain):
+    if domain == "mailto":
+        return "E-mail"
+    if domain == "tel":
+        return "Phone"
+    for suffix, platform in PLATFORMS.items():
+        if domain == suffix or domain.endswith("." + suffix):
+            return platform
+    return "Other"
+
+
+class LinkGraph:
+    """Page-to-page link graph with URLs and domains interned to integer IDs"""
+
+    def __init__(self):
+        self._url_ids = {}
+        self._urls = []
+        self._hrefs = []  # url id -> the first href seen for it, resolved but not normalised
+        self._url_domain = []  # url id -> domain id
+        self._domain_ids = {}
+        self._domains = []
+        self._pages = set()  # url ids whose outgoing links have been recorded
+        self.edges = Counter()  # (source url id, target url id) -> count
+        self._lock = threading.Lock()
+
+    def _intern_domain(self, domain):
+        domain_id = self._domain_ids.get(domain)
+        if domain_id is None:
+            domain_id = len(self._domains)
+            self._domain_ids[domain] = domain_id
+            self._domains.append(domain)
+        return domain_id
+
+    def intern(self, url, href=None):
+        url_id = self._url_ids.get(url)
+        if url_id is None:
+            url_id = len(self._urls)
+            self._url_ids[url] = url_id
+            self._urls.append(url)
+            self._hrefs.append(href or url)
+            self._url_domain.append(self._intern_domain(url_domain(url)))
+        return url_id
+
+    def add_page(self, page_url, soup):
+        """Record every <a href> on an already parsed page. Pages seen before are skipped."""
+        source_url = normalise_url(page_url, page_url)
+        if not source_url:
+            return False
+
+        targets = []
+        for a_tag in soup.find_all("a", href=True):
+            target_url = normalise_url(a_tag["href"], page_url)
+            if target_url and target_url != source_url:
+                # The href as written is kept too: the normalised URL drops www. and may not resolve
+                targets.append((target_url, urldefrag(urljoin(page_url, a_tag["href"].strip()))[0]))
+
+        with self._lock:
+            source_id = self.intern(source_url, page_url)
+            if source_id in self._pages:
+                return False
+            self._pages.add(source_id)
+            for target_url, href in targets:
+                self.edges[(source_id, self.intern(target_url, href))] += 1
+        return True
+
+    def is_internal(self, source_id, target_id):
+        return self._url_domain[source_id] == self._url_domain[target_id]
+
+    def edges_frame(self):
+        rows = [{
+            "Source": self._urls[source_id],
+            "Target": self._urls[target_id],
+            "Target Href": self._hrefs[target_id],
+            "Internal": self.is_internal(source_id, target_id),
+            "Count": count
+        } for (source_id, target_id), count in self.edges.items()]
+        return pd.DataFrame(rows, columns=["Source", "Target", "Target Href", "Internal", "Count"])
+
+    def domain_stats(self):
+        """Outbound link counts aggregated per (source domain, target domain)"""
+        links = Counter()
+        pages = {}
+        for (source_id, target_id), count in self.edges.items():
+            key = (self._url_domain[source_id], self._url_domain[target_id])
+            links[key] += count
+            pages.setdefault(key, set()).add(source_id)
+
+        rows = []
+        for (source_domain, target_domain), count in links.items():
+            target = self._domains[target_domain]
+            rows.append({
+                "Source Domain": self._domains[source_domain],
+                "Target Domain": target,
+                "Platform": "Internal" if source_domain == target_domain else platform_for(target),
+                "Links": count,
+                "Pages": len(pages[(source_domain, target_domain)])
+            })
+        df = pd.DataFrame(rows, columns=["Source Domain", "Target Domain", "Platform", "Links", "Pages"])
+        return df.sort_values(["Source Domain", "Links"], ascending=[True, False], ignore_index=True)
+
+    def save(self, folder_name):
+        if not self.edges:
+            print("No links recorded")
+            return None
+
+        os.makedirs(folder_name, exist_ok=True)
+        with self._lock:
+            edges_df = self.edges_frame()
+            domains_df = self.domain_stats()
+        edges_df.to_csv(os.path.join(folder_name, "link_edges.csv"), index=False)
+        domains_df.to_csv(os.path.join(folder_name, "link_domains.csv"), index=False)
+        print(f"Saved {len(edges_df)} link edges across {len(self._pages)} pages to {folder_name}")
+        return domains_df
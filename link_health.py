@@ -0,0 +1,231 @@
+import os
+import time
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+import requests
+import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from sites import SITES, ROOT, site_path
+from link_graph import normalise_url
+from instrumentation import span, count
+from collection_crawler import PER_HOST, DELAY
+from sitemap import PAGE_LINKS_FILE
+
+HEALTH_PATH = os.path.join(ROOT, "link_health.csv")
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+CONCURRENCY = 20  # requests in flight across all hosts
+TIMEOUT = 15
+MAX_HOPS = 10
+MAX_CHECKS = 5000  # links checked per run; never-checked and oldest results go first
+HEALTHY_TTL_HOURS = 72
+BROKEN_TTL_HOURS = 6  # broken links are checked again sooner, in case the failure was transient
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+HEALTH_COLUMNS = [
+    "URL", "Status", "Broken", "Final URL", "Redirects", "Redirect Chain", "Latency ms", "Method", "Error",
+    "Checked At", "Sites", "Found On",
+]
+
+
+def extracted_links(site_names=None):
+    """{normalised URL: {"url", "sites", "found_on"}} over every link the scrapers and the sitemap recrawl extracted"""
+    links = {}
+
+    def add(key, url, site_name, found_on):
+        if not key or not key.startswith(("http://", "https://")):
+            return
+        link = links.setdefault(key, {"url": url, "sites": set(), "found_on": found_on})
+        link["sites"].add(site_name)
+
+    for site_name in site_names or SITES:
+        home = SITES[site_name]["url"]
+        path = site_path(site_name, "data_folder", "backlinks.csv")
+        if os.path.exists(path):
+            backlinks = pd.read_csv(path)
+            # Beytech and Abed write URL, Hamdan writes Link
+            column = next((column for column in ("URL", "Link") if column in backlinks.columns), None)
+            for url in backlinks[column].dropna() if column else []:
+                add(normalise_url(url, home), urljoin(home, url.strip()), site_name, home)
+        # Edge targets are already normalised; the href as found on the page is what gets requested
+        for file_name in ("link_edges.csv", PAGE_LINKS_FILE):
+            path = site_path(site_name, "data_folder", file_name)
+            if os.path.exists(path):
+                edges = pd.read_csv(path).dropna(subset=["Source", "Target"])
+                hrefs = edges["Target Href"].fillna(edges["Target"]) if "Target Href" in edges.columns else edges["Target"]
+                for source, target, href in zip(edges["Source"], edges["Target"], hrefs):
+                    add(target, href, site_name, source)
+    return links
+
+
+class AsyncHostLimiter:
+    """HostLimiter for coroutines: at most per_host requests in flight per host, started delay seconds apart"""
+
+    def __init__(self, per_host=PER_HOST, delay=DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._slots = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc
+        async with self._slots.setdefault(host, asyncio.Semaphore(self.per_host)):
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+            await asyncio.sleep(start - now)
+            yield
+
+
+class LinkChecker:
+    """Status and redirect chain of many links, checked concurrently.
+
+    Each hop is a HEAD request, confirmed with a GET (body not read) when HEAD fails or is
+    refused, since many servers answer HEAD with 403/405. Redirects are followed by hand so
+    every hop is recorded. requests runs in a thread pool as wide as the concurrency limit.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, per_host=PER_HOST, delay=DELAY):
+        self.concurrency = concurrency
+        self.hosts = AsyncHostLimiter(per_host, delay)
+        self.limit = self.executor = None  # created by run, for the event loop that uses them
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method, url):
+        response = self.session.request(method, url, allow_redirects=False, timeout=TIMEOUT, stream=method == "GET")
+        response.close()  # status and headers are all a check needs
+        return response
+
+    async def request(self, url):
+        """(response, method) of one hop"""
+        loop = asyncio.get_running_loop()
+        # The host slot first: waiting on a busy host must not hold one of the global permits
+        async with self.hosts.slot(url), self.limit:
+            try:
+                response = await loop.run_in_executor(self.executor, self._request, "HEAD", url)
+                if response.status_code < 400:
+                    return response, "HEAD"
+            except requests.exceptions.RequestException:
+                pass
+            count("link_get_fallbacks")
+            return await loop.run_in_executor(self.executor, self._request, "GET", url), "GET"
+
+    async def check(self, key, url):
+        """Health row of one link, following its redirects hop by hop"""
+        chain = [url]
+        status = error = None
+        method = "HEAD"
+        redirects = 0
+        started = time.perf_counter()
+        try:
+            for _ in range(MAX_HOPS + 1):
+                response, method = await self.request(chain[-1])
+                status = response.status_code
+                location = response.headers.get("Location")
+                if status not in REDIRECT_CODES or not location:
+                    break
+                target = urljoin(chain[-1], location)
+                if target in chain:
+                    error = "Redirect loop"
+                    break
+                # Links are stored normalised, so a hop that only restores the trailing slash is not the link's own redirect
+                if normalise_url(target, target) != normalise_url(chain[-1], chain[-1]):
+                    redirects += 1
+                chain.append(target)
+            else:
+                error = f"More than {MAX_HOPS} redirects"
+        except requests.exceptions.RequestException as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+
+        broken = error is not None or status is None or status >= 400 or status in REDIRECT_CODES
+        count("links_checked")
+        if broken:
+            count("links_broken")
+        return {
+            "URL": key,
+            "Status": status,
+            "Broken": broken,
+            "Final URL": chain[-1],
+            "Redirects": redirects,
+            "Redirect Chain": " -> ".join(chain) if len(chain) > 1 else "",
+            "Latency ms": round((time.perf_counter() - started) * 1000),
+            "Method": method,
+            "Error": error,
+            "Checked At": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    async def run(self, links):
+        """Health rows of [(key, url)]"""
+        self.limit = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as self.executor:
+            return await asyncio.gather(*(self.check(key, url) for key, url in links))
+
+
+def load_health(path=HEALTH_PATH):
+    return pd.read_csv(path) if os.path.exists(path) else pd.DataFrame(columns=HEALTH_COLUMNS)
+
+
+def due_links(links, cache, max_checks=MAX_CHECKS, force=False, now=None):
+    """Links whose cached result is missing or older than its TTL, never-checked and oldest first"""
+    checked_at = dict(zip(cache["URL"], pd.to_datetime(cache["Checked At"], errors="coerce")))
+    broken = dict(zip(cache["URL"], cache["Broken"].astype(str) == "True"))
+    now = pd.Timestamp(now or datetime.now())
+
+    due = []
+    for key in links:
+        last = checked_at.get(key)
+        if last is None or pd.isna(last):
+            due.append((pd.Timestamp.min, key))
+            continue
+        ttl = BROKEN_TTL_HOURS if broken.get(key) else HEALTHY_TTL_HOURS
+        if force or now - last > pd.Timedelta(hours=ttl):
+            due.append((last, key))
+    return [key for _, key in sorted(due)[:max_checks]]
+
+
+def check_links(site_names=None, max_checks=MAX_CHECKS, force=False, concurrency=CONCURRENCY):
+    """Check every extracted link whose cached result expired and rewrite link_health.csv"""
+    links = extracted_links(site_names)
+    cache = load_health()
+    due = due_links(links, cache, max_checks, force)
+    print(f"{len(links)} distinct links extracted; {len(due)} due for a check, {len(links) - len(due)} cached")
+
+    rows = []
+    if due:
+        started = time.perf_counter()
+        with span("link_checks", links=len(due)):
+            rows = asyncio.run(LinkChecker(concurrency).run([(key, links[key]["url"]) for key in due]))
+        print(f"Checked {len(rows)} links in {time.perf_counter() - started:.1f}s")
+
+    # Links no longer extracted anywhere are dropped; unchecked ones keep their cached result
+    cached = cache[cache["URL"].isin(links) & ~cache["URL"].isin(due)]
+    health = pd.concat([cached, pd.DataFrame(rows)], ignore_index=True).reindex(columns=HEALTH_COLUMNS)
+    health["Sites"] = health["URL"].map(lambda key: "; ".join(sorted(links[key]["sites"])))
+    health["Found On"] = health["URL"].map(lambda key: links[key]["found_on"])
+    health = health.sort_values(["Broken", "Redirects"], ascending=False, ignore_index=True)
+    health.to_csv(HEALTH_PATH, index=False)
+
+    broken = health["Broken"].astype(str) == "True"
+    redirected = pd.to_numeric(health["Redirects"], errors="coerce").fillna(0) > 0
+    print(f"Link health saved to {HEALTH_PATH}: {broken.sum()} broken, {redirected.sum()} redirected")
+    return health
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check extracted links for broken targets and redirect chains")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--max-checks", type=int, default=MAX_CHECKS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--force", action="store_true", help="Ignore cached results")
+    args = parser.parse_args()
+    check_links(args.sites, args.max_checks, args.force, args.concurrency)
@@ -1,7 +1,22 @@
 import os
 import subprocess
 
+import instrumentation
+import sitemap
+import link_analysis
+import link_health
+import product_matching
+import dictionary_tagger
+import seo_scoring
+import collection_crawler
+import site_similarity
+from instrumentation import span
+
 def run_scrapers(base_path="."):
+    # Scraper subprocesses write their spans and counters into this run's file
+    env = {**os.environ, "SCRAPER_RUN_ID": instrumentation.RUN_ID}
+    instrumentation.prune_runs()
+
     for root, dirs, files in os.walk(base_path):
         print(f"Checking directory: {root}")
 
@@ -9,7 +24,8 @@ def run_scrapers(base_path="."):
             scrape_path = os.path.join(root, 'scrape.py')
             print(f"Found and running: {scrape_path}")
             try:
-                result = subprocess.run(["python", scrape_path], check=True, capture_output=True, text=True)
+                with span("scrape", target=root):
+                    result = subprocess.run(["python", scrape_path], check=True, capture_output=True, text=True, env=env)
                 print(f"Success: {scrape_path}\n{result.stdout}")
             except subprocess.CalledProcessError as e:
                 print(f"Failed to run scrape.py:\n{e.stderr}")
@@ -19,12 +35,76 @@ def run_scrapers(base_path="."):
             if 'clean.py' in files:
                 print(f"Running clean script: {clean_path}")
                 try:
-                    clean_result = subprocess.run(["python", clean_path], check=True, capture_output=True, text=True)
+                    with span("clean", target=root):
+                        clean_result = subprocess.run(["python", clean_path], check=True, capture_output=True, text=True, env=env)
                     print(f"Success: {clean_path}\n{clean_result.stdout}")
                 except subprocess.CalledProcessError as e:
                     print(f"Failed to run clean.py:\n{e.stderr}")
             else:
                 print(f"clean.py not found in {root}")
 
+def crawl_catalogues():
+    try:
+        with span("catalogue"):
+            collection_crawler.crawl_catalogues()
+    except Exception as e:
+        print(f"Failed to crawl catalogues: {e}")
+
+def recrawl_sitemaps():
+    try:
+        with span("sitemap"):
+            sitemap.recrawl_sites()
+    except Exception as e:
+        print(f"Failed to recrawl sitemaps: {e}")
+
+def analyse_links():
+    try:
+        with span("link_analysis"):
+            link_analysis.analyse_links()
+    except Exception as e:
+        print(f"Failed to analyse internal links: {e}")
+
+def check_link_health():
+    try:
+        with span("link_health"):
+            link_health.check_links()
+    except Exception as e:
+        print(f"Failed to check link health: {e}")
+
+def match_products():
+    try:
+        with span("product_matching"):
+            product_matching.update_matches()
+    except Exception as e:
+        print(f"Failed to match products across shops: {e}")
+
+def tag_products():
+    try:
+        with span("product_tags"):
+            dictionary_tagger.tag_products()
+    except Exception as e:
+        print(f"Failed to tag products: {e}")
+
+def update_seo_scores():
+    try:
+        with span("scoring"):
+            seo_scoring.update_scores()
+    except Exception as e:
+        print(f"Failed to update SEO scores: {e}")
+
+    try:
+        with span("similarity"):
+            site_similarity.update_similarity()
+    except Exception as e:
+        print(f"Failed to update site similarity: {e}")
+
 if __name__ == "__main__":
     run_scrapers()
+    crawl_catalogues()
+    recrawl_sitemaps()
+    analyse_links()
+    check_link_health()
+    match_products()
+    tag_products()
+    update_seo_scores()
+    print(f"Run metrics written to {instrumentation.run_path()}")
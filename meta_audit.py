@@ -0,0 +1,147 @@
+import os
+import argparse
+import threading
+
+import pandas as pd
+
+from sites import SITES, site_path
+from link_graph import normalise_url
+
+TITLE_LENGTH = (30, 60)
+DESCRIPTION_LENGTH = (50, 160)
+
+# Columns of the page x tag table (one row per crawled page)
+META_TAGS = [
+    "title", "description", "canonical", "robots", "viewport",
+    "og:title", "og:description", "og:image", "og:url",
+    "twitter:card", "twitter:title", "twitter:description",
+]
+
+
+def _between(lengths, bounds):
+    return lengths.between(*bounds)
+
+
+# Rule name -> check over the whole page table, returning one bool per page (True = pass)
+RULES = {
+    "title_present": lambda t: t["title"].str.len() > 0,
+    "title_length_ok": lambda t: _between(t["title"].str.len(), TITLE_LENGTH),
+    "description_present": lambda t: t["description"].str.len() > 0,
+    "description_length_ok": lambda t: _between(t["description"].str.len(), DESCRIPTION_LENGTH),
+    "viewport_present": lambda t: t["viewport"].str.len() > 0,
+    "canonical_present": lambda t: t["canonical"].str.len() > 0,
+    "canonical_self": lambda t: (t["canonical"].str.len() == 0) | (t["canonical_url"] == t["page_url"]),
+    "robots_present": lambda t: t["robots"].str.len() > 0,
+    "indexable": lambda t: ~t["robots"].str.lower().str.contains("noindex", regex=False),
+    "og_complete": lambda t: (t[["og:title", "og:description", "og:image"]].apply(lambda c: c.str.len() > 0)).all(axis=1),
+    "twitter_card_present": lambda t: t["twitter:card"].str.len() > 0,
+    "hreflang_present": lambda t: t["hreflang"].str.len() > 0,
+    "title_unique": lambda t: ~(t["title"].str.len().gt(0) & t.duplicated(["site", "title"], keep=False)),
+    "description_unique": lambda t: ~(t["description"].str.len().gt(0) & t.duplicated(["site", "description"], keep=False)),
+}
+
+# The checks calculate_meta_tag_strength_from_data scored (7 points)
+STRENGTH_RULES = [
+    "title_present", "title_length_ok", "description_present", "description_length_ok",
+    "viewport_present", "canonical_present", "robots_present",
+]
+
+
+def page_tags(soup):
+    """The audited tags of one parsed page, as a flat dict"""
+    tags = dict.fromkeys(META_TAGS, "")
+    if soup.title and soup.title.string:
+        tags["title"] = soup.title.string.strip()
+    for meta in soup.find_all("meta"):
+        name = (meta.get("name") or meta.get("property") or "").strip().lower()
+        if name in tags and name != "title" and not tags[name]:
+            tags[name] = (meta.get("content") or "").strip()
+
+    hreflangs = []
+    for link in soup.find_all("link", href=True):
+        rel = [value.lower() for value in (link.get("rel") or [])]
+        if "canonical" in rel and not tags["canonical"]:
+            tags["canonical"] = link["href"].strip()
+        if "alternate" in rel and link.get("hreflang"):
+            hreflangs.append(link["hreflang"].strip())
+    tags["hreflang"] = ", ".join(hreflangs)
+    return tags
+
+
+def audit(table):
+    """Run every rule over a page table; returns the table with one bool column per rule and a score"""
+    table = table.copy()
+    for column in META_TAGS + ["hreflang"]:
+        table[column] = table[column].fillna("").astype(str)
+    table["page_url"] = [normalise_url(url, url) for url in table["url"]]
+    table["canonical_url"] = [
+        normalise_url(canonical, url) if canonical else "" for canonical, url in zip(table["canonical"], table["url"])
+    ]
+
+    for rule, check in RULES.items():
+        table[rule] = check(table).astype(bool)
+    table["strength_score"] = (table[STRENGTH_RULES].sum(axis=1) / len(STRENGTH_RULES) * 100).round(2)
+    table["issues"] = table[list(RULES)].eq(False).sum(axis=1)
+    return table.drop(columns=["page_url", "canonical_url"])
+
+
+def summarise(audited):
+    """Per-site pass rates for every rule, duplicate counts and the mean strength score"""
+    grouped = audited.groupby("site")
+    summary = (grouped[list(RULES)].mean() * 100).round(2).add_suffix(" %")
+    summary.insert(0, "Pages", grouped.size())
+    summary["Duplicate Titles"] = grouped["title_unique"].apply(lambda s: int((~s).sum()))
+    summary["Duplicate Descriptions"] = grouped["description_unique"].apply(lambda s: int((~s).sum()))
+    summary["Mean Strength Score"] = grouped["strength_score"].mean().round(2)
+    return summary.reset_index().rename(columns={"site": "Site"})
+
+
+class MetaAudit:
+    """Collects the meta tags of every page fetch_html parses, for one audit per run"""
+
+    def __init__(self, site):
+        self.site = site
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def add_page(self, page_url, soup):
+        tags = page_tags(soup)
+        with self._lock:
+            self.rows.setdefault(page_url, {"site": self.site, "url": page_url, **tags})
+
+    def frame(self):
+        with self._lock:
+            rows = list(self.rows.values())
+        return pd.DataFrame(rows, columns=["site", "url"] + META_TAGS + ["hreflang"])
+
+    def save(self, folder_name):
+        if not self.rows:
+            print("No pages to audit")
+            return None
+
+        audited = audit(self.frame())
+        summary = summarise(audited)
+        os.makedirs(folder_name, exist_ok=True)
+        audited.to_csv(os.path.join(folder_name, "meta_audit.csv"), index=False)
+        summary.to_csv(os.path.join(folder_name, "meta_audit_summary.csv"), index=False)
+        print(f"Meta audit of {len(audited)} pages saved to {folder_name}")
+        return summary
+
+
+def audit_sites(site_names=None):
+    """Re-run the rules over the saved page tables of several sites together"""
+    frames = []
+    for site_name in site_names or SITES:
+        path = site_path(site_name, "data_folder", "meta_audit.csv")
+        if os.path.exists(path):
+            frames.append(pd.read_csv(path, usecols=["site", "url"] + META_TAGS + ["hreflang"]))
+    if not frames:
+        return pd.DataFrame()
+    return summarise(audit(pd.concat(frames, ignore_index=True)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-site summary of the saved meta tag audits")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    args = parser.parse_args()
+    print(audit_sites(args.sites).to_string(index=False))
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import time
+import logging
+from urllib.parse import urljoin, urlparse
+
+import structured_data
+from sites import SITES
+from link_graph import normalise_url
+from instrumentation import span, count
+
+ENDPOINTS_FILE = "captured_endpoints.json"
+ENDPOINT_TTL_HOURS = 24  # a browser run re-learns each section's endpoint at least this often
+
+# JSON requests worth reading per site, and the links that identify a section's product cards
+SITE_CAPTURE = {
+    "Abed Tahhan": {
+        "patterns": [r"/products\.json", r"/collections/[^?]+\.json", r"/recommendations/products\.json", r"/search/suggest\.json"],
+        "link_selector": "a[href*='/products/']",
+    },
+    "Beytech": {
+        "patterns": [r"/wp-json/wc/store/", r"[?&]wc-ajax=", r"admin-ajax\.php"],
+        "link_selector": "a[href*='/product/']",
+    },
+    "Hamdan electronics": {
+        "patterns": [r"[?&]ajax=", r"/module/"],
+        "link_selector": "article.product-miniature a[href]",
+    },
+}
+
+
+def _generic_fields(item, base_url):
+    url = item.get("url") or item.get("permalink") or item.get("link")
+    price = item.get("price_amount", item.get("price"))
+    if isinstance(price, dict):
+        price = price.get("amount") or price.get("value")
+    return {
+        "name": item.get("name") or item.get("title"),
+        "sku": item.get("sku") or item.get("reference"),
+        "brand": item.get("vendor") or item.get("manufacturer_name"),
+        "price": str(price) if price is not None else None,
+        "original_price": item.get("regular_price_amount") or item.get("regular_price") or item.get("compare_at_price"),
+        "currency": None,
+        "availability": None,
+        "url": urljoin(base_url, url) if url else None,
+        "images": [],
+    }
+
+
+def _product_lists(data):
+    """Candidate product lists inside a JSON body, outermost first"""
+    stack = [data]
+    while stack:
+        node = stack.pop(0)
+        if isinstance(node, list):
+            if node and all(isinstance(item, dict) for item in node):
+                yield node
+            continue
+        if isinstance(node, dict):
+            stack.extend(node.values())
+
+
+# Mapper name -> (recognises a list item, maps it to structured_data fields)
+MAPPERS = {
+    "shopify": (lambda item: "handle" in item and "variants" in item, structured_data.shopify_fields),
+    "woocommerce_store": (lambda item: "prices" in item and "permalink" in item, lambda item, _: structured_data.woocommerce_fields(item)),
+    "generic": (lambda item: bool(item.get("name") or item.get("title")) and "price" in item and bool(item.get("url") or item.get("permalink") or item.get("link")), _generic_fields),
+}
+
+
+def map_products(data, base_url, mapper=None):
+    """(mapper name, product fields) for the first product list in a JSON body that a mapper recognises"""
+    for items in _product_lists(data):
+        for name, (recognises, to_fields) in MAPPERS.items():
+            if (mapper is None or name == mapper) and recognises(items[0]):
+                products = [to_fields(item, base_url) for item in items if recognises(item)]
+                return name, [product for product in products if product["name"] and product["url"]]
+    return None, []
+
+
+def product_id(url):
+    """Last path segment of a product URL; collection-scoped and plain Shopify links share it"""
+    normalised = normalise_url(url, url) if url else None
+    return urlparse(normalised).path.rstrip("/").rsplit("/", 1)[-1] if normalised else None
+
+
+class NetworkCapture:
+    """JSON responses seen while the browser loaded the homepage, matched to the sections they fill.
+
+    An endpoint whose first products are exactly a section's cards is remembered, so when every
+    section was filled that way, later runs replay the endpoints over plain HTTP instead.
+    """
+
+    def __init__(self, site_name, folder_name):
+        config = SITE_CAPTURE.get(site_name, {"patterns": [], "link_selector": "a[href]"})
+        self.base_url = SITES[site_name]["url"]
+        self.patterns = [re.compile(pattern) for pattern in config["patterns"]]
+        self.link_selector = config["link_selector"]
+        self.path = os.path.join(folder_name, ENDPOINTS_FILE)
+        self.responses = []  # (url, mapper, products)
+        self.learned = {}
+        self.cached = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.cached = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Ignoring unreadable endpoint cache {self.path}: {e}")
+
+    def collect(self, responses):
+        """Keep the product lists of the page's JSON responses, from Page.json_responses(self.patterns)"""
+        for url, data in responses:
+            mapper, products = map_products(data, self.base_url)
+            if products:
+                count("captured_responses")
+                self.responses.append((url, mapper, products))
+        if self.responses:
+            print(f"Captured {len(self.responses)} product JSON response(s)")
+
+    def section_products(self, title, hrefs):
+        """Products of a section straight from a captured response covering all its cards, else None;
+        hrefs are the section's links matching link_selector"""
+        if not self.responses:
+            return None
+        cards = list(dict.fromkeys(filter(None, (product_id(href) for href in hrefs))))
+        if not cards:
+            return None
+
+        for url, mapper, products in self.responses:
+            by_id = {product_id(product["url"]): product for product in products}
+            if not all(card in by_id for card in cards):
+                continue
+            count("sections_from_capture")
+            if [product_id(product["url"]) for product in products[:len(cards)]] == cards:
+                self.learned[title] = {"url": url, "mapper": mapper, "limit": len(cards), "learned_at": time.time()}
+            return [by_id[card] for card in cards]
+        return None
+
+    def _fresh(self, endpoint, ttl_hours):
+        # Files written before endpoints kept their own time carry one for the whole file
+        learned_at = endpoint.get("learned_at", self.cached.get("learned_at", 0))
+        return time.time() - learned_at <= ttl_hours * 3600
+
+    def save(self, product_data, ttl_hours=ENDPOINT_TTL_HOURS):
+        """Remember the learned endpoints, and whether they cover every section of this run"""
+        titles = list(dict.fromkeys(row["Main Category"] for row in product_data))
+        # Sections carried forward unchanged were not re-captured; their earlier endpoint holds
+        # until it is as old as the TTL, and it keeps the time it was learned at
+        cached = {
+            title: {**endpoint, "learned_at": endpoint.get("learned_at", self.cached.get("learned_at", 0))}
+            for title, endpoint in self.cached.get("sections", {}).items() if self._fresh(endpoint, ttl_hours)
+        }
+        known = {**cached, **self.learned}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({
+                "complete": bool(titles) and all(title in known for title in titles),
+                "sections": {title: known[title] for title in titles if title in known},
+            }, f, ensure_ascii=False, indent=2)
+
+    def replay(self, ttl_hours=ENDPOINT_TTL_HOURS):
+        """[(section title, products)] from the remembered endpoints over plain HTTP; empty unless
+        the last browser run filled every section from them, none is older than the TTL and they
+        all still answer"""
+        endpoints = self.cached.get("sections", {})
+        if not self.cached.get("complete") or not all(self._fresh(endpoint, ttl_hours) for endpoint in endpoints.values()):
+            return []
+        sections = []
+        with span("endpoint_replay", url=self.base_url):
+            for title, endpoint in self.cached["sections"].items():
+                data = structured_data.get_json(endpoint["url"])
+                _, products = map_products(data, self.base_url, endpoint["mapper"]) if data is not None else (None, [])
+                if not products:
+                    print(f"Endpoint for {title} returned no products; loading the page in the browser")
+                    return []
+                sections.append((title, products[:endpoint["limit"]]))
+        count("endpoint_replays")
+        return sections
@@ -0,0 +1,58 @@
+import os
+import re
+import hashlib
+import unicodedata
+
+import pandas as pd
+
+from link_graph import normalise_url
+
+SECTION_SEPARATOR = " | "
+MISSING_NAMES = {"", "n/a", "nan"}
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_name(name):
+    name = unicodedata.normalize("NFKC", str(name)).lower().replace('"', "'")
+    return WHITESPACE.sub(" ", name).strip()
+
+
+def product_key(name, url=None):
+    """Stable short ID of a product: its normalised URL when known, else its normalised name"""
+    normalised_url = normalise_url(url, url) if isinstance(url, str) and url.strip() else None
+    basis = f"url:{normalised_url}" if normalised_url else f"name:{normalise_name(name)}"
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()[:16]
+
+
+def dedupe_products(df, name_column="Product Name", url_column="Product URL", section_column="Main Category"):
+    """One row per product, keeping its first occurrence, with every section it appeared in.
+
+    Rows without a usable name are dropped. The first section stays in Main Category;
+    Sections lists them all in page order.
+    """
+    df = df[~df[name_column].fillna("").astype(str).map(normalise_name).isin(MISSING_NAMES)].copy()
+    if df.empty:
+        return df.assign(Sections=pd.Series(dtype=str), **{"Product Key": pd.Series(dtype=str)})
+
+    urls = df[url_column] if url_column in df.columns else [None] * len(df)
+    df["Product Key"] = [product_key(name, url) for name, url in zip(df[name_column], urls)]
+    sections = df.groupby("Product Key", sort=False)[section_column].agg(
+        lambda s: SECTION_SEPARATOR.join(dict.fromkeys(s.dropna().astype(str)))
+    )
+    df = df.drop_duplicates("Product Key", keep="first")
+    df["Sections"] = df["Product Key"].map(sections)
+    return df.reset_index(drop=True)
+
+
+def append_csv(df, csv_path):
+    """Append rows to a CSV, rewriting it once when the rows bring columns its header lacks"""
+    if not os.path.exists(csv_path):
+        df.to_csv(csv_path, index=False)
+        return
+
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    if [column for column in df.columns if column not in header]:
+        existing = pd.read_csv(csv_path)
+        pd.concat([existing, df], ignore_index=True).to_csv(csv_path, index=False)
+    else:
+        df.reindex(columns=header).to_csv(csv_path, mode="a", header=False, index=False)
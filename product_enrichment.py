@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from sites import SITES, site_path
+from link_graph import normalise_url
+from instrumentation import span, count
+from structured_data import json_ld_product, microdata_product
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+CACHE_FILE = "product_details_cache.json"
+DETAILS_FILE = "product_details.csv"
+DEFAULT_TTL_HOURS = 24
+MAX_WORKERS = 6
+
+DETAIL_COLUMNS = [
+    "Product URL", "Canonical URL", "Name", "SKU", "Brand", "Price", "Currency",
+    "Availability", "Image Alt", "Images Missing Alt", "Has Structured Data", "Fetched At",
+]
+
+
+def parse_product_page(url, html):
+    """Product details of one detail page: JSON-LD, then microdata, then page tags for what they leave out"""
+    soup = BeautifulSoup(html, "html.parser")
+    product = json_ld_product(soup) or microdata_product(soup) or {}
+
+    canonical = soup.find("link", rel="canonical", href=True)
+    meta = {
+        (tag.get("property") or tag.get("name") or "").lower(): tag.get("content", "")
+        for tag in soup.find_all("meta") if tag.get("content")
+    }
+
+    images = [img for img in soup.find_all("img") if img.get("src") or img.get("data-src")]
+    product_images = {os.path.basename(src.split("?")[0]) for src in product.get("images", []) if src}
+    alts = [
+        img["alt"].strip() for img in images
+        if img.get("alt", "").strip()
+        and (not product_images or os.path.basename((img.get("src") or img.get("data-src")).split("?")[0]) in product_images)
+    ]
+
+    return {
+        "Product URL": url,
+        "Canonical URL": normalise_url(canonical["href"], url) if canonical else None,
+        "Name": product.get("name") or meta.get("og:title"),
+        "SKU": product.get("sku"),
+        "Brand": product.get("brand") or meta.get("product:brand"),
+        "Price": product.get("price") or meta.get("product:price:amount") or meta.get("og:price:amount"),
+        "Currency": product.get("currency") or meta.get("product:price:currency") or meta.get("og:price:currency"),
+        "Availability": product.get("availability") or meta.get("product:availability"),
+        "Image Alt": " | ".join(dict.fromkeys(alts[:3])) or None,
+        "Images Missing Alt": sum(1 for img in images if not img.get("alt", "").strip()),
+        "Has Structured Data": bool(product),
+    }
+
+
+class DetailCache:
+    """Parsed detail pages by URL; an entry is re-fetched once it is older than the TTL"""
+
+    def __init__(self, folder_name, ttl_hours=DEFAULT_TTL_HOURS):
+        self.path = os.path.join(folder_name, CACHE_FILE)
+        self.ttl = ttl_hours * 3600
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Ignoring unreadable detail cache {self.path}: {e}")
+
+    def fresh(self, url, now=None):
+        entry = self.entries.get(url)
+        return bool(entry) and (now or time.time()) - entry["fetched"] < self.ttl
+
+    def get(self, url):
+        return self.entries[url]["details"]
+
+    def put(self, url, details):
+        self.entries[url] = {"fetched": time.time(), "details": details}
+
+    def save(self, keep_urls):
+        # Products no longer listed are dropped once their entry goes stale
+        now = time.time()
+        self.entries = {url: e for url, e in self.entries.items() if url in keep_urls or now - e["fetched"] < self.ttl}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+
+
+def fetch_details(urls, max_workers=MAX_WORKERS):
+    """{url: details} for the given detail pages, fetched over plain HTTP by a bounded pool"""
+    local = threading.local()
+
+    def fetch(url):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.headers.update(HEADERS)
+        with span("detail_fetch", url=url):
+            response = local.session.get(url, timeout=15)
+            response.raise_for_status()
+        return parse_product_page(url, response.text)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                results[url] = future.result()
+                count("detail_pages")
+            except Exception as e:
+                count("detail_errors")
+                logging.error(f"Error fetching product page {url}: {e}")
+    return results
+
+
+def latest_product_urls(folder_name):
+    """Product URLs of the most recent run in products.csv"""
+    path = os.path.join(folder_name, "products.csv")
+    if not os.path.exists(path):
+        return []
+    df = pd.read_csv(path)
+    if "Product URL" not in df.columns or df.empty:
+        return []
+    latest = df[df["Timestamp"] == df["Timestamp"].max()]
+    return list(dict.fromkeys(latest["Product URL"].dropna().astype(str)))
+
+
+def enrich_products(folder_name, urls=None, ttl_hours=DEFAULT_TTL_HOURS, max_workers=MAX_WORKERS):
+    """Fetch the detail pages that are stale in the cache and write product_details.csv"""
+    urls = urls if urls is not None else latest_product_urls(folder_name)
+    if not urls:
+        print("No product URLs to enrich")
+        return None
+
+    cache = DetailCache(folder_name, ttl_hours)
+    stale = [url for url in urls if not cache.fresh(url)]
+    count("detail_cache_hits", len(urls) - len(stale))
+    print(f"Enriching {len(urls)} products: {len(stale)} detail page(s) to fetch, {len(urls) - len(stale)} cached")
+
+    for url, details in fetch_details(stale, max_workers).items():
+        cache.put(url, details)
+    cache.save(set(urls))
+
+    rows = [
+        {**cache.get(url), "Fetched At": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(cache.entries[url]["fetched"]))}
+        for url in urls if url in cache.entries
+    ]
+    df = pd.DataFrame(rows, columns=DETAIL_COLUMNS)
+    path = os.path.join(folder_name, DETAILS_FILE)
+    df.to_csv(path, index=False)
+    print(f"Product details of {len(df)} products saved to {path}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch product detail pages of the latest run and save product_details.csv")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--ttl-hours", type=float, default=DEFAULT_TTL_HOURS)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+    for site_name in args.sites:
+        enrich_products(site_path(site_name, "data_folder"), ttl_hours=args.ttl_hours, max_workers=args.workers)
@@ -0,0 +1,243 @@
+import os
+import re
+import zlib
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from sites import SITES, ROOT, site_path
+from product_dedup import normalise_name, product_key, MISSING_NAMES
+from collection_crawler import CATALOGUE_FILE
+from instrumentation import span, count
+
+STORE_DIR = os.path.join(ROOT, "matching")
+SIGNATURES_PATH = os.path.join(STORE_DIR, "signatures.npz")
+MATCHES_PATH = os.path.join(ROOT, "product_matches.csv")
+COMPARISON_PATH = os.path.join(ROOT, "price_comparison.csv")
+MATCHER_VERSION = 2  # bump when tokens or hashing change, so stored signatures and matches are rebuilt
+
+NUM_PERM = 64
+BANDS = 16  # 16 bands of 4 rows: names above ~0.5 Jaccard share a bucket with high probability
+MAX_BUCKET = 50  # buckets bigger than this hold generic words, not one product
+MATCH_THRESHOLD = 0.5
+MODEL_BONUS = 0.3  # a shared model number is strong evidence on its own
+PRIME = 4294967311  # first prime above 2**32; a * h + b stays below 2**64
+
+PRODUCT_COLUMNS = ["Timestamp", "Product Name", "Current Price", "Original Price", "Product URL"]
+MATCH_COLUMNS = ["ID A", "Site A", "Product A", "ID B", "Site B", "Product B", "Score", "Matched At"]
+
+# Capacity and size tokens, written the same way on every shop: "13 KG" and "13kg" -> 13kg
+UNITS = {
+    "kg": "kg", "gb": "gb", "tb": "tb", "mah": "mah", "btu": "btu", "rpm": "rpm", "hp": "hp", "v": "v",
+    "w": "w", "watt": "w", "watts": "w", "l": "l", "ltr": "l", "litre": "l", "litres": "l", "liter": "l", "liters": "l",
+    "ml": "ml", "cm": "cm", "mm": "mm", "in": "in", "inch": "in", "inches": "in", "'": "in", "''": "in",
+}
+SPEC = re.compile(r"(\d+(?:\.\d+)?)\s*(kg|gb|tb|mah|btu|rpm|watts?|w|litres?|liters?|ltr|l|ml|cm|mm|inch(?:es)?|in|''|'|hp|v)(?![a-z0-9])")
+WORD = re.compile(r"[a-z0-9]+(?:[-/.][a-z0-9]+)*")
+STOP_WORDS = {"with", "and", "the", "for", "of", "in", "by", "new", "series", "class", "inch", "inches"}
+
+_rng = np.random.default_rng(MATCHER_VERSION)
+_A = _rng.integers(1, 2 ** 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 32, NUM_PERM, dtype=np.uint64)
+
+
+def parse_price(value):
+    """First number in a price, thousands separators dropped: "1,299.00 JOD" -> 1299.0"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(value))
+    return float(match.group().replace(",", "")) if match else np.nan
+
+
+def name_tokens(name):
+    """Brand, model numbers, specs and the full token set of a product name"""
+    text = normalise_name(name)
+    specs = {}
+
+    def spec(match):
+        unit = UNITS[match.group(2)]
+        specs.setdefault(unit, set()).add(f"{float(match.group(1)):g}")
+        return " "
+
+    text = SPEC.sub(spec, text)
+    words = [word.replace("-", "").replace("/", "") for word in WORD.findall(text)]
+    words = [word for word in words if word and word not in STOP_WORDS]
+    models = {word for word in words if len(word) >= 3 and re.search(r"\d", word) and re.search(r"[a-z]", word)}
+    tokens = set(words) | {value + unit for unit, values in specs.items() for value in values}
+    return {"brand": words[0] if words else "", "models": models, "specs": specs, "tokens": tokens}
+
+
+def match_score(a, b):
+    """Similarity of two names' tokens in [0, 1]; 0 when brand, model or a shared spec disagree"""
+    if a["brand"] != b["brand"]:
+        return 0.0
+    if a["models"] and b["models"] and not a["models"] & b["models"]:
+        return 0.0
+    for unit in a["specs"].keys() & b["specs"].keys():
+        if not a["specs"][unit] & b["specs"][unit]:
+            return 0.0  # 13 KG and 15 KG are different washers
+    union = a["tokens"] | b["tokens"]
+    if not union:
+        return 0.0
+    score = len(a["tokens"] & b["tokens"]) / len(union)
+    return min(1.0, score + (MODEL_BONUS if a["models"] & b["models"] else 0.0))
+
+
+def minhash(tokens):
+    """MinHash signature of a token set: per permutation, the smallest (a * crc32 + b) mod PRIME"""
+    if not tokens:
+        return np.full(NUM_PERM, PRIME, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens))
+    return ((np.outer(_A, hashes) + _B[:, None]) % PRIME).min(axis=1)
+
+
+def candidate_pairs(signatures, sites, new):
+    """Row pairs (i < j) from different sites that share an LSH band bucket, at least one of them new.
+
+    Each band of signature values is hashed to a bucket, so only products sharing a bucket
+    are ever compared instead of every product against every other.
+    """
+    rows = NUM_PERM // BANDS
+    frames = []
+    for band in range(BANDS):
+        chunk = pd.DataFrame(signatures[:, band * rows:(band + 1) * rows])
+        frames.append(pd.DataFrame({
+            "band": band,
+            "bucket": pd.util.hash_pandas_object(chunk, index=False).to_numpy(),
+            "row": np.arange(len(chunk)),
+            "new": new,
+        }))
+    buckets = pd.concat(frames, ignore_index=True)
+    grouped = buckets.groupby(["band", "bucket"])
+    size = grouped["row"].transform("size")
+    buckets = buckets[(size > 1) & (size <= MAX_BUCKET) & grouped["new"].transform("any")]
+    pairs = buckets.merge(buckets, on=["band", "bucket"])
+    i, j = pairs["row_x"].to_numpy(), pairs["row_y"].to_numpy()
+    keep = (i < j) & (sites[i] != sites[j]) & (new[i] | new[j])
+    if not keep.any():
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.stack([i[keep], j[keep]], axis=1), axis=0)
+
+
+def site_products(site_name):
+    """Latest name, prices and URL of every product a site lists, from its catalogue and scraped sections"""
+    frames = []
+    for file_name in (CATALOGUE_FILE, "cleaned_Csv.csv"):
+        path = site_path(site_name, "data_folder", file_name)
+        if os.path.exists(path):
+            frames.append(pd.read_csv(path).reindex(columns=PRODUCT_COLUMNS))
+    if not frames:
+        return pd.DataFrame(columns=["Site", "ID"] + PRODUCT_COLUMNS)
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df[~df["Product Name"].fillna("").astype(str).map(normalise_name).isin(MISSING_NAMES)].copy()
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+    for column in ("Current Price", "Original Price"):
+        df[column] = df[column].map(parse_price)
+    # Rows scraped before sections recorded URLs borrow the latest URL seen for the same name
+    names = df["Product Name"].astype(str).map(normalise_name)
+    with_url = df.dropna(subset=["Product URL"]).sort_values("Timestamp", na_position="first")
+    latest_urls = with_url.groupby(names)["Product URL"].last()
+    df["Product URL"] = df["Product URL"].fillna(names.map(latest_urls))
+    # last() takes each column's latest non-empty value
+    df["ID"] = [f"{site_name}/{product_key(name, url)}" for name, url in zip(df["Product Name"], df["Product URL"])]
+    df = df.sort_values("Timestamp", na_position="first").groupby("ID", sort=False).last().reset_index()
+    return df.assign(Site=site_name)[["Site", "ID"] + PRODUCT_COLUMNS]
+
+
+def load_signatures(path=SIGNATURES_PATH):
+    """{ID: signature} stored by the last run, empty when the matcher changed since"""
+    if not os.path.exists(path):
+        return {}
+    store = np.load(path, allow_pickle=False)
+    if int(store["version"]) != MATCHER_VERSION:
+        return {}
+    return dict(zip(store["ids"].tolist(), store["signatures"]))
+
+
+def save_signatures(ids, signatures, path=SIGNATURES_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, ids=np.array(ids, dtype=str), signatures=signatures, version=MATCHER_VERSION)
+
+
+def group_matches(matches):
+    """{ID: group number}, merging pairs best score first; a group never holds two products of one site"""
+    group_of, members = {}, {}
+    pairs = matches.sort_values("Score", ascending=False)[["ID A", "Site A", "ID B", "Site B"]]
+    for id_a, site_a, id_b, site_b in pairs.itertuples(index=False, name=None):
+        a, b = group_of.get(id_a, id_a), group_of.get(id_b, id_b)
+        sites_a = members.get(a, {id_a: site_a})
+        sites_b = members.get(b, {id_b: site_b})
+        if a == b or set(sites_a.values()) & set(sites_b.values()):
+            continue
+        members[a] = {**sites_a, **sites_b}
+        members.pop(b, None)
+        for member in members[a]:
+            group_of[member] = a
+    return {member: number for number, group in enumerate(members.values(), 1) for member in group}
+
+
+def price_comparison(products, matches):
+    """One row per matched product and shop, with how far each price is above the cheapest shop's"""
+    groups = group_matches(matches)
+    df = products[products["ID"].isin(groups)].assign(Group=lambda d: d["ID"].map(groups))
+    if df.empty:
+        return pd.DataFrame(columns=["Group", "Product", "Site", "Product Name", "Current Price", "Original Price", "Product URL", "Cheapest", "Above Cheapest %"])
+    lowest = df.groupby("Group")["Current Price"].transform("min")
+    df["Product"] = df.groupby("Group")["Product Name"].transform(lambda names: min(names, key=len))
+    df["Cheapest"] = df["Current Price"] == lowest
+    df["Above Cheapest %"] = ((df["Current Price"] / lowest - 1) * 100).round(1)
+    columns = ["Group", "Product", "Site", "Product Name", "Current Price", "Original Price", "Product URL", "Cheapest", "Above Cheapest %"]
+    return df[columns].sort_values(["Group", "Current Price"], ignore_index=True)
+
+
+def update_matches(site_names=None, force=False):
+    """Match the products that are new since the last run against every shop's products, then
+    rewrite product_matches.csv and price_comparison.csv"""
+    site_names = list(site_names or SITES)
+    products = pd.concat([site_products(site_name) for site_name in site_names], ignore_index=True)
+    if products.empty:
+        print("No products to match")
+        return None
+
+    stored = {} if force else load_signatures()
+    new = ~products["ID"].isin(set(stored)).to_numpy()
+    tokens = [name_tokens(name) for name in products["Product Name"]]
+    signatures = np.empty((len(products), NUM_PERM), dtype=np.uint64)
+    for row, (product_id, is_new) in enumerate(zip(products["ID"], new)):
+        signatures[row] = minhash(tokens[row]["tokens"]) if is_new else stored[product_id]
+    count("products_new", int(new.sum()))
+
+    # Pairs found earlier stay while both products are still listed
+    matches = pd.read_csv(MATCHES_PATH) if os.path.exists(MATCHES_PATH) and stored else pd.DataFrame(columns=MATCH_COLUMNS)
+    matches = matches[matches["ID A"].isin(products["ID"]) & matches["ID B"].isin(products["ID"])]
+
+    rows = []
+    if new.any():
+        with span("match_candidates", products=len(products), new=int(new.sum())):
+            pairs = candidate_pairs(signatures, products["Site"].to_numpy(), new)
+            matched_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for i, j in pairs:
+                score = match_score(tokens[i], tokens[j])
+                if score >= MATCH_THRESHOLD:
+                    a, b = products.iloc[i], products.iloc[j]
+                    rows.append([a["ID"], a["Site"], a["Product Name"], b["ID"], b["Site"], b["Product Name"], round(score, 3), matched_at])
+        print(f"{new.sum()} new product(s): {len(pairs)} candidate pairs, {len(rows)} matched")
+    matches = pd.concat([matches, pd.DataFrame(rows, columns=MATCH_COLUMNS)], ignore_index=True)
+
+    save_signatures(products["ID"].tolist(), signatures)
+    matches.to_csv(MATCHES_PATH, index=False)
+    comparison = price_comparison(products, matches)
+    comparison.to_csv(COMPARISON_PATH, index=False)
+    print(f"{comparison['Group'].nunique()} products matched across shops; prices saved to {COMPARISON_PATH}")
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match the same product across shops and compare their prices")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--force", action="store_true", help="Rebuild every signature and match")
+    args = parser.parse_args()
+    update_matches(args.sites, args.force)
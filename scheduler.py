@@ -0,0 +1,170 @@
+import os
+import time
+import logging
+import threading
+import traceback
+
+import pandas as pd
+
+from instrumentation import span, count
+
+# Concurrency limits per resource class. One headless Chrome needs roughly a CPU core
+# and a few hundred MB, so browser slots are the scarce ones.
+DEFAULT_LIMITS = {
+    "browser": 2,
+    "http": 4,
+    "cpu": max(1, (os.cpu_count() or 2) - 1),
+}
+
+
+class Task:
+    def __init__(self, name, func, args=(), kwargs=None, requires=(), resource="cpu", timeout=None, retries=0):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.requires = tuple(requires)
+        self.resource = resource
+        self.timeout = timeout
+        self.retries = retries
+
+        self.status = "pending"
+        self.error = ""
+        self.attempts = 0
+        self.result = None
+        self.queued_at = None
+        self.started_at = None
+        self.finished_at = None
+
+
+class TaskScheduler:
+    """Runs extraction tasks in threads, in dependency order, within per-resource limits.
+
+    A task starts once everything it requires finished successfully; if a requirement
+    fails, times out or is cancelled, the task is cancelled too. A task that overruns its
+    timeout is marked timed out and not retried, but keeps its slot until its thread returns:
+    the thread may still hold a browser, and the limits count running browsers.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.tasks = {}
+        self._in_use = {resource: 0 for resource in self.limits}
+        self._done = threading.Condition()
+
+    def add(self, name, func, *args, requires=(), resource="cpu", timeout=None, retries=0, **kwargs):
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        if resource not in self.limits:
+            raise ValueError(f"Unknown resource class '{resource}' for task {name}")
+        self.tasks[name] = Task(name, func, args, kwargs, requires, resource, timeout, retries)
+        return self.tasks[name]
+
+    def _check_graph(self):
+        for task in self.tasks.values():
+            missing = [req for req in task.requires if req not in self.tasks]
+            if missing:
+                raise ValueError(f"Task {task.name} requires unknown task(s): {', '.join(missing)}")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through task {name}")
+            visiting.add(name)
+            for req in self.tasks[name].requires:
+                visit(req)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.tasks:
+            visit(name)
+
+    def _execute(self, task):
+        while True:
+            task.attempts += 1
+            try:
+                with span("task", task=task.name, resource=task.resource, attempt=task.attempts):
+                    task.result = task.func(*task.args, **task.kwargs)
+                status, error = "ok", ""
+                break
+            except Exception as e:
+                logging.error(f"Task {task.name} failed (attempt {task.attempts}): {e}\n{traceback.format_exc()}")
+                status, error = "failed", f"{type(e).__name__}: {e}"
+                if task.attempts > task.retries or task.status != "running":
+                    break
+                count("retries")
+
+        with self._done:
+            if task.status == "running":  # not already given up on by a timeout
+                task.status, task.error = status, error
+                task.finished_at = time.time()
+            self._in_use[task.resource] -= 1
+            self._done.notify_all()
+
+    def _start(self, task):
+        task.status = "running"
+        task.started_at = time.time()
+        self._in_use[task.resource] += 1
+        thread = threading.Thread(target=self._execute, args=(task,), name=f"task-{task.name}", daemon=True)
+        thread.start()
+
+    def _expire(self, now):
+        for task in self.tasks.values():
+            if task.status == "running" and task.timeout and now - task.started_at > task.timeout:
+                logging.error(f"Task {task.name} timed out after {task.timeout}s; its slot is freed when it returns")
+                task.status, task.error = "timeout", f"exceeded {task.timeout}s"
+                task.finished_at = now
+
+    def run(self):
+        self._check_graph()
+        started = time.time()
+        for task in self.tasks.values():
+            task.queued_at = started
+
+        with self._done:
+            while True:
+                self._expire(time.time())
+
+                for task in self.tasks.values():
+                    if task.status != "pending":
+                        continue
+                    states = [self.tasks[req].status for req in task.requires]
+                    if any(state in ("failed", "timeout", "cancelled") for state in states):
+                        task.status = "cancelled"
+                        task.error = "requirement did not complete"
+                        task.finished_at = time.time()
+                    elif all(state == "ok" for state in states) and self._in_use[task.resource] < self.limits[task.resource]:
+                        self._start(task)
+
+                if all(task.status not in ("pending", "running") for task in self.tasks.values()):
+                    break
+                # Wake up on completion, or periodically to enforce timeouts
+                self._done.wait(timeout=1)
+
+        return self.report()
+
+    def report(self):
+        rows = []
+        for task in self.tasks.values():
+            rows.append({
+                "Task": task.name,
+                "Resource": task.resource,
+                "Status": task.status,
+                "Attempts": task.attempts,
+                "Wait s": round(task.started_at - task.queued_at, 2) if task.started_at else None,
+                "Duration s": round(task.finished_at - task.started_at, 2) if task.started_at and task.finished_at else None,
+                "Error": task.error,
+            })
+        return pd.DataFrame(rows)
+
+    def save_report(self, folder_name):
+        df = self.report()
+        os.makedirs(folder_name, exist_ok=True)
+        file_path = os.path.join(folder_name, "run_report.csv")
+        df.to_csv(file_path, index=False)
+        print(df.to_string(index=False))
+        print(f"Run report saved to {file_path}")
+        return df
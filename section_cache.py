@@ -0,0 +1,67 @@
+import os
+import re
+import json
+import hashlib
+import logging
+
+from instrumentation import count
+
+# Attributes a carousel rewrites while it animates or lazy-loads; they say nothing about the products
+VOLATILE_ATTRIBUTES = re.compile(r'\s(?:style|tabindex|aria-[\w-]+|data-flickity-[\w-]+)="[^"]*"')
+VOLATILE_CLASSES = re.compile(r"\b(?:is-selected|is-active|lazy-load-active|lazyloaded|loaded)\b")
+WHITESPACE = re.compile(r"\s+")
+
+
+class SectionCache:
+    """Fingerprints of each product section's rendered HTML, with the rows parsed from it last run.
+
+    A section whose fingerprint is unchanged is not walked again: its previous rows are
+    carried forward with the current timestamp, so products.csv keeps one row per product
+    per run either way.
+    """
+
+    def __init__(self, folder_name, timestamp, file_name="section_cache.json"):
+        self.path = os.path.join(folder_name, file_name)
+        self.timestamp = timestamp
+        self.sections = {}
+        self.seen = {}  # title -> occurrences this run
+        self.current = set()  # keys checked this run
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.sections = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Ignoring unreadable section cache {self.path}: {e}")
+
+    @staticmethod
+    def fingerprint(html):
+        html = VOLATILE_CLASSES.sub("", VOLATILE_ATTRIBUTES.sub("", html or ""))
+        return hashlib.sha1(WHITESPACE.sub(" ", html).encode("utf-8")).hexdigest()
+
+    def check(self, title, html):
+        """(key, fingerprint) for a section's outerHTML; repeated titles on one page get distinct keys"""
+        occurrence = self.seen.get(title, 0) + 1
+        self.seen[title] = occurrence
+        key = title if occurrence == 1 else f"{title} #{occurrence}"
+        self.current.add(key)
+        return key, self.fingerprint(html)
+
+    def cached_rows(self, key, fingerprint):
+        """Last run's rows if the section is unchanged, else None"""
+        cached = self.sections.get(key)
+        if not cached or cached["fingerprint"] != fingerprint:
+            count("sections_changed")
+            return None
+        count("sections_unchanged")
+        print(f"Section unchanged since last run: {key} ({len(cached['rows'])} products carried forward)")
+        return [{**row, "Timestamp": self.timestamp} for row in cached["rows"]]
+
+    def store(self, key, fingerprint, rows):
+        self.sections[key] = {"fingerprint": fingerprint, "rows": rows}
+
+    def save(self):
+        # Sections no longer on the page are dropped
+        self.sections = {key: value for key, value in self.sections.items() if key in self.current}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.sections, f, ensure_ascii=False)
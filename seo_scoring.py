@@ -0,0 +1,474 @@
+import os
+import csv
+import json
+import hashlib
+import argparse
+
+import pandas as pd
+
+from sites import SITES, ROOT, site_path
+from link_graph import normalise_url, url_domain, platform_for
+from keyword_index import KeywordIndex
+
+STATE_PATH = os.path.join(ROOT, "seo_scoring_state.json")
+REPORT_PATH = os.path.join(ROOT, "seo_strength_report.csv")
+RANKED_PATH = os.path.join(ROOT, "overall_seo_strength_ranked.csv")
+META_RESULTS_PATH = os.path.join(ROOT, "meta_tag_analysis_results.csv")
+KEYWORD_ANALYSIS_PATH = os.path.join(ROOT, "keyword_analysis_output.csv")
+
+KEYWORD_WEIGHT = 0.6
+META_TAG_WEIGHT = 0.3
+BACKLINK_WEIGHT = 0.1
+MAX_BACKLINK_SCORE = 3
+
+# Columns of cleaned_Csv.csv whose words count as product keywords
+PRODUCT_COLUMNS = ["Main Category", "Product Category", "Product Name"]
+
+# Files (in each site's data folder) that feed each score component
+COMPONENT_INPUTS = {
+    "keywords": ["seo_keywords.csv", "tfidf_keywords.csv", "navbar.csv", "cleaned_Csv.csv"],
+    "meta": ["meta_data.csv"],
+    "backlinks": ["backlinks.csv"],
+}
+
+## Technology Retail Store Keyword Dictionary
+TECHNOLOGY_RETAIL_KEYWORDS = {
+    ## General
+    "technology retail",
+    "electronics store",
+    "online electronics store",
+    "tech shop",
+    "buy electronics online",
+
+    ## Core Technology Products
+    "smartphones",
+    "laptops",
+    "desktop computers",
+    "tablets",
+
+    ## Wearable Technology
+    "smartwatches",
+    "fitness trackers",
+    "headphones",
+    "speakers",
+
+    ## Televisions
+    "televisions",
+    "smart TVs",
+    "OLED TVs",
+    "LED TVs",
+
+    ## Cameras
+    "cameras",
+    "digital cameras",
+    "DSLR cameras",
+
+    ## Gaming
+    "gaming consoles",
+    "PlayStation",
+    "Xbox",
+    "Nintendo Switch",
+
+    ## Computer Accessories
+    "computer accessories",
+    "keyboards",
+    "mouse",
+    "monitors",
+
+    ## Mobile Accessories
+    "mobile accessories",
+    "phone cases",
+    "chargers",
+    "screen protectors",
+
+    ## Home Appliances (increasingly tech-integrated)
+    "home appliances",
+    "smart home devices",
+
+    ## Emerging Technologies
+    "drones",
+    "virtual reality",
+    "VR headsets",
+
+    ## Peripherals & Networking
+    "printers",
+    "networking devices",
+    "routers",
+
+    ## Brands
+    "Samsung",
+    "Apple",
+    "Huawei",
+    "Xiaomi",
+    "Sony",
+    "HP",
+    "Dell",
+    "Lenovo",
+    "LG",
+
+    ## Specific Product Searches with Brands
+    "Samsung smartphones",
+    "Apple iPhones",
+    "Sony headphones",
+    "best smartphones",
+    "cheap laptops",
+    "discount TVs",
+
+    ## Purchase Intent
+    "buy smartphones online",
+    "electronics store near me",
+    "computer store in Lebanon",
+    "where to buy smartphones in Lebanon",
+
+    ## Other Relevant Terms
+    "latest technology",
+    "new technology",
+    "price of smartphones",
+    "price of laptops",
+    "deals on electronics",
+    "offers on smartphones",
+    "smart speakers",
+    "eReaders",
+    "projectors",
+    "gaming laptops",
+    "computer parts",
+    "camera lenses",
+    "car electronics",
+}
+
+
+## SEO Keywords
+def load_keywords_from_csv(filepath, keyword_column="Keyword"):
+    try:
+        df = pd.read_csv(filepath)
+        if keyword_column in df.columns:
+            return set(df[keyword_column].dropna().astype(str))
+        print(f"Error: Column '{keyword_column}' not found in {filepath}")
+    except FileNotFoundError:
+        print(f"Error: File not found at {filepath}")
+    return set()
+
+
+## TF-IDF
+def analyze_tfidf(filepath, tfidf_column="TF-IDF Keywords"):
+    return load_keywords_from_csv(filepath, keyword_column=tfidf_column)
+
+
+## Nav Bar
+def extract_nav_keywords(filepath, main_category_col="Main Category", sub_category_col="Subcategory", item_col="Items"):
+    nav_keywords = set()
+    try:
+        df = pd.read_csv(filepath)
+    except FileNotFoundError:
+        print(f"Error: File not found at {filepath}")
+        return nav_keywords
+
+    if main_category_col in df.columns:
+        nav_keywords.update(df[main_category_col].dropna().astype(str).str.lower())
+    if sub_category_col in df.columns:
+        nav_keywords.update(df[sub_category_col].dropna().astype(str).str.lower().replace("n/a", ""))
+    if item_col in df.columns:
+        nav_keywords.update(df[item_col].dropna().astype(str).str.lower().str.split(", ").explode().dropna())
+    nav_keywords.discard("")
+    return nav_keywords
+
+
+## Product Data
+def load_product_data(filepath, columns=PRODUCT_COLUMNS):
+    try:
+        df = pd.read_csv(filepath)
+    except FileNotFoundError:
+        print(f"Error: File not found at '{filepath}'.")
+        return set()
+
+    present = [col for col in columns if col in df.columns]
+    if not present:
+        print(f"Error: None of {columns} found in '{filepath}'")
+        return set()
+    words = df[present].stack().dropna().astype(str).str.lower().str.split().explode()
+    return set(words.dropna())
+
+
+def aggregate_keywords(site_name):
+    """Keyword sets of one site, as the EDA notebook aggregated them"""
+    return {
+        "keywords": load_keywords_from_csv(site_path(site_name, "data_folder", "seo_keywords.csv")),
+        "tfidf": analyze_tfidf(site_path(site_name, "data_folder", "tfidf_keywords.csv")),
+        "nav_bar": extract_nav_keywords(site_path(site_name, "data_folder", "navbar.csv")),
+        "product_names": load_product_data(site_path(site_name, "data_folder", "cleaned_Csv.csv")),
+    }
+
+
+## Comparison to tech dictionary
+def build_keyword_index(site_names=None):
+    """Keyword index of the given sites (default: all) plus the tech dictionary"""
+    index = KeywordIndex()
+    index.add_dictionary("tech", TECHNOLOGY_RETAIL_KEYWORDS)
+    for site_name in site_names or SITES:
+        aggregated = aggregate_keywords(site_name)
+        index.add_site(site_name, set().union(*aggregated.values()))
+    return index
+
+
+def calculate_seo_strength_from_stats_values(index, site_name):
+    """Share of the site's own keywords that are dictionary terms"""
+    site_ids = index.sites[site_name]
+    return len(index.compare(site_name, "tech")["common"]) / len(site_ids) * 100 if len(site_ids) else 0
+
+
+def save_keyword_analysis(index, filename=KEYWORD_ANALYSIS_PATH):
+    labels = {name: SITES[name]["domain"] for name in index.sites}
+    index.analysis_frame("tech", labels).to_csv(filename, index=False)
+
+
+## Meta Tags
+def load_meta_tag_data(filepath):
+    try:
+        df = pd.read_csv(filepath)
+    except FileNotFoundError:
+        print(f"Error: Meta tag data file not found at {filepath}")
+        return {}
+    if "Meta Tag" not in df.columns or "Content" not in df.columns:
+        print(f"Error: CSV file '{filepath}' must contain 'Meta Tag' and 'Content' columns.")
+        return {}
+    tags = df["Meta Tag"].astype(str).str.strip().str.lower()
+    contents = df["Content"].fillna("").astype(str).str.strip()
+    return dict(zip(tags, contents))
+
+
+def calculate_meta_tag_strength_from_data(meta_data):
+    score = 0
+    max_score = 7
+    analysis = {
+        "title_present": False,
+        "title_length_ok": False,
+        "description_present": False,
+        "description_length_ok": False,
+        "robots_directive": meta_data.get("robots"),
+        "viewport_present": False,
+        "canonical_present": False,
+        "strength_score": 0
+    }
+
+    title = meta_data.get("title")
+    if title:
+        analysis["title_present"] = True
+        score += 1
+        if 30 <= len(title.strip()) <= 60:
+            analysis["title_length_ok"] = True
+            score += 1
+
+    description = meta_data.get("description")
+    if description:
+        analysis["description_present"] = True
+        score += 1
+        if 50 <= len(description.strip()) <= 160:
+            analysis["description_length_ok"] = True
+            score += 1
+
+    if "viewport" in meta_data:
+        analysis["viewport_present"] = True
+        score += 1
+
+    if "canonical" in meta_data:
+        analysis["canonical_present"] = True
+        score += 1
+
+    if meta_data.get("robots"):
+        score += 1
+
+    analysis["strength_score"] = score / max_score * 100
+    return analysis
+
+
+## Backlinks
+def calculate_backlink_score(filepath):
+    """Distinct social platforms linked from the site, capped at MAX_BACKLINK_SCORE"""
+    try:
+        df = pd.read_csv(filepath)
+    except FileNotFoundError:
+        print(f"Error: Backlinks file not found at {filepath}")
+        return 0, []
+
+    # Older runs wrote the URL column as "Link"
+    url_column = next((col for col in ("URL", "Link") if col in df.columns), None)
+    if url_column is None:
+        return 0, []
+
+    platforms = set()
+    for href in df[url_column].dropna().astype(str):
+        url = normalise_url(href, "")
+        if url:
+            platforms.add(platform_for(url_domain(url)))
+    platforms -= {"E-mail", "Phone", "Other"}
+    return min(len(platforms), MAX_BACKLINK_SCORE), sorted(platforms)
+
+
+def calculate_overall_seo_strength(keyword_percentage, meta_tag_percentage, backlink_score):
+    normalized_backlink_score = backlink_score / MAX_BACKLINK_SCORE * 100
+    return (keyword_percentage * KEYWORD_WEIGHT
+            + meta_tag_percentage * META_TAG_WEIGHT
+            + normalized_backlink_score * BACKLINK_WEIGHT)
+
+
+def compute_component(site_name, component, index):
+    """Score one component of one site; returns (value, details)"""
+    if component == "keywords":
+        details = {"keywords": len(index.sites[site_name])}
+        details["match_ratio"] = round(calculate_seo_strength_from_stats_values(index, site_name), 2)
+        return round(index.coverage(site_name, "tech"), 2), details
+    if component == "meta":
+        meta_data = load_meta_tag_data(site_path(site_name, "data_folder", "meta_data.csv"))
+        analysis = calculate_meta_tag_strength_from_data(meta_data)
+        return round(analysis["strength_score"], 2), analysis
+    if component == "backlinks":
+        score, platforms = calculate_backlink_score(site_path(site_name, "data_folder", "backlinks.csv"))
+        return score, {"platforms": platforms}
+    raise ValueError(f"Unknown score component: {component}")
+
+
+## Fingerprints
+def file_fingerprint(path, known_files):
+    """sha1 of a file's bytes, reused from the last run when its size and mtime are unchanged"""
+    key = os.path.relpath(path, ROOT)
+    if not os.path.exists(path):
+        known_files.pop(key, None)
+        return "missing"
+
+    stat = os.stat(path)
+    known = known_files.get(key)
+    if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+        return known["sha1"]
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    known_files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def component_fingerprint(site_name, component, known_files):
+    digest = hashlib.sha1(component.encode())
+    for file_name in COMPONENT_INPUTS[component]:
+        digest.update(file_fingerprint(site_path(site_name, "data_folder", file_name), known_files).encode())
+    if component == "keywords":
+        # Editing the dictionary must rescore keyword coverage too
+        digest.update("\n".join(sorted(TECHNOLOGY_RETAIL_KEYWORDS)).encode())
+    return digest.hexdigest()
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        try:
+            with open(STATE_PATH, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ignoring unreadable scoring state {STATE_PATH}: {e}")
+    return {"files": {}, "sites": {}}
+
+
+def save_state(state):
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+## Reports
+def save_seo_strength_to_csv(filename, seo_scores, rankings):
+    with open(filename, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Website", "Keyword %", "Meta Tag %", "Backlink Score", "Overall SEO Score"])
+        for name, data in seo_scores.items():
+            writer.writerow([name, data["keyword"], data["meta"], data["backlink"], f"{data['score']:.2f}"])
+
+        writer.writerow([])  # Blank line
+
+        writer.writerow(["Rank", "Website", "Score"])
+        for rank, (name, score) in enumerate(rankings, 1):
+            writer.writerow([rank, name, f"{score:.2f}"])
+
+
+def save_meta_analysis_to_csv(filename, analysis_results):
+    df = pd.DataFrame([
+        {
+            "Website": website,
+            "Title Present": analysis["title_present"],
+            "Title Length OK": analysis["title_length_ok"],
+            "Description Present": analysis["description_present"],
+            "Description Length OK": analysis["description_length_ok"],
+            "Viewport Present": analysis["viewport_present"],
+            "Canonical Present": analysis["canonical_present"],
+            "Robots Directive": analysis["robots_directive"],
+            "Strength Score": f"{analysis['strength_score']:.2f}",
+        }
+        for website, analysis in analysis_results.items()
+    ])
+    df.to_csv(filename, index=False)
+
+
+def update_scores(force=False):
+    """Rescore every site, recomputing only components whose input files changed.
+
+    Returns the ranked overall scores as a DataFrame.
+    """
+    state = load_state()
+    known_files = state.setdefault("files", {})
+    site_states = state.setdefault("sites", {})
+    recomputed = []
+    index = None
+
+    for site_name in SITES:
+        site_state = site_states.setdefault(site_name, {})
+        for component in COMPONENT_INPUTS:
+            fingerprint = component_fingerprint(site_name, component, known_files)
+            cached = site_state.get(component)
+            if not force and cached and cached["fingerprint"] == fingerprint:
+                continue
+            if component == "keywords" and index is None:
+                index = build_keyword_index()  # one index serves every site's keyword score
+            value, details = compute_component(site_name, component, index)
+            site_state[component] = {"fingerprint": fingerprint, "value": value, "details": details}
+            recomputed.append(f"{site_name}/{component}")
+
+    # Drop sites that are no longer configured
+    for site_name in set(site_states) - set(SITES):
+        del site_states[site_name]
+
+    seo_scores = {}
+    for site_name, site_state in site_states.items():
+        keyword = site_state["keywords"]["value"]
+        meta = site_state["meta"]["value"]
+        backlink = site_state["backlinks"]["value"]
+        seo_scores[site_name] = {
+            "keyword": keyword,
+            "meta": meta,
+            "backlink": backlink,
+            "score": calculate_overall_seo_strength(keyword, meta, backlink),
+        }
+    rankings = sorted(((name, data["score"]) for name, data in seo_scores.items()), key=lambda item: item[1], reverse=True)
+    ranked = pd.DataFrame(
+        [(rank, name, round(score, 2)) for rank, (name, score) in enumerate(rankings, 1)],
+        columns=["Rank", "Website", "Overall Score"]
+    )
+
+    if index is not None or not os.path.exists(KEYWORD_ANALYSIS_PATH):
+        save_keyword_analysis(index or build_keyword_index())
+
+    outputs = (REPORT_PATH, RANKED_PATH, META_RESULTS_PATH)
+    if recomputed or not all(os.path.exists(path) for path in outputs):
+        save_seo_strength_to_csv(REPORT_PATH, seo_scores, rankings)
+        ranked.to_csv(RANKED_PATH, index=False)
+        save_meta_analysis_to_csv(META_RESULTS_PATH, {name: s["meta"]["details"] for name, s in site_states.items()})
+        print(f"Recomputed {', '.join(recomputed) or 'nothing'}; SEO reports saved to {REPORT_PATH} and {RANKED_PATH}")
+    else:
+        print("SEO score inputs unchanged; reports left as they are")
+
+    save_state(state)
+    return ranked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the SEO strength report from the scraped CSVs")
+    parser.add_argument("--force", action="store_true", help="Recompute every component even if its inputs are unchanged")
+    args = parser.parse_args()
+    print(update_scores(force=args.force).to_string(index=False))
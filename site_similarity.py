@@ -0,0 +1,270 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from sites import SITES, ROOT, site_path
+from seo_scoring import (
+    file_fingerprint, load_keywords_from_csv, analyze_tfidf, extract_nav_keywords, load_product_data
+)
+from sitemap import PAGE_KEYWORDS_FILE
+
+STORE_DIR = os.path.join(ROOT, "similarity")
+MANIFEST_PATH = os.path.join(STORE_DIR, "manifest.json")
+SIMILARITY_PATH = os.path.join(ROOT, "site_similarity.csv")
+PAGE_SIMILARITY_PATH = os.path.join(ROOT, "page_similarity.csv")
+
+# Same tokens CountVectorizer produced in the notebook
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Site-level documents compared in the notebook: aspect -> (input file, loader)
+ASPECTS = {
+    "keywords": ("seo_keywords.csv", load_keywords_from_csv),
+    "tfidf": ("tfidf_keywords.csv", analyze_tfidf),
+    "nav_bar": ("navbar.csv", extract_nav_keywords),
+    "product_names": ("cleaned_Csv.csv", load_product_data),
+}
+# Page-level documents: each page the sitemap recrawl fetched, from its keyword counts
+PAGE_ASPECT = "pages"
+
+
+def tokenize(words):
+    return Counter(TOKEN_PATTERN.findall(" ".join(words).lower()))
+
+
+def page_documents(path):
+    """{url: term counts} of a site's page_keywords.csv, weighted by each keyword's count on the page"""
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path)
+    documents = {}
+    for url, group in df.groupby("URL", sort=False):
+        counts = Counter()
+        for keyword, n in zip(group["Keyword"].astype(str), group["Count"]):
+            for term, k in tokenize([keyword]).items():
+                counts[term] += k * int(n)
+        documents[url] = counts
+    return documents
+
+
+def counts_fingerprint(counts):
+    return hashlib.sha1(json.dumps(sorted(counts.items())).encode("utf-8")).hexdigest()
+
+
+class VectorStore:
+    """Term-count vectors of site and page documents, one CSR row per .npz file.
+
+    The vocabulary only ever grows, so a stored row stays valid; rows saved when the
+    vocabulary was smaller are padded to the current width when loaded.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.manifest_path = os.path.join(store_dir, "manifest.json")
+        self.manifest = {"vocab": [], "files": {}, "documents": {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.term_ids = {term: i for i, term in enumerate(self.manifest["vocab"])}
+        self._rows = {}
+
+    @staticmethod
+    def document_key(aspect, site, page=""):
+        return f"{aspect}/{site}/{page}"
+
+    def _row_path(self, key):
+        aspect = key.split("/", 1)[0]
+        name = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.store_dir, aspect, f"{name}.npz")
+
+    def is_current(self, key, fingerprint):
+        document = self.manifest["documents"].get(key)
+        return bool(document) and document["fingerprint"] == fingerprint and os.path.exists(self._row_path(key))
+
+    def update(self, aspect, site, page, fingerprint, counts):
+        """Store a document's term counts (a Counter) under its input fingerprint"""
+        key = self.document_key(aspect, site, page)
+        vocab = self.manifest["vocab"]
+        cols = []
+        for term in counts:
+            if term not in self.term_ids:
+                self.term_ids[term] = len(vocab)
+                vocab.append(term)
+            cols.append(self.term_ids[term])
+
+        order = np.argsort(cols)
+        cols = np.array(cols, dtype=np.int32)[order]
+        data = np.array(list(counts.values()), dtype=np.float32)[order]
+        row = sparse.csr_matrix((data, cols, [0, len(cols)]), shape=(1, len(vocab)))
+
+        path = self._row_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sparse.save_npz(path, row)
+        self._rows[key] = row
+        self.manifest["documents"][key] = {"aspect": aspect, "site": site, "page": page, "fingerprint": fingerprint}
+
+    def remove(self, key):
+        self.manifest["documents"].pop(key, None)
+        self._rows.pop(key, None)
+        if os.path.exists(self._row_path(key)):
+            os.remove(self._row_path(key))
+
+    def documents(self, aspect):
+        return sorted(key for key, doc in self.manifest["documents"].items() if doc["aspect"] == aspect)
+
+    def matrix(self, aspect):
+        """(document keys, documents x vocabulary CSR matrix) for one aspect"""
+        keys = self.documents(aspect)
+        width = len(self.manifest["vocab"])
+        rows = []
+        for key in keys:
+            if key not in self._rows:
+                self._rows[key] = sparse.load_npz(self._row_path(key)).tocsr()
+            row = self._rows[key]
+            if row.shape[1] < width:
+                row = sparse.csr_matrix((row.data, row.indices, row.indptr), shape=(1, width))
+            rows.append(row)
+        if not rows:
+            return keys, sparse.csr_matrix((0, width), dtype=np.float32)
+        return keys, sparse.vstack(rows, format="csr")
+
+    def save(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+
+
+def similarity_matrix(matrix):
+    """Pairwise cosine similarity of all rows: one sparse matmul of L2-normalised rows"""
+    normalised = normalize(matrix, norm="l2", axis=1)
+    return (normalised @ normalised.T).toarray()
+
+
+def top_k(store, aspect, k=5, cross_site=True, chunk_size=512):
+    """Each document's k most similar documents, by default only from other sites"""
+    keys, matrix = store.matrix(aspect)
+    if not keys:
+        return pd.DataFrame(columns=["Aspect", "Site", "Page", "Match Site", "Match Page", "Similarity"])
+
+    documents = [store.manifest["documents"][key] for key in keys]
+    site_codes = pd.factorize(pd.Series([doc["site"] for doc in documents]))[0]
+    normalised = normalize(matrix, norm="l2", axis=1).astype(np.float32)
+    k = min(k, len(keys) - 1)
+    rows = []
+
+    # Row chunks keep the dense block at chunk_size x documents
+    for start in range(0, len(keys), chunk_size):
+        stop = min(start + chunk_size, len(keys))
+        block = (normalised[start:stop] @ normalised.T).toarray()
+        block[np.arange(stop - start), np.arange(start, stop)] = -1
+        if cross_site:
+            block[site_codes[start:stop, None] == site_codes[None, :]] = -1
+        if k <= 0:
+            continue
+        best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        for offset, candidates in enumerate(best):
+            i = start + offset
+            for j in candidates[np.argsort(-block[offset, candidates])]:
+                if block[offset, j] <= 0:
+                    continue
+                rows.append({
+                    "Aspect": aspect,
+                    "Site": documents[i]["site"],
+                    "Page": documents[i]["page"],
+                    "Match Site": documents[j]["site"],
+                    "Match Page": documents[j]["page"],
+                    "Similarity": round(float(block[offset, j]), 4),
+                })
+    return pd.DataFrame(rows)
+
+
+def update_pages(store, site_name, force=False):
+    """Bring a site's page documents in line with its page_keywords.csv; returns the keys rewritten or removed"""
+    documents = page_documents(site_path(site_name, "data_folder", PAGE_KEYWORDS_FILE))
+    changed = []
+    for url, counts in documents.items():
+        key = store.document_key(PAGE_ASPECT, site_name, url)
+        fingerprint = counts_fingerprint(counts)
+        if force or not store.is_current(key, fingerprint):
+            store.update(PAGE_ASPECT, site_name, url, fingerprint, counts)
+            changed.append(key)
+    for key in store.documents(PAGE_ASPECT):
+        document = store.manifest["documents"][key]
+        if document["site"] == site_name and document["page"] not in documents:
+            store.remove(key)
+            changed.append(key)
+    return changed
+
+
+def update_similarity(force=False, store=None):
+    """Refresh the documents whose input changed and rewrite site_similarity.csv and page_similarity.csv"""
+    store = store or VectorStore()
+    updated = []
+    pages_updated = []
+
+    for site_name in SITES:
+        for aspect, (file_name, loader) in ASPECTS.items():
+            path = site_path(site_name, "data_folder", file_name)
+            fingerprint = file_fingerprint(path, store.manifest["files"])
+            key = store.document_key(aspect, site_name)
+            if not force and store.is_current(key, fingerprint):
+                continue
+            store.update(aspect, site_name, "", fingerprint, tokenize(loader(path)))
+            updated.append(key)
+        pages_updated.extend(update_pages(store, site_name, force))
+
+    if pages_updated or not os.path.exists(PAGE_SIMILARITY_PATH):
+        pages = top_k(store, PAGE_ASPECT)
+        pages.to_csv(PAGE_SIMILARITY_PATH, index=False)
+        print(f"Updated {len(pages_updated)} page vector(s); closest pages of other sites saved to {PAGE_SIMILARITY_PATH}")
+
+    if not updated and os.path.exists(SIMILARITY_PATH):
+        store.save()
+        print("Similarity inputs unchanged; site_similarity.csv left as it is")
+        return pd.read_csv(SIMILARITY_PATH)
+
+    rows = []
+    for aspect in ASPECTS:
+        keys, matrix = store.matrix(aspect)
+        site_keys = [key for key in keys if store.manifest["documents"][key]["page"] == ""]
+        if len(site_keys) != len(keys):
+            matrix = matrix[[keys.index(key) for key in site_keys]]
+        similarity = similarity_matrix(matrix)
+        for i in range(len(site_keys)):
+            for j in range(i + 1, len(site_keys)):
+                rows.append({
+                    "Aspect": aspect,
+                    "Website A": store.manifest["documents"][site_keys[i]]["site"],
+                    "Website B": store.manifest["documents"][site_keys[j]]["site"],
+                    "Similarity": round(float(similarity[i, j]), 4),
+                })
+
+    store.save()
+    df = pd.DataFrame(rows)
+    df.to_csv(SIMILARITY_PATH, index=False)
+    print(f"Updated {len(updated)} document vector(s); similarity saved to {SIMILARITY_PATH}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cosine similarity between sites (and crawled pages) from stored term vectors")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update")
+    update_parser.add_argument("--force", action="store_true")
+    top_parser = subparsers.add_parser("top")
+    top_parser.add_argument("--aspect", default="product_names", choices=list(ASPECTS) + [PAGE_ASPECT])
+    top_parser.add_argument("-k", type=int, default=5)
+    top_parser.add_argument("--same-site", action="store_true", help="Also match documents of the same site")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        print(update_similarity(force=args.force).to_string(index=False))
+    else:
+        print(top_k(VectorStore(), args.aspect, args.k, cross_site=not args.same_site).to_string(index=False))
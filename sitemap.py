@@ -0,0 +1,408 @@
+import io
+import os
+import re
+import gzip
+import json
+import time
+import logging
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import nltk
+import requests
+import pandas as pd
+from bs4 import BeautifulSoup
+from nltk.corpus import stopwords
+
+from sites import SITES, site_path
+from link_graph import LinkGraph, normalise_domain, normalise_url
+from instrumentation import span, count
+from collection_crawler import HostLimiter, PER_HOST, DELAY
+from keyword_pool import analyze_pages
+from meta_audit import META_TAGS, page_tags, audit
+from product_enrichment import DETAIL_COLUMNS, parse_product_page
+from dictionary_tagger import Tagger, TAG_COLUMNS
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+INVENTORY_FILE = "url_inventory.csv"
+STATE_FILE = "sitemap_state.json"
+PAGE_META_FILE = "page_meta.csv"
+PAGE_KEYWORDS_FILE = "page_keywords.csv"
+PAGE_PRODUCTS_FILE = "page_products.csv"
+PAGE_LINKS_FILE = "page_links.csv"
+PAGE_TAGS_FILE = "page_tags.csv"
+MAX_PAGES = 200  # changed pages refetched per site per run; the rest wait for the next hour
+MAX_SITEMAPS = 500
+UNDATED_RECRAWL_HOURS = 24  # URLs without lastmod are refetched this often
+EXTRA_STOP_WORDS = {"view", "add", "cart", "quick", "load", "original"}
+
+INVENTORY_COLUMNS = ["URL", "Page Type", "Lastmod", "Sitemap", "First Seen", "Last Crawled", "Crawled Lastmod"]
+
+# Product and category URLs per platform; sitemap file names decide the rest
+PRODUCT_PATTERNS = {"shopify": r"/products/", "woocommerce": r"/product/", "prestashop": r"/\d+-[^/]+\.html$"}
+CATEGORY_PATTERNS = {"shopify": r"/collections/", "woocommerce": r"/product-category/", "prestashop": r"^/(?:\w{2}/)?\d+-[^/.]+/?$"}
+
+
+def page_type(url, sitemap_url, platform):
+    path = urlparse(url).path
+    if re.search(PRODUCT_PATTERNS.get(platform, r"/products?/"), path):
+        return "product"
+    if re.search(CATEGORY_PATTERNS.get(platform, r"/(?:collections|category)/"), path):
+        return "category"
+    name = urlparse(sitemap_url).path.lower()
+    if re.search(r"product_cat|categor|collection", name):
+        return "category"
+    if "product" in name:
+        return "product"
+    return "page"
+
+
+def parse_sitemap(stream):
+    """(kind, loc, lastmod) of every <url> and <sitemap> entry, parsed as the bytes arrive.
+
+    Finished entries are cleared from the tree, so memory stays flat on huge sitemaps.
+    Only the sitemap namespace's <loc> counts; image and video extensions carry their own.
+    """
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+    loc = lastmod = None
+    for event, element in context:
+        if event != "end":
+            continue
+        if element.tag == f"{ns}loc":
+            loc = (element.text or "").strip()
+        elif element.tag == f"{ns}lastmod":
+            lastmod = (element.text or "").strip() or None
+        elif element.tag in (f"{ns}url", f"{ns}sitemap"):
+            if loc:
+                yield element.tag[len(ns):], loc, lastmod
+            loc = lastmod = None
+            root.clear()
+
+
+def _stop_words():
+    try:
+        words = stopwords.words("english")
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+        words = stopwords.words("english")
+    return set(words) | EXTRA_STOP_WORDS
+
+
+def page_text(soup):
+    # The same text extract_keywords analyses
+    for tag in soup(["script", "style", "nav", "footer", "header"]):
+        tag.decompose()
+    return soup.get_text()
+
+
+class SitemapCrawler:
+    """One site's sitemaps and the pages they list, fetched politely over plain HTTP.
+
+    Sitemap files are fetched with conditional requests, and child sitemaps whose lastmod in
+    the index is unchanged are not fetched at all: their URLs carry over from the inventory.
+    """
+
+    def __init__(self, site_name, limiter=None):
+        self.site_name = site_name
+        self.base_url = SITES[site_name]["url"]
+        self.domain = SITES[site_name]["domain"]
+        self.platform = SITES[site_name]["platform"]
+        self.folder = site_path(site_name, "data_folder")
+        self.limiter = limiter or HostLimiter()
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.robots = RobotFileParser()
+        self.state_path = os.path.join(self.folder, STATE_FILE)
+        self.state = {}
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning(f"Ignoring unreadable sitemap state {self.state_path}: {e}")
+
+    def get(self, url, **kwargs):
+        with self.limiter.slot(url), span("sitemap_fetch", url=url):
+            return self.session.get(url, timeout=30, **kwargs)
+
+    def sitemap_roots(self):
+        """Sitemaps named in robots.txt, else the conventional /sitemap.xml"""
+        roots = []
+        try:
+            response = self.get(urljoin(self.base_url, "/robots.txt"))
+            if response.ok:
+                lines = response.text.splitlines()
+                self.robots.parse(lines)
+                roots = [line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("sitemap:")]
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"No robots.txt for {self.site_name}: {e}")
+        return list(dict.fromkeys(roots)) or [urljoin(self.base_url, "/sitemap.xml")]
+
+    def read(self, url):
+        """[(kind, loc, lastmod)] of one sitemap file, or None when it is unchanged since the last fetch"""
+        known = self.state.get(url, {})
+        headers = {}
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+
+        response = self.get(url, headers=headers, stream=True)
+        try:
+            if response.status_code == 304:
+                count("sitemaps_not_modified")
+                return None
+            response.raise_for_status()
+            response.raw.decode_content = True  # undo Content-Encoding; .xml.gz files stay gzip
+            response.raw.auto_close = False  # the buffered reader closes it, not the last byte read
+            stream = io.BufferedReader(response.raw, 64 * 1024)
+            if stream.peek(2)[:2] == b"\x1f\x8b":
+                stream = gzip.GzipFile(fileobj=stream)
+            entries = list(parse_sitemap(stream))
+        finally:
+            response.close()
+
+        count("sitemaps_fetched")
+        self.state[url] = {
+            **known,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "children": [[loc, lastmod] for kind, loc, lastmod in entries if kind == "sitemap"],
+        }
+        return entries
+
+    def discover(self, previous):
+        """{url: (lastmod, sitemap)} of every page the sitemaps list; previous is the last inventory"""
+        carried = {}
+        for url, lastmod, sitemap in zip(previous["URL"], previous["Lastmod"], previous["Sitemap"]):
+            carried.setdefault(sitemap, []).append((url, lastmod if isinstance(lastmod, str) else None))
+
+        pages = {}
+        queue = [(url, None) for url in self.sitemap_roots()]
+        seen = set()
+        while queue and len(seen) < MAX_SITEMAPS:
+            url, index_lastmod = queue.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            known = self.state.get(url, {})
+
+            # The index says this sitemap has not changed since it was last read
+            if index_lastmod and known.get("lastmod") == index_lastmod and (url in carried or known.get("children")):
+                entries = None
+                count("sitemaps_skipped")
+            else:
+                try:
+                    entries = self.read(url)
+                    self.state.setdefault(url, {})["lastmod"] = index_lastmod
+                except (requests.exceptions.RequestException, ET.ParseError, OSError) as e:
+                    count("sitemap_errors")
+                    print(f"Error reading sitemap {url}: {e}")
+                    entries = None
+
+            if entries is None:
+                # Unchanged (or unreadable this time): reuse what it listed before
+                queue.extend((child, lastmod) for child, lastmod in self.state.get(url, {}).get("children", []))
+                for page, lastmod in carried.get(url, []):
+                    pages.setdefault(page, (lastmod, url))
+                continue
+
+            for kind, loc, lastmod in entries:
+                if kind == "sitemap":
+                    queue.append((urljoin(url, loc), lastmod))
+                    continue
+                page = normalise_url(loc, url)
+                if not page or normalise_domain(urlparse(page).netloc) != self.domain:
+                    continue
+                if self.robots.mtime() and not self.robots.can_fetch(HEADERS["User-Agent"], page):
+                    count("robots_disallowed")
+                    continue
+                pages.setdefault(page, (lastmod, url))
+
+        # Sitemaps no longer referenced are forgotten
+        self.state = {url: value for url, value in self.state.items() if url in seen}
+        return pages
+
+    def save_state(self):
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+
+    def fetch(self, url):
+        with self.limiter.slot(url), span("sitemap_page", url=url):
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+        count("sitemap_pages")
+        return response.text
+
+
+def load_inventory(folder):
+    path = os.path.join(folder, INVENTORY_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=INVENTORY_COLUMNS)
+    return pd.read_csv(path, dtype=str)
+
+
+def update_inventory(crawler, previous, timestamp):
+    """The site's URL inventory: what the sitemaps list now, with each URL's crawl state carried over"""
+    pages = crawler.discover(previous)
+    state = previous.set_index("URL")[["First Seen", "Last Crawled", "Crawled Lastmod"]] if not previous.empty else None
+
+    rows = []
+    for url, (lastmod, sitemap) in pages.items():
+        known = state.loc[url] if state is not None and url in state.index else None
+        rows.append({
+            "URL": url,
+            "Page Type": page_type(url, sitemap, crawler.platform),
+            "Lastmod": lastmod,
+            "Sitemap": sitemap,
+            "First Seen": known["First Seen"] if known is not None else timestamp,
+            "Last Crawled": known["Last Crawled"] if known is not None else None,
+            "Crawled Lastmod": known["Crawled Lastmod"] if known is not None else None,
+        })
+    inventory = pd.DataFrame(rows, columns=INVENTORY_COLUMNS)
+    removed = len(previous) - previous["URL"].isin(inventory["URL"]).sum() if not previous.empty else 0
+    print(f"{crawler.site_name}: {len(inventory)} URLs in the sitemaps "
+          f"({(inventory['Last Crawled'].isna()).sum()} new, {removed} removed)")
+    return inventory
+
+
+def changed_urls(inventory, limit=MAX_PAGES, now=None):
+    """URLs to refetch: never crawled, lastmod moved since the last crawl, or undated and due.
+    The most recently modified come first; at most limit per run."""
+    if inventory.empty:
+        return []
+    now = pd.Timestamp(now or datetime.now())
+    last_crawled = pd.to_datetime(inventory["Last Crawled"], errors="coerce")
+    lastmod = inventory["Lastmod"].fillna("")
+    never = last_crawled.isna()
+    moved = (lastmod != "") & (lastmod != inventory["Crawled Lastmod"].fillna(""))
+    due = (lastmod == "") & (now - last_crawled > pd.Timedelta(hours=UNDATED_RECRAWL_HOURS))
+
+    changed = inventory[never | moved | due]
+    modified = pd.to_datetime(changed["Lastmod"], errors="coerce", utc=True)
+    changed = changed.assign(_modified=modified).sort_values("_modified", ascending=False, na_position="last")
+    return changed["URL"].head(limit).tolist()
+
+
+def merge_rows(path, rows, key, keep_urls, columns, refreshed=None):
+    """An incremental per-page table with the rows of the refetched URLs replaced;
+    refreshed names those URLs when some of them may have no rows now"""
+    fresh = pd.DataFrame(rows, columns=columns)
+    if not os.path.exists(path):
+        return fresh
+    refreshed = fresh[key] if refreshed is None else list(refreshed)
+    old = pd.read_csv(path)
+    old = old[old[key].isin(keep_urls) & ~old[key].isin(refreshed)].reindex(columns=columns)
+    return pd.concat([old, fresh], ignore_index=True) if not fresh.empty else old
+
+
+def recrawl_site(site_name, limiter=None, max_pages=MAX_PAGES, stop_words=None, tagger=None):
+    """Refresh one site's inventory and feed the changed pages to the meta, keyword, product, link and tag tables"""
+    crawler = SitemapCrawler(site_name, limiter)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with span("sitemap_discovery", site=site_name):
+        inventory = update_inventory(crawler, load_inventory(crawler.folder), timestamp)
+    crawler.save_state()
+
+    changed = changed_urls(inventory, max_pages)
+    count("sitemap_changed", len(changed))
+    print(f"{site_name}: {len(changed)} changed page(s) to fetch")
+
+    pages = {}
+    with ThreadPoolExecutor(max_workers=crawler.limiter.per_host) as pool:
+        futures = {pool.submit(crawler.fetch, url): url for url in changed}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                pages[url] = future.result()
+            except requests.exceptions.RequestException as e:
+                count("sitemap_page_errors")
+                print(f"Error fetching {url}: {e}")
+
+    types = dict(zip(inventory["URL"], inventory["Page Type"]))
+    graph = LinkGraph()
+    meta_rows, texts, tag_texts, product_rows = [], [], [], []
+    for url, html in pages.items():
+        soup = BeautifulSoup(html, "html.parser")
+        meta_rows.append({"site": site_name, "url": url, **page_tags(soup)})
+        graph.add_page(url, soup)
+        if types.get(url) == "product":
+            product_rows.append({**parse_product_page(url, html), "Fetched At": timestamp})
+        texts.append(page_text(soup))
+        # Spaced, so words in adjacent tags are not glued together for the dictionary matcher
+        tag_texts.append(soup.get_text(" "))
+
+    keyword_rows, tag_rows = [], []
+    if texts:
+        with span("sitemap_keywords", pages=len(texts)):
+            tables = analyze_pages(texts, stop_words or _stop_words())
+        for url, (common_keywords, _) in zip(pages, tables):
+            keyword_rows.extend({"URL": url, "Keyword": keyword, "Count": n} for keyword, n in common_keywords)
+        tagger = tagger or Tagger.load()
+        with span("sitemap_tags", pages=len(texts)):
+            tag_rows = [{"URL": url, **tagger.tag_row(text)} for url, text in zip(pages, tag_texts)]
+
+    # Every refetched page replaces its old rows in each table, even when it has none now
+    keep = set(inventory["URL"])
+    meta_path = os.path.join(crawler.folder, PAGE_META_FILE)
+    meta = merge_rows(meta_path, meta_rows, "url", keep, ["site", "url"] + META_TAGS + ["hreflang"], refreshed=pages)
+    if not meta.empty:
+        # Every stored page is audited again: the uniqueness rules compare pages with each other
+        audit(meta).to_csv(meta_path, index=False)
+    keywords_path = os.path.join(crawler.folder, PAGE_KEYWORDS_FILE)
+    merge_rows(keywords_path, keyword_rows, "URL", keep, ["URL", "Keyword", "Count"], refreshed=pages).to_csv(keywords_path, index=False)
+    tags_path = os.path.join(crawler.folder, PAGE_TAGS_FILE)
+    merge_rows(tags_path, tag_rows, "URL", keep, ["URL"] + TAG_COLUMNS, refreshed=pages).to_csv(tags_path, index=False)
+    products_path = os.path.join(crawler.folder, PAGE_PRODUCTS_FILE)
+    merge_rows(products_path, product_rows, "Product URL", keep, DETAIL_COLUMNS, refreshed=pages).to_csv(products_path, index=False)
+    # Internal links of every refetched page, for link_analysis
+    edges = graph.edges_frame()
+    edges = edges.loc[edges["Internal"].astype(bool), ["Source", "Target", "Target Href", "Count"]]
+    links_path = os.path.join(crawler.folder, PAGE_LINKS_FILE)
+    links = merge_rows(links_path, edges.to_dict("records"), "Source", keep, ["Source", "Target", "Target Href", "Count"], refreshed=pages)
+    links.to_csv(links_path, index=False)
+
+    # Only pages actually fetched count as crawled; failures are retried next run
+    crawled = inventory["URL"].isin(pages)
+    inventory.loc[crawled, "Last Crawled"] = timestamp
+    inventory.loc[crawled, "Crawled Lastmod"] = inventory.loc[crawled, "Lastmod"]
+    inventory.to_csv(os.path.join(crawler.folder, INVENTORY_FILE), index=False)
+    print(f"{site_name}: inventory saved, {len(pages)} page(s) refreshed")
+    return inventory
+
+
+def recrawl_sites(site_names=None, per_host=PER_HOST, delay=DELAY, max_pages=MAX_PAGES):
+    """Sitemap recrawl of every site, the sites side by side; one failing site does not stop the others"""
+    site_names = list(site_names or SITES)
+    limiter = HostLimiter(per_host, delay)
+    stop_words = _stop_words()
+    tagger = Tagger.load()
+    started = time.perf_counter()
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(site_names)) as pool:
+        futures = {pool.submit(recrawl_site, site_name, limiter, max_pages, stop_words, tagger): site_name for site_name in site_names}
+        for future in as_completed(futures):
+            site_name = futures[future]
+            try:
+                results[site_name] = future.result()
+            except Exception as e:
+                count("sitemap_site_errors")
+                print(f"Sitemap recrawl of {site_name} failed: {e}")
+    print(f"Sitemap recrawl finished in {time.perf_counter() - started:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh each site's URL inventory from its sitemaps and refetch changed pages")
+    parser.add_argument("--sites", nargs="+", default=list(SITES), choices=list(SITES))
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    parser.add_argument("--delay", type=float, default=DELAY)
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    args = parser.parse_args()
+    recrawl_sites(args.sites, args.per_host, args.delay, args.max_pages)
@@ -0,0 +1,40 @@
+import os
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Sites scraped every hour, keyed by the name the dashboard shows.
+# Folders are relative to the repository root (the scrapers' working directory).
+SITES = {
+    "Abed Tahhan": {
+        "url": "https://abedtahan.com/",
+        "domain": "abedtahan.com",
+        "platform": "shopify",
+        "scraper_dir": "Abed Tahhan",
+        "data_folder": "Abed_Csv",
+        "seo_folder": "Abed Tahhan/csv",
+        "clean_function": "clean_abed_tahhan",
+    },
+    "Beytech": {
+        "url": "https://beytech.com.lb/",
+        "domain": "beytech.com.lb",
+        "platform": "woocommerce",
+        "scraper_dir": "Beytech",
+        "data_folder": "Beytech_Csv",
+        "seo_folder": "Beytech/csv",
+        "clean_function": "clean_beytech",
+    },
+    "Hamdan electronics": {
+        "url": "https://hamdanelectronics.com/",
+        "domain": "hamdanelectronics.com",
+        "platform": "prestashop",
+        "scraper_dir": "Hamdan electronics",
+        "data_folder": "Hamdan_Csv",
+        "seo_folder": "Hamdan electronics/csv",
+        "clean_function": "clean_hamdan",
+    },
+}
+
+
+def site_path(site_name, key, *parts):
+    """Absolute path to one of a site's folders (optionally a file inside it)"""
+    return os.path.join(ROOT, SITES[site_name][key], *parts)
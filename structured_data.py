@@ -0,0 +1,287 @@
+import os
+import re
+import json
+import logging
+from urllib.parse import urljoin, urldefrag, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from instrumentation import span, count
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+# Set SCRAPER_STRUCTURED_DATA=0 to always walk the homepage in the browser
+ENABLED = os.environ.get("SCRAPER_STRUCTURED_DATA", "1") != "0"
+SHOPIFY_PAGE_SIZE = 250
+SHOPIFY_MAX_PAGES = 20
+WOOCOMMERCE_PAGE_SIZE = 100
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _types(node):
+    return {str(t).split("/")[-1] for t in _as_list(node.get("@type") or node.get("itemtype"))}
+
+
+def _name(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value
+
+
+def product_fields(node):
+    """A schema.org Product (JSON-LD or microdata, as a dict) flattened to the fields we keep"""
+    offers = _as_list(node.get("offers"))
+    offer = offers[0] if offers and isinstance(offers[0], dict) else {}
+    price = offer.get("price", offer.get("lowPrice", node.get("price")))
+    if price is None and isinstance(offer.get("priceSpecification"), dict):
+        price = offer["priceSpecification"].get("price")
+    return {
+        "name": _name(node.get("name")),
+        "sku": node.get("sku") or node.get("mpn"),
+        "brand": _name(node.get("brand")),
+        "price": price,
+        "original_price": None,
+        "currency": offer.get("priceCurrency", node.get("priceCurrency")),
+        "availability": str(offer.get("availability", "")).split("/")[-1] or None,
+        "url": node.get("url") or offer.get("url"),
+        "images": [image if isinstance(image, str) else image.get("url", "")
+                   for image in _as_list(node.get("image")) if isinstance(image, (str, dict))],
+    }
+
+
+# ------------------------------- JSON-LD -----------------------------------------------
+
+def json_ld_nodes(root):
+    """Every JSON-LD object under root, with @graph containers flattened"""
+    nodes = []
+    for script in root.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text() or "")
+        except (json.JSONDecodeError, TypeError):
+            count("json_ld_errors")
+            continue
+        stack = _as_list(data)
+        while stack:
+            node = stack.pop(0)
+            if not isinstance(node, dict):
+                continue
+            nodes.append(node)
+            stack.extend(_as_list(node.get("@graph")))
+    return nodes
+
+
+def json_ld_products(root):
+    """Every Product under root, including the items of ItemLists"""
+    products = []
+    for node in json_ld_nodes(root):
+        types = _types(node)
+        if types & {"Product", "ProductGroup"}:
+            products.append(product_fields(node))
+        elif "ItemList" in types:
+            for element in _as_list(node.get("itemListElement")):
+                item = element.get("item", element) if isinstance(element, dict) else None
+                if isinstance(item, dict) and _types(item) & {"Product", "ProductGroup"}:
+                    products.append(product_fields(item))
+    return products
+
+
+def json_ld_product(soup):
+    products = json_ld_products(soup)
+    return products[0] if products else None
+
+
+def product_ref(url, base_url, marker=None):
+    """What a page's cards and its JSON-LD agree on for one product: the slug after marker,
+    or the absolute URL without its fragment"""
+    url = urldefrag(urljoin(base_url, url))[0]
+    return url_slug(url, marker) if marker else url
+
+
+def json_ld_catalogue(root, base_url, marker=None):
+    """{product_ref: fields} of the JSON-LD products under root that have a name, price and URL"""
+    catalogue = {}
+    for product in json_ld_products(root):
+        if not product["name"] or product["price"] is None or not product["url"]:
+            continue
+        ref = product_ref(product["url"], base_url, marker)
+        if ref:
+            catalogue.setdefault(ref, {**product, "url": urljoin(base_url, product["url"]), "price": str(product["price"])})
+    count("json_ld_products", len(catalogue))
+    return catalogue
+
+
+# ------------------------------- MICRODATA -----------------------------------------------
+
+def _itemprop_value(tag):
+    if tag.has_attr("content"):
+        return tag["content"].strip()
+    if tag.name in ("a", "link") and tag.has_attr("href"):
+        return tag["href"]
+    if tag.name in ("img", "source") and tag.has_attr("src"):
+        return tag["src"]
+    if tag.name == "meta":
+        return tag.get("content", "").strip()
+    return tag.get_text(" ", strip=True)
+
+
+def microdata_item(scope):
+    """Properties of one itemscope; nested itemscopes become nested dicts"""
+    props = {"@type": scope.get("itemtype", "").split("/")[-1]}
+
+    def walk(node):
+        for child in node.find_all(True, recursive=False):
+            prop = child.get("itemprop")
+            nested = child.has_attr("itemscope")
+            if prop:
+                value = microdata_item(child) if nested else _itemprop_value(child)
+                for name in prop.split():
+                    props.setdefault(name, value)
+            if not nested:
+                walk(child)
+
+    walk(scope)
+    return props
+
+
+def microdata_products(root):
+    """(element, fields) of every schema.org/Product itemscope under root, outermost only"""
+    scopes = root.find_all(itemscope=True, itemtype=re.compile(r"schema\.org/Product$"))
+    if root.name and root.has_attr("itemscope") and re.search(r"schema\.org/Product$", root.get("itemtype", "")):
+        scopes.insert(0, root)
+    return [(scope, product_fields(microdata_item(scope))) for scope in scopes
+            if not scope.find_parent(itemscope=True, itemtype=re.compile(r"schema\.org/Product$"))]
+
+
+def microdata_product(soup):
+    products = microdata_products(soup)
+    return products[0][1] if products else None
+
+
+# ------------------------------- PLATFORM ENDPOINTS -----------------------------------------------
+
+def fetch_soup(url, session=None):
+    """Static HTML of a page, or None; unlike the scrapers' fetch_html it records nothing"""
+    try:
+        with span("structured_fetch", url=url):
+            response = (session or requests).get(url, headers=HEADERS, timeout=15)
+            response.raise_for_status()
+        return BeautifulSoup(response.text, "html.parser")
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error fetching {url}: {e}")
+        return None
+
+
+def get_json(url, params=None, session=None):
+    try:
+        with span("structured_fetch", url=url):
+            response = (session or requests).get(url, params=params, headers=HEADERS, timeout=15)
+            response.raise_for_status()
+        return response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        count("structured_errors")
+        logging.info(f"No JSON from {url}: {e}")
+        return None
+
+
+def url_slug(url, marker):
+    """The path segment after marker ('products', 'product', ...) in a product URL"""
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    if marker in parts and parts.index(marker) + 1 < len(parts):
+        return parts[parts.index(marker) + 1]
+    return None
+
+
+def linked_slugs(root, marker):
+    """Ordered unique slugs of the product links under root"""
+    slugs = (url_slug(a["href"], marker) for a in root.find_all("a", href=True) if f"/{marker}/" in a["href"])
+    return list(dict.fromkeys(slug for slug in slugs if slug))
+
+
+def cards_by_slug(root, card_selector, marker):
+    """{slug: card} of the product cards under root, by each card's first product link"""
+    cards = {}
+    for card in root.select(card_selector):
+        slugs = linked_slugs(card, marker)
+        if slugs:
+            cards.setdefault(slugs[0], card)
+    return cards
+
+
+def card_text(card, selector):
+    """Stripped text of the first selector match in a static product card, or None"""
+    tag = card.select_one(selector) if card is not None else None
+    return tag.get_text(strip=True) or None if tag else None
+
+
+def shopify_fields(product, base_url):
+    """One products.json entry flattened like product_fields; the cheapest variant sets the price"""
+    variants = product.get("variants") or [{}]
+    variant = min(variants, key=lambda v: float(v.get("price") or 0))
+    return {
+        "name": product.get("title"),
+        "sku": variant.get("sku"),
+        "brand": product.get("vendor"),
+        "price": variant.get("price"),
+        "original_price": variant.get("compare_at_price"),
+        "currency": None,
+        "availability": "InStock" if any(v.get("available") for v in variants) else "OutOfStock",
+        "url": urljoin(base_url, f"/products/{product['handle']}"),
+        "images": [image.get("src") for image in product.get("images", [])],
+    }
+
+
+def shopify_products(base_url, collection=None, session=None):
+    """{handle: fields} from Shopify's public products.json, for one collection or the whole store"""
+    path = f"/collections/{collection}/products.json" if collection else "/products.json"
+    products = {}
+    for page in range(1, SHOPIFY_MAX_PAGES + 1):
+        data = get_json(urljoin(base_url, path), {"limit": SHOPIFY_PAGE_SIZE, "page": page}, session)
+        batch = (data or {}).get("products") or []
+        for product in batch:
+            products[product["handle"]] = shopify_fields(product, base_url)
+        if len(batch) < SHOPIFY_PAGE_SIZE:
+            break
+    count("structured_products", len(products))
+    return products
+
+
+def woocommerce_fields(product):
+    """One Store API product flattened like product_fields; prices come in minor units"""
+    prices = product.get("prices") or {}
+    scale = 10 ** int(prices.get("currency_minor_unit", 2))
+
+    def amount(key):
+        value = prices.get(key)
+        return f"{int(value) / scale:.2f}" if value not in (None, "") else None
+
+    return {
+        "name": BeautifulSoup(product.get("name", ""), "html.parser").get_text(),
+        "sku": product.get("sku"),
+        "brand": None,
+        "price": amount("price"),
+        "original_price": amount("regular_price"),
+        "currency": prices.get("currency_code"),
+        "availability": "InStock" if product.get("is_in_stock") else "OutOfStock",
+        "url": product.get("permalink"),
+        "images": [image.get("src") for image in product.get("images", [])],
+    }
+
+
+def woocommerce_products(base_url, slugs, session=None):
+    """{slug: fields} from the WooCommerce Store API for the given product slugs"""
+    products = {}
+    for start in range(0, len(slugs), WOOCOMMERCE_PAGE_SIZE):
+        batch = slugs[start:start + WOOCOMMERCE_PAGE_SIZE]
+        data = get_json(urljoin(base_url, "/wp-json/wc/store/v1/products"),
+                        {"slug": ",".join(batch), "per_page": WOOCOMMERCE_PAGE_SIZE}, session)
+        for product in data or []:
+            products[product["slug"]] = woocommerce_fields(product)
+    count("structured_products", len(products))
+    return products
@@ -0,0 +1,204 @@
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from selenium.common.exceptions import WebDriverException
+
+from browser_profile import new_driver, apply_blocking
+from checkpoint import browser_lost
+from instrumentation import span, count
+
+TABS = 3
+LOAD_TIMEOUT = 30  # seconds before a job runs on whatever the tab has loaded
+JOB_TIMEOUT = 300  # seconds a job may take once its tab starts loading it, before the browser is quit
+CLOSE_TIMEOUT = 60  # seconds close waits for queued jobs to finish
+POLL_INTERVAL = 0.1
+RUN_POLL = 1  # seconds between a waiting caller's checks of its job's timeout
+
+# The marker lives on the old document, so its absence means the new page has committed
+NAVIGATE = "window.__tabPending = true; window.location.href = arguments[0];"
+READY = "return window.__tabPending === undefined && document.readyState !== 'loading';"
+
+
+class Tab:
+    def __init__(self, handle):
+        self.handle = handle
+        self.pending = deque()  # (url, job, future)
+        self.loading = None  # (url, job, future, started)
+
+
+class TabExecutor:
+    """One Chrome process whose tabs serve a whole site's browser jobs.
+
+    A WebDriver session is not thread-safe, so one worker thread owns the driver and the
+    callers only queue jobs. Each tab has its own queue and starts loading its next page as
+    soon as its previous job finishes, so page loads overlap while another tab is read.
+    The jobs themselves run one at a time on that thread: extraction is not concurrent.
+    A job is called with the driver switched to its tab, on the page it asked for.
+    """
+
+    def __init__(self, site_name, tabs=TABS, load_timeout=LOAD_TIMEOUT):
+        self.site_name = site_name
+        self.size = tabs
+        self.load_timeout = load_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._driver = None
+
+    def submit(self, url, job):
+        future = Future()
+        future.started = None  # monotonic time its tab started loading it, set by the worker
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name=f"tabs-{self.site_name}", daemon=True)
+                self._thread.start()
+            self._queue.put((url, job, future))
+        return future
+
+    def run(self, url, job, timeout=JOB_TIMEOUT):
+        """job's result; timeout counts from when its tab starts loading it, since jobs queued
+        behind a long one on the same worker are not stuck, only waiting"""
+        future = self.submit(url, job)
+        while True:
+            started = future.started
+            remaining = timeout if started is None else started + timeout - time.monotonic()
+            try:
+                return future.result(max(0, min(remaining, RUN_POLL)))
+            except FutureTimeout:
+                if started is None or time.monotonic() - started < timeout:
+                    continue
+            # A hung page would hold the worker forever; quitting the browser fails it and its queue
+            count("tab_timeouts")
+            logging.error(f"No result for {url} after {timeout}s; quitting the {self.site_name} tab browser")
+            self._quit()
+            raise FutureTimeout(f"{url} took over {timeout}s")
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._queue.put(None)
+        thread.join(timeout)
+        if thread.is_alive():
+            logging.error(f"Tab executor for {self.site_name} still busy after {timeout}s; quitting its browser")
+            self._quit()
+            thread.join(timeout)
+
+    def _quit(self):
+        driver = self._driver
+        if driver is not None:
+            try:
+                driver.quit()
+            except WebDriverException as e:
+                logging.debug(f"Quitting the tab browser failed: {e}")
+
+    def _open_tabs(self, driver):
+        tabs = [Tab(driver.current_window_handle)]
+        for _ in range(self.size - 1):
+            driver.switch_to.new_window("tab")
+            # new_driver only set up blocking for the first tab
+            apply_blocking(driver, self.site_name)
+            tabs.append(Tab(driver.current_window_handle))
+        return tabs
+
+    def _work(self):
+        driver = None
+        tabs = []
+        closing = False
+        try:
+            driver = self._driver = new_driver(self.site_name)
+            tabs = self._open_tabs(driver)
+            while True:
+                busy = any(tab.pending or tab.loading for tab in tabs)
+                if closing and not busy:
+                    break
+
+                # Take new jobs; wait for one only when every tab is idle
+                try:
+                    item = self._queue.get(block=not busy and not closing, timeout=None if not busy else 0)
+                except queue.Empty:
+                    item = False
+                while item is not False:
+                    if item is None:
+                        closing = True
+                    else:
+                        min(tabs, key=lambda tab: len(tab.pending) + bool(tab.loading)).pending.append(item)
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = False
+
+                # Every idle tab starts loading its next page
+                for tab in tabs:
+                    if tab.loading is None and tab.pending:
+                        url, job, future = tab.pending.popleft()
+                        driver.switch_to.window(tab.handle)
+                        future.started = time.monotonic()
+                        driver.execute_script(NAVIGATE, url)
+                        count("tab_navigations")
+                        tab.loading = (url, job, future, future.started)
+
+                # Read the first tab whose page is ready
+                ready = None
+                for tab in tabs:
+                    if tab.loading is None:
+                        continue
+                    driver.switch_to.window(tab.handle)
+                    timed_out = time.monotonic() - tab.loading[3] > self.load_timeout
+                    if timed_out or driver.execute_script(READY):
+                        if timed_out:
+                            logging.warning(f"Tab still loading {tab.loading[0]} after {self.load_timeout}s")
+                        ready = tab
+                        break
+                if ready is None:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+
+                url, job, future, started = ready.loading
+                ready.loading = None
+                count("tab_jobs")
+                try:
+                    with span("tab_job", url=url, waited=round(time.monotonic() - started, 2)):
+                        future.set_result(job(driver))
+                except Exception as e:
+                    future.set_exception(e)
+                    if browser_lost(e):
+                        raise
+        except Exception as e:
+            logging.error(f"Tab executor for {self.site_name} stopped: {e}")
+            # Jobs still queued fail with the error; the next submit starts a fresh browser
+            for tab in tabs:
+                for item in list(tab.pending) + ([tab.loading[:3]] if tab.loading else []):
+                    if not item[2].done():
+                        item[2].set_exception(e)
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[2].set_exception(e)
+        finally:
+            self._quit()
+            self._driver = None
+
+
+def with_page(url, job, site_name, tabs=None, timeout=JOB_TIMEOUT):
+    """job(driver) on url: in a tab of the site's shared browser when tabs is given, else in a browser of its own"""
+    if tabs is not None:
+        return tabs.run(url, job, timeout)
+    driver = new_driver(site_name)
+    try:
+        with span("selenium_get", url=url):
+            driver.get(url)
+        return job(driver)
+    finally:
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logging.debug(f"Quitting the browser failed: {e}")